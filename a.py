@@ -1,23 +1,56 @@
 #!/usr/bin/env python3
 import argparse
+import contextlib
+import importlib
+import io
+import json
+import multiprocessing
 import os
+import re
 import subprocess
 import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+import patch_cache
+import patch_check
+import patch_events
+import patch_fuzzy
+import patch_io
+import patch_journal
+import patch_manifest
+import patch_trace
+import patch_watch
+import pattern_guard
+import pattern_registry
 
 # Script mapping configuration
 SCRIPT_MAP = {
-    'A': {'file': 'apply_ai_changes.py', 'desc': 'Add AI creation dialog and components'},
-    'B': {'file': 'apply_media_filter.py', 'desc': 'Apply media filter logic to feed'},
-    'C': {'file': 'comment_out_ui.py', 'desc': 'Comment out UI elements'},
-    'D': {'file': 'hide_post_meta.py', 'desc': 'Hide post metadata'},
-    'E': {'file': 'hide_replies_from_feed.py', 'desc': 'Hide replies from feed'},
-    'F': {'file': 'remove_handle_suffix.py', 'desc': 'Remove handle suffix'},
-    'G': {'file': 'remove_replied_to.py', 'desc': 'Remove "replied to" indicator'},
-    'H': {'file': 'setup_inline_text_post.py', 'desc': 'Setup inline layout for text posts'},
-    'I': {'file': 'setup_reply_overlay.py', 'desc': 'Setup reply overlay system'},
-    'J': {'file': 'process_feed_ui.py', 'desc': 'Process Feed UI (Hide elements / Text-only linking)'},
+    'A': {'file': 'apply_ai_changes.py', 'entry': 'main', 'desc': 'Add AI creation dialog and components'},
+    'B': {'file': 'apply_media_filter.py', 'entry': 'main', 'desc': 'Apply media filter logic to feed'},
+    'C': {'file': 'comment_out_ui.py', 'entry': 'main', 'desc': 'Comment out UI elements'},
+    'D': {'file': 'hide_post_meta.py', 'entry': 'main', 'desc': 'Hide post metadata'},
+    'E': {'file': 'hide_replies_from_feed.py', 'entry': 'hide_replies_from_feed', 'desc': 'Hide replies from feed'},
+    'F': {'file': 'remove_handle_suffix.py', 'entry': 'main', 'desc': 'Remove handle suffix'},
+    'G': {'file': 'remove_replied_to.py', 'entry': 'remove_replied_to', 'desc': 'Remove "replied to" indicator'},
+    'H': {'file': 'setup_inline_text_post.py', 'entry': 'main', 'desc': 'Setup inline layout for text posts'},
+    'I': {'file': 'setup_reply_overlay.py', 'entry': 'main', 'desc': 'Setup reply overlay system'},
+    'J': {'file': 'process_feed_ui.py', 'entry': 'main', 'desc': 'Process Feed UI (Hide elements / Text-only linking)'},
 }
 
+# Pool workers are forked from this process, so they see the parent's pid here
+MAIN_PID = os.getpid()
+
+# How often the events of a script run as a subprocess are read while it runs, in seconds
+EVENTS_POLL_INTERVAL = 0.05
+
+# The scripts live next to this file; the checkout they patch is the working directory (--root)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Quoted .ts/.tsx path literals in a script's source are the files it touches
+TARGET_PATH_RE = re.compile(r"""['"]([\w./-]+\.tsx?)['"]""")
+
 def print_menu():
     print("\nAvailable Scripts:")
     print("-" * 50)
@@ -26,7 +59,220 @@ def print_menu():
         print(f"  {key}: {info['desc']} ({info['file']})")
     print("-" * 50)
 
-def run_script(key):
+def script_path(key):
+    return os.path.join(SCRIPT_DIR, SCRIPT_MAP[key]['file'])
+
+def find_script_targets(key):
+    """Statically scan a script's source, and its manifest, for the target files it touches."""
+    targets = set()
+    manifest = patch_manifest.sources(SCRIPT_MAP[key]['file'])[:1]
+    for path in [script_path(key)] + manifest:
+        with open(path, 'r', encoding='utf-8') as f:
+            targets |= set(TARGET_PATH_RE.findall(f.read()))
+    return targets
+
+def paths_conflict(a, b):
+    # Some scripts join a short suffix onto a base dir ('desktop/LeftNav.tsx'),
+    # so treat a path as matching any longer path that ends with it.
+    return a == b or a.endswith('/' + b) or b.endswith('/' + a)
+
+def build_conflict_graph(keys):
+    """Map each key to the alphabetically earlier keys sharing a target file."""
+    targets = {key: find_script_targets(key) for key in keys}
+    graph = {}
+    ordered = sorted(keys)
+    for i, key in enumerate(ordered):
+        graph[key] = {
+            other for other in ordered[:i]
+            if any(paths_conflict(a, b) for a in targets[key] for b in targets[other])
+        }
+    return graph
+
+def execute_script(key, in_process=False):
+    """Run a script and return a structured result instead of raw output."""
+    start = time.perf_counter()
+    mark = patch_trace.mark()
+    with patch_trace.span('script', f"{key} {SCRIPT_MAP[key]['file']}"), \
+            patch_events.streaming(key=key, script=SCRIPT_MAP[key]['file']):
+        if in_process:
+            result = call_entry_point(key)
+        else:
+            result = call_subprocess(key)
+    result['key'] = key
+    result['duration'] = time.perf_counter() - start
+    if patch_trace.enabled() and os.getpid() != MAIN_PID:
+        # A pool worker hands its events back to the parent with the result
+        result['trace'] = patch_trace.events(mark) + result.get('trace', [])
+    return result
+
+def call_subprocess(key):
+    script_file = script_path(key)
+    # The child's patch_io writes the paths it touched to this file on exit
+    fd, track_file = tempfile.mkstemp(prefix='patch-io-', suffix='.txt')
+    os.close(fd)
+    # ...and the edits it made to this one
+    fd, changes_file = tempfile.mkstemp(prefix='patch-changes-', suffix='.json')
+    os.close(fd)
+    env = dict(os.environ, PATCH_IO_TRACK_FILE=track_file, PATCH_IO_CHANGES_FILE=changes_file)
+    events_file = None
+    if patch_events.enabled():
+        fd, events_file = tempfile.mkstemp(prefix='patch-events-', suffix='.ndjson')
+        os.close(fd)
+        env['PATCH_EVENTS_FILE'] = events_file
+    trace_file = None
+    if patch_trace.enabled():
+        fd, trace_file = tempfile.mkstemp(prefix='patch-trace-', suffix='.json')
+        os.close(fd)
+        env['PATCH_TRACE_FILE'] = trace_file
+    trace = []
+    try:
+        start_ns = time.perf_counter_ns()
+        proc = subprocess.Popen([sys.executable, script_file], stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, text=True, env=env)
+        offset = 0
+        while True:
+            try:
+                stdout, stderr = proc.communicate(timeout=EVENTS_POLL_INTERVAL if events_file else None)
+                finished = True
+            except subprocess.TimeoutExpired:
+                finished = False
+            if events_file:
+                # Stream the child's events while it is still running
+                new_events, offset = patch_events.read_events(events_file, offset)
+                for event in new_events:
+                    patch_events.forward(event)
+            if finished:
+                break
+        with open(track_file, 'r', encoding='utf-8') as f:
+            accessed = f.read().split()
+        with open(changes_file, 'r', encoding='utf-8') as f:
+            changes = json.loads(f.read() or '{}')
+        if trace_file:
+            trace, ready_ns = patch_trace.load_dump(trace_file)
+            if ready_ns:
+                # From spawning the child until its patch modules were imported
+                patch_trace.record('startup', f"{key} interpreter start", start_ns, ready_ns)
+    except Exception as e:
+        return {'ok': False, 'stdout': '', 'stderr': '', 'error': f"Failed to run: {e}", 'accessed': []}
+    finally:
+        os.remove(track_file)
+        os.remove(changes_file)
+        if events_file:
+            os.remove(events_file)
+        if trace_file:
+            os.remove(trace_file)
+    return {
+        'ok': proc.returncode == 0,
+        'stdout': stdout,
+        'stderr': stderr,
+        'error': None if proc.returncode == 0 else f"Exited with code {proc.returncode}",
+        'accessed': accessed,
+        'changes': changes,
+        'trace': trace,
+    }
+
+def load_entry_point(key):
+    # Modules stay cached in sys.modules, so each script is imported once per process
+    module_name = os.path.splitext(SCRIPT_MAP[key]['file'])[0]
+    module = importlib.import_module(module_name)
+    return getattr(module, SCRIPT_MAP[key]['entry'])
+
+def reload_script(key):
+    module_name = os.path.splitext(SCRIPT_MAP[key]['file'])[0]
+    if module_name in sys.modules:
+        importlib.reload(sys.modules[module_name])
+
+def call_entry_point(key):
+    """Import a script as a module and call its entry point in this interpreter."""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    returned, error = None, None
+    accessed = set()
+    changes = {}
+    try:
+        entry = load_entry_point(key)
+        # Inside a full run this joins the shared overlay; on its own (e.g. in a
+        # pool worker) the script's files are flushed as soon as it finishes.
+        with patch_io.overlay(), patch_io.tracking() as accessed, \
+                contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            returned = entry()
+            if returned is False:
+                # Keep the files this script had buffered out of the shared flush
+                patch_io.rollback()
+            changes = patch_io.block_changes()
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            error = f"Exited with code {e.code}"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    # Entry points that report success return False on failure
+    if error is None and returned is False:
+        error = "Entry point returned False"
+
+    return {
+        'ok': error is None,
+        'stdout': stdout.getvalue(),
+        'stderr': stderr.getvalue(),
+        'error': error,
+        'returned': returned,
+        'accessed': sorted(accessed),
+        'changes': changes,
+    }
+
+def cached_result(key):
+    """Result for a script whose source and files are unchanged since it last succeeded."""
+    if not patch_cache.is_fresh(SCRIPT_MAP[key]['file']):
+        return None
+    return {'key': key, 'ok': True, 'stdout': '', 'stderr': '', 'error': None,
+            'duration': 0.0, 'cached': True}
+
+def emit_events(result):
+    """
+    Stream the files a script changed and its outcome as JSON lines. Its patch
+    operations were streamed by execute_script() as they were recorded.
+    """
+    key = result['key']
+    tags = {'key': key, 'script': SCRIPT_MAP[key]['file']}
+    for path, (before, after) in sorted(result.get('changes', {}).items()):
+        patch_events.emit({'event': 'file', **tags, 'file': os.path.relpath(path),
+                           'status': 'created' if before is None else 'modified',
+                           'bytes': patch_events.bytes_changed(before, after)})
+    status = 'cached' if result.get('cached') else 'ok' if result['ok'] else 'failed'
+    patch_events.emit({'event': 'script', **tags, 'status': status,
+                       'duration': result['duration'], 'error': result['error']})
+
+def record_result(result):
+    emit_events(result)
+    # Events from a subprocess or pool worker join this process's trace
+    patch_trace.extend(result.get('trace', []))
+    script_file = SCRIPT_MAP[result['key']]['file']
+    if not result['ok']:
+        patch_cache.forget(script_file)
+    elif not result.get('cached'):
+        # The files are hashed by patch_cache.save(), once every script has written
+        patch_cache.record(script_file, result['accessed'])
+        patch_journal.record(script_file, result.get('changes', {}))
+
+def report_result(result):
+    key = result['key']
+    if result.get('cached'):
+        print(f"⏭️  Script {key} skipped: script and target files unchanged since its last run")
+        return True
+
+    # Print output regardless of success, indented slightly
+    if result['stdout']:
+        print(result['stdout'])
+    if result['stderr']:
+        print("stderr:", result['stderr'])
+
+    if not result['ok']:
+        print(f"❌ Script {key} failed: {result['error']}")
+        return False
+
+    print(f"✅ Script {key} completed successfully ({result['duration']:.2f}s)")
+    return True
+
+def run_script(key, timings=None, in_process=False, use_cache=False):
     if key not in SCRIPT_MAP:
         print(f"Error: Unknown script key '{key}'")
         return False
@@ -34,37 +280,351 @@ def run_script(key):
     script_info = SCRIPT_MAP[key]
     script_file = script_info['file']
     
-    if not os.path.exists(script_file):
+    if not os.path.exists(script_path(key)):
         print(f"Error: Script file not found: {script_file}")
         return False
         
     print(f"\n[{key}] Running: {script_info['desc']}...")
+    result = (use_cache and cached_result(key)) or execute_script(key, in_process)
+    record_result(result)
+    if timings is not None:
+        timings[key] = result['duration']
+    return report_result(result)
+
+def run_parallel(selection, jobs, timings, in_process=False, use_cache=False):
+    """
+    Run scripts concurrently in a process pool. A script is only started once
+    every alphabetically earlier script sharing a target file has finished.
+    """
+    missing = [k for k in selection if not os.path.exists(script_path(k))]
+    for key in missing:
+        print(f"Error: Script file not found: {SCRIPT_MAP[key]['file']}")
+    keys = sorted(set(selection) - set(missing))
+
+    graph = build_conflict_graph(keys)
+    pending = list(keys)
+    done = set()
+    succeeded = []
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        running = {}
+        while pending or running:
+            for key in [k for k in pending if graph[k] <= done]:
+                pending.remove(key)
+                result = use_cache and cached_result(key)
+                if result:
+                    timings[key] = result['duration']
+                    print(f"\n[{key}] {SCRIPT_MAP[key]['desc']}")
+                    report_result(result)
+                    succeeded.append(key)
+                    done.add(key)
+                    continue
+                print(f"\n[{key}] Starting: {SCRIPT_MAP[key]['desc']}...")
+                running[pool.submit(execute_script, key, in_process)] = key
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = running.pop(future)
+                result = future.result()
+                record_result(result)
+                timings[key] = result['duration']
+                print(f"\n[{key}] Finished: {SCRIPT_MAP[key]['desc']}")
+                if report_result(result):
+                    succeeded.append(key)
+                done.add(key)
+
+    return len(succeeded), len(missing) + len(keys) - len(succeeded)
+
+def run_affected(keys, deps, dirty, use_cache):
+    """
+    Run, in order and in one shared overlay, every key that has no known
+    dependencies yet or touches a path in dirty. Files a script changes are
+    added to dirty, so later scripts that touch them re-run as well.
+    Returns the paths flushed to disk.
+    """
+    with patch_io.overlay() as written:
+        for key in keys:
+            if key in deps and not deps[key] & dirty:
+                continue
+            before = {path: patch_io.peek(path) for path in deps.get(key, ())}
+            print(f"\n[{key}] Running: {SCRIPT_MAP[key]['desc']}...")
+            result = (use_cache and cached_result(key)) or execute_script(key, in_process=True)
+            record_result(result)
+            report_result(result)
+            if result.get('cached'):
+                deps[key] = patch_cache.recorded_files(SCRIPT_MAP[key]['file'])
+            else:
+                deps[key] = set(result['accessed'])
+            dirty |= {path for path in deps[key] if patch_io.peek(path) != before.get(path)}
+    patch_cache.save()
+    patch_journal.save()
+    return written
+
+def watch(selection, use_cache, debounce, polling=False):
+    """
+    Run the selection once, then wait for its target files (or the scripts
+    themselves) to change and re-run only the scripts that touch them.
+    """
+    keys = list(dict.fromkeys(selection))
+    script_paths = {script_path(key): key for key in keys}
+    manifest_paths = {
+        os.path.abspath(path): key for key in keys for path in patch_manifest.sources(SCRIPT_MAP[key]['file'])
+    }
+    deps = {}
+    run_affected(keys, deps, set(), use_cache)
+
+    def watched_paths():
+        return set(script_paths).union(manifest_paths, *deps.values())
+
+    # Content we wrote ourselves, so the watcher's echo of a flush is ignored
+    own_writes = {}
+    watcher = patch_watch.make_watcher(watched_paths(), polling)
+    print(f"\n👀 Watching {len(watched_paths())} file(s) with {type(watcher).__name__} (Ctrl+C to stop)")
     try:
-        # Run the script and capture output
-        result = subprocess.run([sys.executable, script_file], capture_output=True, text=True)
-        
-        # Print output regardless of success, indented slightly
-        if result.stdout:
-            print(result.stdout)
-        if result.stderr:
-            print("stderr:", result.stderr)
-            
-        if result.returncode != 0:
-            print(f"❌ Script {key} failed with exit code {result.returncode}")
-            return False
-            
-        print(f"✅ Script {key} completed successfully")
-        return True
-        
+        while True:
+            changed = watcher.wait(debounce)
+            changed = {
+                path for path in changed
+                if own_writes.pop(path, None) != patch_cache.file_hash(path)
+            }
+            if not changed:
+                continue
+
+            for path in sorted(changed):
+                print(f"\n🔄 Changed: {os.path.relpath(path)}")
+            for path in changed & set(script_paths):
+                # Re-import the edited script and force it to run
+                key = script_paths[path]
+                reload_script(key)
+                deps.pop(key, None)
+            for path in changed & set(manifest_paths):
+                # An edited manifest or template is picked up on the next load
+                patch_manifest.clear_cache()
+                deps.pop(manifest_paths[path], None)
+
+            written = run_affected(keys, deps, set(changed), use_cache)
+            for path in written:
+                own_writes[path] = patch_cache.file_hash(path)
+            print(f"\nFlushed {len(written)} changed file(s)")
+            watcher.update(watched_paths())
+            print(f"👀 Watching {len(watched_paths())} file(s)")
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        watcher.close()
+
+def apply_to_root(root, selection, use_cache):
+    """
+    Run the selection in process against one checkout, in one shared overlay.
+    Returns the checkout's counts and its captured output.
+    """
+    start = time.perf_counter()
+    cwd = os.getcwd()
+    output = io.StringIO()
+    # Handed back to the parent, which streams them tagged with the checkout
+    events = io.StringIO()
+    stream = patch_events.open_stream(events)
+    success_count = fail_count = 0
+    try:
+        with contextlib.redirect_stdout(output):
+            os.chdir(root)
+            patch_cache.load()
+            patch_journal.load()
+            with patch_io.overlay() as written:
+                for key in selection:
+                    if run_script(key, in_process=True, use_cache=use_cache):
+                        success_count += 1
+                    else:
+                        fail_count += 1
+            print(f"\nFlushed {len(written)} changed file(s)")
+            patch_cache.save()
+            patch_journal.save()
     except Exception as e:
-        print(f"❌ Failed to run script {key}: {e}")
-        return False
+        print(f"❌ {type(e).__name__}: {e}", file=output)
+        fail_count = max(fail_count, 1)
+    finally:
+        os.chdir(cwd)
+        patch_events.open_stream(stream)
+    return {'root': root, 'succeeded': success_count, 'failed': fail_count,
+            'output': output.getvalue(), 'events': events.getvalue(), 'duration': time.perf_counter() - start}
+
+def run_batch(selection, roots, jobs, use_cache):
+    """
+    Apply the selection to several checkouts, one checkout per pool worker.
+    The scripts, their compiled patterns and their manifests and templates
+    are loaded here first, so forked workers inherit them rather than each
+    loading its own.
+    """
+    for key in dict.fromkeys(selection):
+        load_entry_point(key)
+        name = patch_manifest.name_for(SCRIPT_MAP[key]['file'])
+        if name:
+            patch_manifest.preload(name)
+    if jobs <= 1:
+        jobs = min(len(roots), os.cpu_count() or 1)
+    start = time.perf_counter()
+    results = []
+
+    def report_root(result):
+        print(f"\n{'=' * 50}\n📁 {result['root']}")
+        print(result['output'], end='')
+        for line in result['events'].splitlines():
+            patch_events.emit(dict(json.loads(line), root=result['root']))
+        patch_events.emit({'event': 'summary', 'root': result['root'], 'succeeded': result['succeeded'],
+                           'failed': result['failed'], 'duration': result['duration']})
+        results.append(result)
+
+    if jobs > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        print(f"Patching {len(roots)} checkouts with {jobs} workers")
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+            futures = [pool.submit(apply_to_root, root, selection, use_cache) for root in roots]
+            for future in as_completed(futures):
+                report_root(future.result())
+    else:
+        print(f"Patching {len(roots)} checkouts one at a time")
+        for root in roots:
+            report_root(apply_to_root(root, selection, use_cache))
+
+    print("\n" + "=" * 50)
+    failed = [result for result in results if result['failed']]
+    print(f"Batch Summary: {len(results)} checkout(s), {len(results) - len(failed)} clean, "
+          f"{len(failed)} with failures")
+    print(f"Wall-clock time: {time.perf_counter() - start:.2f}s")
+    for result in sorted(results, key=lambda result: result['root']):
+        print(f"  {result['root']}: {result['succeeded']} succeeded, {result['failed']} failed "
+              f"({result['duration']:.2f}s)")
+    print("=" * 50)
+
+def print_summary(success_count, fail_count, wall_time, timings):
+    patch_events.emit({'event': 'summary', 'succeeded': success_count, 'failed': fail_count,
+                       'duration': wall_time})
+    print("\n" + "=" * 50)
+    print(f"Execution Summary: {success_count} succeeded, {fail_count} failed")
+    print(f"Wall-clock time: {wall_time:.2f}s")
+    for key, duration in sorted(timings.items()):
+        print(f"  {key}: {duration:.2f}s  {SCRIPT_MAP[key]['file']}")
+    print("=" * 50)
 
 def main():
     parser = argparse.ArgumentParser(description='Run multiple social-app setup scripts in sequence.')
     parser.add_argument('scripts', nargs='?', help='String of script keys to run (e.g. "ABC") or "1" for all.')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Run scripts that touch different files concurrently with N workers. '
+                             'With several --root, patch N checkouts at once (default: one per CPU).')
+    parser.add_argument('--root', action='append', metavar='DIR',
+                        help='Checkout to patch (default: the current directory). Give it more than once '
+                             'to apply the same scripts to every checkout, in parallel.')
+    parser.add_argument('--in-process', action='store_true',
+                        help='Import each script once and call its entry point instead of starting a new interpreter.')
+    parser.add_argument('--pattern-cache', action='store_true',
+                        help='Reuse compiled regex programs saved under .patch-cache/ by the previous in-process run.')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Run every script even if it and its target files are unchanged since its last success.')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Compute every edit in memory and print one unified diff instead of writing files.')
+    parser.add_argument('--diff', metavar='FILE', nargs='?', const='-',
+                        help='Like --dry-run, but write the diff to FILE (or stdout for "-").')
+    parser.add_argument('--profile', action='store_true',
+                        help='Time every script, file read/write and pattern applied, then print the hot spots.')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='With or without --profile, also write the timings as Chrome trace JSON to FILE.')
+    parser.add_argument('--pattern-budget', type=float, metavar='SECONDS',
+                        help='Abort a script when one regex application runs longer than this (default: %g, 0 disables).'
+                             % pattern_guard.DEFAULT_BUDGET)
+    parser.add_argument('--fuzzy-threshold', type=float, metavar='RATIO',
+                        help='Relocate a reformatted anchor only to a region at least this similar '
+                             '(default: %g, 0 disables).' % patch_fuzzy.THRESHOLD)
+    parser.add_argument('--json', action='store_true',
+                        help='Stream one JSON object per line to stdout for every patch operation, changed file '
+                             'and script result; progress goes to stderr.')
+    parser.add_argument('--check', action='store_true',
+                        help='Check that every anchor the selected scripts edit at is still in the checkout, '
+                             'without running them.')
+    parser.add_argument('--revert', action='store_true',
+                        help='Undo the edits the selected scripts made, as recorded in .patch-cache/journal.json.')
+    parser.add_argument('--watch', action='store_true',
+                        help='After the first run, re-run (in process) only the scripts whose target files change.')
+    parser.add_argument('--debounce', type=float, default=0.3, metavar='SECONDS',
+                        help='With --watch, wait for files to be quiet this long before re-running.')
+    parser.add_argument('--poll', action='store_true',
+                        help='With --watch, poll file stats instead of using inotify.')
     args = parser.parse_args()
-    
+
+    diff_target = args.diff or ('-' if args.dry_run else None)
+    if args.json:
+        if diff_target == '-':
+            parser.error("--json needs stdout; write the diff to a file with --diff FILE")
+        patch_events.enable()
+        patch_events.open_stream(sys.stdout)
+    # Keep stdout clean for the diff or the JSON events when they are streamed there
+    streaming = diff_target == '-' or args.json
+    quiet = contextlib.redirect_stdout(sys.stderr) if streaming else contextlib.nullcontext()
+    profiling = args.profile or args.trace
+    if args.pattern_budget is not None:
+        # Scripts run as subprocesses pick the budget up from the environment
+        os.environ['PATCH_PATTERN_BUDGET'] = str(args.pattern_budget)
+        pattern_guard.set_default_budget(args.pattern_budget)
+    if args.fuzzy_threshold is not None:
+        os.environ['PATCH_FUZZY_THRESHOLD'] = str(args.fuzzy_threshold)
+        patch_fuzzy.set_threshold(args.fuzzy_threshold)
+    if profiling:
+        patch_trace.enable()
+    with quiet:
+        start_ns = time.perf_counter_ns()
+        diff_text = run_selection(args, diff_target)
+        if profiling:
+            report_profile(args.trace, time.perf_counter_ns() - start_ns)
+    if diff_target is not None and diff_text is not None:
+        patch_io.write_diff(diff_text, diff_target)
+
+def report_profile(trace_file, wall_ns):
+    print("\nProfile (hot spots by total time; nested spans overlap)")
+    patch_trace.report(wall_ns=wall_ns)
+    scans = pattern_guard.summarize(patch_trace.events())
+    if scans:
+        print("\nPattern scans (text each guarded pattern had to scan, and how far its matches reached)")
+        pattern_guard.report(scans)
+    if trace_file:
+        patch_trace.write_chrome_trace(trace_file)
+        print(f"\nWrote Chrome trace to {trace_file} (open in chrome://tracing or ui.perfetto.dev)")
+
+def revert_selection(selection, diff_target=None):
+    """Undo the journaled edits of the selected scripts. For a dry run, returns the diff."""
+    script_files = [SCRIPT_MAP[key]['file'] for key in dict.fromkeys(selection)]
+    journaled = set(patch_journal.scripts())
+    for key in dict.fromkeys(selection):
+        if SCRIPT_MAP[key]['file'] not in journaled:
+            print(f"[{key}] Nothing journaled for {SCRIPT_MAP[key]['file']}")
+
+    diff_text = None
+    with patch_io.overlay(write=diff_target is None) as written:
+        reverted, conflicts = patch_journal.revert(script_files)
+        if diff_target is not None:
+            diff_text = patch_io.diff()
+    for path in reverted:
+        print(f"↩️  Reverted {os.path.relpath(path)}")
+    for path, script_file in sorted(conflicts.items()):
+        print(f"❌ Could not revert {os.path.relpath(path)}: edits by {script_file} no longer match; "
+              f"file left unchanged")
+
+    if diff_target is None:
+        print(f"\nReverted {len(written)} file(s), {len(conflicts)} conflict(s)")
+        for script_file in script_files:
+            # The scripts have to run again to re-apply their edits
+            patch_cache.forget(script_file)
+        patch_cache.save()
+        patch_journal.save()
+    else:
+        print(f"\nDry run: {len(reverted)} file(s) would be reverted, nothing written")
+    if conflicts and diff_target is None:
+        sys.exit(1)
+    return diff_text
+
+def run_selection(args, diff_target=None):
+    """Run the selected scripts. For a dry run, returns the combined diff."""
     # If no arguments provided, show menu and interactive prompt
     if not args.scripts:
         print_menu()
@@ -98,21 +658,95 @@ def main():
         # If running from arg, we proceed. If interactive, user just pressed enter.
         
     print(f"\nStarting execution of sequence: {selection}")
+
+    roots = [os.path.abspath(root) for root in dict.fromkeys(args.root or [])]
+    for root in roots:
+        if not os.path.isdir(root):
+            print(f"Error: Checkout not found: {root}")
+            sys.exit(1)
+    if len(roots) > 1 and (args.check or args.revert or args.watch or diff_target is not None):
+        print("Error: --check, --revert, --watch and --dry-run/--diff take a single --root")
+        sys.exit(1)
+    if len(roots) == 1:
+        # The scripts' paths are relative to the checkout root
+        os.chdir(roots[0])
+
+    if diff_target is not None:
+        # Every edit has to land in one shared in-memory overlay
+        if args.jobs > 1:
+            print("Dry run: ignoring --jobs, scripts run in sequence in this process")
+        args.jobs = 1
+        args.in_process = True
+
+    # Catch a broken manifest before any script has written anything
+    manifest_names = [patch_manifest.name_for(SCRIPT_MAP[key]['file']) for key in dict.fromkeys(selection)]
+    manifest_errors = patch_manifest.check(name for name in manifest_names if name)
+    if manifest_errors and not args.revert:
+        for error in manifest_errors:
+            print(f"❌ Invalid manifest {error}")
+        sys.exit(1)
+
+    if args.pattern_cache:
+        pattern_registry.load_cache()
+    if len(roots) > 1:
+        run_batch(selection, roots, args.jobs, not args.no_cache)
+        return None
+    patch_cache.load()
+    patch_journal.load()
+    use_cache = not args.no_cache
+
+    if args.check:
+        script_files = [SCRIPT_MAP[key]['file'] for key in dict.fromkeys(selection)]
+        if not patch_check.run(script_files, {info['file']: key for key, info in SCRIPT_MAP.items()}):
+            sys.exit(1)
+        return None
+
+    if args.revert:
+        return revert_selection(selection, diff_target)
+
+    if args.watch:
+        if diff_target is not None:
+            print("Error: --watch cannot be combined with --dry-run/--diff")
+            sys.exit(1)
+        watch(selection, use_cache, args.debounce, args.poll)
+        return None
     
     success_count = 0
     fail_count = 0
-    
-    for key in selection:
-        if run_script(key):
-            success_count += 1
-        else:
-            fail_count += 1
-            # Option: Stop on failure? For now, we continue.
-            print(f"⚠️  Continuing to next script...")
-            
-    print("\n" + "=" * 50)
-    print(f"Execution Summary: {success_count} succeeded, {fail_count} failed")
-    print("=" * 50)
+    timings = {}
+    diff_text = None
+    start = time.perf_counter()
+
+    if args.jobs > 1:
+        print(f"Running with {args.jobs} parallel jobs (scripts sharing files stay serialized)")
+        success_count, fail_count = run_parallel(selection, args.jobs, timings, args.in_process, use_cache)
+    else:
+        # In-process runs share one overlay so each file is read and written once
+        shared = patch_io.overlay(write=diff_target is None) if args.in_process else contextlib.nullcontext([])
+        with shared as written:
+            for key in selection:
+                if run_script(key, timings, args.in_process, use_cache):
+                    success_count += 1
+                else:
+                    fail_count += 1
+                    # Option: Stop on failure? For now, we continue.
+                    print(f"⚠️  Continuing to next script...")
+            if diff_target is not None:
+                diff_text = patch_io.diff()
+                print(f"\nDry run: {diff_text.count('diff --git ')} file(s) would change, nothing written")
+        if args.in_process:
+            if diff_target is None:
+                print(f"\nFlushed {len(written)} changed file(s)")
+            pattern_registry.report()
+            if args.pattern_cache:
+                pattern_registry.save_cache()
+    # Runs recorded during a dry run describe files that were never written
+    if diff_target is None:
+        patch_cache.save()
+        patch_journal.save()
+
+    print_summary(success_count, fail_count, time.perf_counter() - start, timings)
+    return diff_text
 
 if __name__ == "__main__":
     main()
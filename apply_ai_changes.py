@@ -1,1294 +1,133 @@
 import os
-import re
-
-# 1. New Component: AIOptionCard.tsx
-# 1. New Component: AIOptionCard.tsx
-AI_OPTION_CARD_CONTENT = """import { useState } from 'react'
-import { Pressable, StyleSheet, View, Platform } from 'react-native'
-
-import { atoms as a, useTheme } from '#/alf'
-import { Text } from '#/components/Typography'
-
-const isWeb = Platform.OS === 'web'
-
-export interface AIOptionCardProps {
-    title: string
-    description?: string
-    videoUrl?: string
-    isSelected: boolean
-    onSelect: () => void
-}
-
-export function AIOptionCard({
-    title,
-    description,
-    videoUrl,
-    isSelected,
-    onSelect,
-}: AIOptionCardProps) {
-    const t = useTheme()
-    const [isHovered, setIsHovered] = useState(false)
-
-    return (
-        <Pressable
-            onPress={onSelect}
-            onHoverIn={() => setIsHovered(true)}
-            onHoverOut={() => setIsHovered(false)}
-            accessibilityRole="button"
-            accessibilityLabel={title}
-            style={[
-                styles.card,
-                a.rounded_md,
-                a.overflow_hidden,
-                isSelected && styles.cardSelected,
-                isHovered && !isSelected && styles.cardHovered,
-                { borderColor: isSelected ? t.palette.primary_500 : t.palette.contrast_100 },
-            ]}>
-            {/* Video Background */}
-            <View style={[styles.videoContainer]}>
-                {videoUrl && isWeb ? (
-                    <video
-                        src={videoUrl}
-                        autoPlay
-                        loop
-                        muted
-                        playsInline
-                        style={{
-                            width: '100%',
-                            height: '100%',
-                            objectFit: 'cover',
-                        }}
-                    />
-                ) : (
-                    <View
-                        style={[
-                            styles.placeholderBg,
-                            { backgroundColor: t.palette.contrast_50 },
-                        ]}
-                    />
-                )}
-            </View>
-
-            {/* Gradient Overlay */}
-            <View style={[styles.gradientOverlay]} />
-
-            {/* Text Content */}
-            <View style={[styles.textContainer]}>
-                <Text style={[a.font_bold, a.text_lg, styles.title]}>{title}</Text>
-                {description && (
-                    <Text style={[a.text_sm, styles.description]} numberOfLines={2}>
-                        {description}
-                    </Text>
-                )}
-            </View>
-
-            {/* Selection Indicator */}
-            {isSelected && (
-                <View style={[styles.checkmark, { backgroundColor: t.palette.primary_500 }]}>
-                    <Text style={[a.text_xs, { color: '#fff' }]}>✓</Text>
-                </View>
-            )}
-        </Pressable>
-    )
-}
-
-const styles = StyleSheet.create({
-    card: {
-        position: 'relative',
-        aspectRatio: 16 / 9,
-        borderWidth: 2,
-        cursor: 'pointer',
-    },
-    cardSelected: {
-        transform: [{ scale: 0.98 }],
-    },
-    cardHovered: {
-        opacity: 0.9,
-    },
-    videoContainer: {
-        ...StyleSheet.absoluteFillObject,
-    },
-    placeholderBg: {
-        width: '100%',
-        height: '100%',
-    },
-    gradientOverlay: {
-        ...StyleSheet.absoluteFillObject,
-        // @ts-expect-error web only
-        background: 'linear-gradient(to bottom, transparent 40%, rgba(0,0,0,0.8) 100%)',
-    },
-    textContainer: {
-        position: 'absolute',
-        bottom: 0,
-        left: 0,
-        right: 0,
-        padding: 12,
-    },
-    title: {
-        color: '#ffffff',
-        textShadowColor: 'rgba(0, 0, 0, 0.5)',
-        textShadowOffset: { width: 0, height: 1 },
-        textShadowRadius: 2,
-    },
-    description: {
-        color: 'rgba(255, 255, 255, 0.9)',
-        marginTop: 4,
-    },
-    checkmark: {
-        position: 'absolute',
-        top: 8,
-        right: 8,
-        width: 24,
-        height: 24,
-        borderRadius: 12,
-        alignItems: 'center',
-        justifyContent: 'center',
-    },
-})
-"""
-
-# 2. New Component: MediaUploadSelector.tsx
-MEDIA_UPLOAD_SELECTOR_CONTENT = """import { useState } from 'react'
-import { Pressable, StyleSheet, View, Image, Platform } from 'react-native'
-import { msg } from '@lingui/macro'
-import { useLingui } from '@lingui/react'
-
-import { atoms as a, useTheme } from '#/alf'
-
-const isWeb = Platform.OS === 'web'
-
-import { Button, ButtonText } from '#/components/Button'
-import { Text } from '#/components/Typography'
-import { PlusLarge_Stroke2_Corner0_Rounded as PlusIcon } from '#/components/icons/Plus'
-import { CircleX_Stroke2_Corner0_Rounded as XIcon } from '#/components/icons/CircleX'
-import { openPicker } from '#/lib/media/picker.shared'
-import { pickVideo } from '#/view/com/composer/videos/pickVideo'
-
-export interface MediaFile {
-    uri: string
-    type: 'image' | 'video'
-    mimeType?: string
-}
-
-export interface MediaUploadSelectorProps {
-    label: string
-    acceptType: 'video' | 'images'
-    multiple?: boolean
-    optional?: boolean
-    files: MediaFile[]
-    onFilesChange: (files: MediaFile[]) => void
-}
-
-export function MediaUploadSelector({
-    label,
-    acceptType,
-    multiple = false,
-    optional = false,
-    files,
-    onFilesChange,
-}: MediaUploadSelectorProps) {
-    const { _ } = useLingui()
-    const t = useTheme()
-    const [isLoading, setIsLoading] = useState(false)
-
-    const handlePickMedia = async () => {
-        setIsLoading(true)
-        try {
-            if (acceptType === 'video') {
-                const result = await pickVideo()
-                if (!result.canceled && result.assets && result.assets.length > 0) {
-                    const asset = result.assets[0]
-                    onFilesChange([{
-                        uri: asset.uri,
-                        type: 'video',
-                        mimeType: asset.mimeType,
-                    }])
-                }
-            } else {
-                const result = await openPicker({
-                    selectionLimit: multiple ? 10 - files.length : 1,
-                    mediaTypes: ['images'],
-                })
-                if (result.length > 0) {
-                    const newFiles = result.map(img => ({
-                        uri: img.path,
-                        type: 'image' as const,
-                        mimeType: img.mime,
-                    }))
-                    // Append to existing files if multiple is enabled
-                    onFilesChange(multiple ? [...files, ...newFiles] : newFiles)
-                }
-            }
-        } catch (err) {
-            console.error('Failed to pick media:', err)
-        } finally {
-            setIsLoading(false)
-        }
-    }
-
-    const handleRemoveFile = (index: number) => {
-        onFilesChange(files.filter((_, i) => i !== index))
-    }
-
-    const hasFiles = files.length > 0
-
-    return (
-        <View style={[styles.container]}>
-            <View style={[a.flex_row, a.align_center, a.justify_between, a.mb_sm]}>
-                <Text style={[a.font_semi_bold, a.text_md]}>
-                    {label}
-                    {optional && (
-                        <Text style={[t.atoms.text_contrast_medium]}> (optional)</Text>
-                    )}
-                </Text>
-                {hasFiles && (
-                    <Text style={[a.text_sm, t.atoms.text_contrast_medium]}>
-                        {files.length} {files.length === 1 ? 'file' : 'files'}
-                    </Text>
-                )}
-            </View>
-
-            {hasFiles ? (
-                <View style={[styles.previewContainer, a.flex_row, a.flex_wrap, a.gap_sm]}>
-                    {files.map((file, index) => (
-                        <View key={index} style={[styles.previewItem]}>
-                            {file.type === 'image' ? (
-                                <Image
-                                    source={{ uri: file.uri }}
-                                    style={styles.previewImage}
-                                    resizeMode="cover"
-                                />
-                            ) : (
-                                <View style={[styles.videoPreview, { backgroundColor: t.palette.contrast_50 }]}>
-                                    {isWeb && (
-                                        <video
-                                            src={file.uri}
-                                            style={{ width: '100%', height: '100%', objectFit: 'cover' }}
-                                        />
-                                    )}
-                                </View>
-                            )}
-                            <Pressable
-                                onPress={() => handleRemoveFile(index)}
-                                style={[styles.removeButton, { backgroundColor: t.palette.negative_500 }]}
-                                accessibilityLabel={_(msg`Remove file`)}
-                                accessibilityRole="button">
-                                <XIcon size="xs" style={{ color: '#fff' }} />
-                            </Pressable>
-                        </View>
-                    ))}
-                    {multiple && files.length < 10 && (
-                        <Pressable
-                            onPress={handlePickMedia}
-                            style={[
-                                styles.addMoreButton,
-                                a.rounded_sm,
-                                {
-                                    borderColor: t.palette.contrast_200,
-                                    backgroundColor: t.palette.contrast_25,
-                                },
-                            ]}
-                            accessibilityLabel={_(msg`Add more`)}
-                            accessibilityRole="button">
-                            <PlusIcon size="md" style={t.atoms.text_contrast_medium} />
-                        </Pressable>
-                    )}
-                </View>
-            ) : (
-                <Pressable
-                    onPress={handlePickMedia}
-                    disabled={isLoading}
-                    style={[
-                        styles.dropzone,
-                        a.rounded_md,
-                        a.align_center,
-                        a.justify_center,
-                        {
-                            borderColor: t.palette.contrast_200,
-                            backgroundColor: t.palette.contrast_25,
-                        },
-                    ]}
-                    accessibilityLabel={_(msg`Upload ${acceptType}`)}
-                    accessibilityRole="button">
-                    <PlusIcon size="lg" style={t.atoms.text_contrast_medium} />
-                    <Text style={[a.text_sm, a.mt_sm, t.atoms.text_contrast_medium]}>
-                        {isLoading
-                            ? 'Loading...'
-                            : acceptType === 'video'
-                                ? _(msg`Select video`)
-                                : multiple
-                                    ? _(msg`Select images`)
-                                    : _(msg`Select image`)}
-                    </Text>
-                </Pressable>
-            )}
-        </View>
-    )
-}
-
-const styles = StyleSheet.create({
-    container: {
-        marginBottom: 16,
-    },
-    dropzone: {
-        borderWidth: 2,
-        borderStyle: 'dashed',
-        paddingVertical: 32,
-        paddingHorizontal: 16,
-        cursor: 'pointer',
-    },
-    previewContainer: {
-        minHeight: 80,
-    },
-    previewItem: {
-        position: 'relative',
-        width: 80,
-        height: 80,
-        borderRadius: 8,
-        overflow: 'hidden',
-    },
-    previewImage: {
-        width: '100%',
-        height: '100%',
-    },
-    videoPreview: {
-        width: '100%',
-        height: '100%',
-    },
-    removeButton: {
-        position: 'absolute',
-        top: 4,
-        right: 4,
-        width: 20,
-        height: 20,
-        borderRadius: 10,
-        alignItems: 'center',
-        justifyContent: 'center',
-    },
-    addMoreButton: {
-        width: 80,
-        height: 80,
-        borderWidth: 2,
-        borderStyle: 'dashed',
-        alignItems: 'center',
-        justifyContent: 'center',
-        cursor: 'pointer',
-    },
-})
-"""
-
-# 3. New Component: CreateWithAIDialog.tsx
-CREATE_WITH_AI_DIALOG_CONTENT = """import { useState, useCallback, useEffect } from 'react'
-import { View, StyleSheet, TextInput, ActivityIndicator, Image, Pressable } from 'react-native'
-import { msg, Trans } from '@lingui/macro'
-import { useLingui } from '@lingui/react'
-
-import { atoms as a, useTheme, useLayoutBreakpoints, web } from '#/alf'
-import { Button, ButtonText, ButtonIcon } from '#/components/Button'
-import * as Dialog from '#/components/Dialog'
-import { useDialogControl } from '#/components/Dialog'
-import { Text } from '#/components/Typography'
-import { ArrowLeft_Stroke2_Corner0_Rounded as ArrowLeftIcon } from '#/components/icons/Arrow'
-import { CircleX_Stroke2_Corner0_Rounded as XIcon } from '#/components/icons/CircleX'
-import { AIOptionCard } from './AIOptionCard'
-import { MediaUploadSelector, type MediaFile } from './MediaUploadSelector'
-import { openPicker } from '#/lib/media/picker.shared'
-
-// AI Creation styles
-const AI_OPTIONS = [
-    {
-        id: 'style-1',
-        title: 'Style 1',
-        description: 'Basic video creation',
-        videoUrl: '',
-    },
-    {
-        id: 'style-2',
-        title: 'Style 2',
-        description: 'Enhanced video creation',
-        videoUrl: '',
-    },
-    {
-        id: 'style-3',
-        title: 'Style 3',
-        description: 'Video with audio and script',
-        videoUrl: '',
-    },
-    {
-        id: 'style-4',
-        title: 'Style 4',
-        description: 'Advanced motion-based creation',
-        videoUrl: '',
-    },
-] as const
-
-type AIOptionId = typeof AI_OPTIONS[number]['id']
-
-// Steps: 1 = select style, 2 = upload media, 3 = loading (style 4 only), 4 = character/bg selection (style 4 only)
-type Step = 1 | 2 | 3 | 4
-
-interface MediaState {
-    motion: MediaFile[]
-    character: MediaFile[]
-    background: MediaFile[]
-    audio: MediaFile[]
-    objects: MediaFile[]
-    script: string
-}
-
-// Placeholder images for Style 4 character/object selection
-const PLACEHOLDER_CHARACTERS = [
-    { id: 'char1', uri: 'https://placehold.co/80x80/6366f1/ffffff?text=C1', refUri: 'https://placehold.co/24x24/6366f1/ffffff?text=R' },
-    { id: 'char2', uri: 'https://placehold.co/80x80/8b5cf6/ffffff?text=C2', refUri: 'https://placehold.co/24x24/8b5cf6/ffffff?text=R' },
-    { id: 'char3', uri: 'https://placehold.co/80x80/a855f7/ffffff?text=C3', refUri: 'https://placehold.co/24x24/a855f7/ffffff?text=R' },
-    { id: 'char4', uri: 'https://placehold.co/80x80/d946ef/ffffff?text=C4', refUri: 'https://placehold.co/24x24/d946ef/ffffff?text=R' },
-]
-
-const PLACEHOLDER_OBJECTS = [
-    { id: 'obj1', uri: 'https://placehold.co/80x80/22c55e/ffffff?text=O1', refUri: 'https://placehold.co/24x24/22c55e/ffffff?text=R' },
-    { id: 'obj2', uri: 'https://placehold.co/80x80/10b981/ffffff?text=O2', refUri: 'https://placehold.co/24x24/10b981/ffffff?text=R' },
-    { id: 'obj3', uri: 'https://placehold.co/80x80/14b8a6/ffffff?text=O3', refUri: 'https://placehold.co/24x24/14b8a6/ffffff?text=R' },
-    { id: 'obj4', uri: 'https://placehold.co/80x80/06b6d4/ffffff?text=O4', refUri: 'https://placehold.co/24x24/06b6d4/ffffff?text=R' },
-]
-
-export function CreateWithAIDialog({
-    control,
-}: {
-    control: Dialog.DialogControlProps
-}) {
-    const { _ } = useLingui()
-    const t = useTheme()
-    const { gtMobile } = useLayoutBreakpoints()
-
-    const [step, setStep] = useState<Step>(1)
-    const [selectedOption, setSelectedOption] = useState<AIOptionId | null>(null)
-    const [mediaState, setMediaState] = useState<MediaState>({
-        motion: [],
-        character: [],
-        background: [],
-        audio: [],
-        objects: [],
-        script: '',
-    })
-    const [selectedCharacters, setSelectedCharacters] = useState<string[]>([])
-    const [selectedObjects, setSelectedObjects] = useState<string[]>([])
-    const [customCharacterImages, setCustomCharacterImages] = useState<Record<string, string>>({})
-    const [customObjectImages, setCustomObjectImages] = useState<Record<string, string>>({})
-
-    const isStyle4 = selectedOption === 'style-4'
-    const isStyle3 = selectedOption === 'style-3'
-
-    const handleNext = useCallback(() => {
-        if (step === 1 && selectedOption) {
-            setStep(2)
-        } else if (step === 2 && isStyle4) {
-            // Style 4 goes to loading step
-            setStep(3)
-        }
-    }, [step, selectedOption, isStyle4])
-
-    const handleBack = useCallback(() => {
-        if (step === 2) {
-            setStep(1)
-        } else if (step === 3) {
-            setStep(2)
-        } else if (step === 4) {
-            setStep(2) // Go back to motion upload
-        }
-    }, [step])
-
-    // Simulate loading for Style 4
-    useEffect(() => {
-        if (step === 3 && isStyle4) {
-            const timer = setTimeout(() => {
-                setStep(4)
-            }, 2000)
-            return () => clearTimeout(timer)
-        }
-    }, [step, isStyle4])
-
-    const handleClose = useCallback(() => {
-        control.close()
-        setTimeout(() => {
-            setStep(1)
-            setSelectedOption(null)
-            setMediaState({
-                motion: [],
-                character: [],
-                background: [],
-                audio: [],
-                objects: [],
-                script: '',
-            })
-            setSelectedCharacters([])
-            setSelectedObjects([])
-            setCustomCharacterImages({})
-            setCustomObjectImages({})
-        }, 300)
-    }, [control])
-
-    const handleCreate = useCallback(() => {
-        console.log('Creating with AI:', {
-            option: selectedOption,
-            media: mediaState,
-            selectedCharacters,
-            selectedObjects,
-        })
-        handleClose()
-    }, [selectedOption, mediaState, selectedCharacters, selectedObjects, handleClose])
-
-    const toggleCharacter = (id: string) => {
-        setSelectedCharacters(prev =>
-            prev.includes(id) ? prev.filter(c => c !== id) : [...prev, id]
-        )
-    }
-
-    const toggleObject = (id: string) => {
-        setSelectedObjects(prev =>
-            prev.includes(id) ? prev.filter(o => o !== id) : [...prev, id]
-        )
-    }
-
-    const handlePickCharacterImage = async (charId: string) => {
-        try {
-            const result = await openPicker({ selectionLimit: 1, mediaTypes: ['images'] })
-            if (result.length > 0) {
-                setCustomCharacterImages(prev => ({ ...prev, [charId]: result[0].path }))
-                if (!selectedCharacters.includes(charId)) {
-                    setSelectedCharacters(prev => [...prev, charId])
-                }
-            }
-        } catch (err) {
-            console.error('Failed to pick image:', err)
-        }
-    }
-
-    const handlePickObjectImage = async (objId: string) => {
-        try {
-            const result = await openPicker({ selectionLimit: 1, mediaTypes: ['images'] })
-            if (result.length > 0) {
-                setCustomObjectImages(prev => ({ ...prev, [objId]: result[0].path }))
-                if (!selectedObjects.includes(objId)) {
-                    setSelectedObjects(prev => [...prev, objId])
-                }
-            }
-        } catch (err) {
-            console.error('Failed to pick image:', err)
-        }
-    }
-
-    const handleRemoveCharacter = (charId: string) => {
-        setSelectedCharacters(prev => prev.filter(c => c !== charId))
-        setCustomCharacterImages(prev => {
-            const updated = { ...prev }
-            delete updated[charId]
-            return updated
-        })
-    }
-
-    const handleRemoveObject = (objId: string) => {
-        setSelectedObjects(prev => prev.filter(o => o !== objId))
-        setCustomObjectImages(prev => {
-            const updated = { ...prev }
-            delete updated[objId]
-            return updated
-        })
-    }
-
-    const canProceedStep1 = selectedOption !== null
-    const canProceedStep2 = mediaState.motion.length > 0 && (isStyle4 || mediaState.character.length > 0)
-    const canCreate = isStyle4
-        ? mediaState.motion.length > 0
-        : mediaState.motion.length > 0 && mediaState.character.length > 0
-
-    const getTotalSteps = () => {
-        if (isStyle4) return 4
-        return 2
-    }
-
-    const getStepDisplay = () => {
-        if (isStyle4) {
-            if (step === 3) return '3' // Loading
-            if (step === 4) return '4'
-        }
-        return step.toString()
-    }
-
-    return (
-        <Dialog.Outer
-            control={control}
-            nativeOptions={{ sheet: { snapPoints: ['100%'] } }}>
-            <Dialog.Handle />
-            <Dialog.ScrollableInner
-                label={_(msg`Create with AI`)}
-                style={[
-                    web({ maxWidth: gtMobile ? 600 : '100%', width: '100%' }),
-                    !gtMobile && { minHeight: '100%', paddingHorizontal: 12 },
-                ]}>
-                {/* Header */}
-                <View style={[a.flex_row, a.align_center, a.gap_sm, a.mb_lg]}>
-                    {step > 1 && step !== 3 && (
-                        <Button
-                            label={_(msg`Back`)}
-                            variant="ghost"
-                            size="small"
-                            onPress={handleBack}>
-                            <ButtonIcon icon={ArrowLeftIcon} />
-                        </Button>
-                    )}
-                    <Text style={[a.flex_1, a.font_bold, a.text_xl]}>
-                        {step === 1 && <Trans>Create with AI</Trans>}
-                        {step === 2 && <Trans>Upload Media</Trans>}
-                        {step === 3 && <Trans>Processing...</Trans>}
-                        {step === 4 && <Trans>Select Assets</Trans>}
-                    </Text>
-                    <Text style={[a.text_sm, t.atoms.text_contrast_medium]}>
-                        {getStepDisplay()}/{getTotalSteps()}
-                    </Text>
-                </View>
-
-                {step === 1 && (
-                    /* Step 1: Select AI Option */
-                    <View>
-                        <Text style={[a.text_md, a.mb_lg, t.atoms.text_contrast_medium]}>
-                            <Trans>Choose a creation style</Trans>
-                        </Text>
-                        <View
-                            style={[
-                                styles.cardGrid,
-                                gtMobile ? styles.cardGridDesktop : styles.cardGridMobile,
-                            ]}>
-                            {AI_OPTIONS.map(option => (
-                                <View
-                                    key={option.id}
-                                    style={gtMobile ? styles.cardDesktop : undefined}>
-                                    <AIOptionCard
-                                        title={option.title}
-                                        description={option.description}
-                                        videoUrl={option.videoUrl}
-                                        isSelected={selectedOption === option.id}
-                                        onSelect={() => setSelectedOption(option.id)}
-                                    />
-                                </View>
-                            ))}
-                        </View>
-                        <View style={[a.mt_xl]}>
-                            <Button
-                                label={_(msg`Next`)}
-                                variant="solid"
-                                color="primary"
-                                size="large"
-                                disabled={!canProceedStep1}
-                                onPress={handleNext}>
-                                <ButtonText>
-                                    <Trans>Next</Trans>
-                                </ButtonText>
-                            </Button>
-                        </View>
-                    </View>
-                )}
-
-                {step === 2 && (
-                    /* Step 2: Upload Media */
-                    <View>
-                        <Text style={[a.text_md, a.mb_lg, t.atoms.text_contrast_medium]}>
-                            <Trans>Upload your media assets</Trans>
-                        </Text>
-
-                        <MediaUploadSelector
-                            label={_(msg`Motion`)}
-                            acceptType="video"
-                            files={mediaState.motion}
-                            onFilesChange={files =>
-                                setMediaState(prev => ({ ...prev, motion: files }))
-                            }
-                        />
-
-                        {/* Style 1, 2, 3 show character and background */}
-                        {!isStyle4 && (
-                            <>
-                                <MediaUploadSelector
-                                    label={_(msg`Character`)}
-                                    acceptType="images"
-                                    multiple
-                                    files={mediaState.character}
-                                    onFilesChange={files =>
-                                        setMediaState(prev => ({ ...prev, character: files }))
-                                    }
-                                />
-
-                                <MediaUploadSelector
-                                    label={_(msg`Background`)}
-                                    acceptType="images"
-                                    optional
-                                    files={mediaState.background}
-                                    onFilesChange={files =>
-                                        setMediaState(prev => ({ ...prev, background: files }))
-                                    }
-                                />
-                            </>
-                        )}
-
-                        {/* Style 3 adds Audio and Script */}
-                        {isStyle3 && (
-                            <>
-                                <MediaUploadSelector
-                                    label={_(msg`Audio`)}
-                                    acceptType="video" // Using video picker for audio files
-                                    optional
-                                    files={mediaState.audio}
-                                    onFilesChange={files =>
-                                        setMediaState(prev => ({ ...prev, audio: files }))
-                                    }
-                                />
-
-                                <View style={[a.mb_md]}>
-                                    <Text style={[a.font_semi_bold, a.text_md, a.mb_sm]}>
-                                        <Trans>Script/Dialogue</Trans>
-                                    </Text>
-                                    <TextInput
-                                        style={[
-                                            styles.textInput,
-                                            {
-                                                backgroundColor: t.palette.contrast_25,
-                                                borderColor: t.palette.contrast_200,
-                                                color: t.atoms.text.color,
-                                            },
-                                        ]}
-                                        multiline
-                                        numberOfLines={4}
-                                        placeholder={_(msg`Enter your script or dialogue...`)}
-                                        placeholderTextColor={t.palette.contrast_400}
-                                        value={mediaState.script}
-                                        onChangeText={text =>
-                                            setMediaState(prev => ({ ...prev, script: text }))
-                                        }
-                                    />
-                                </View>
-                            </>
-                        )}
-
-                        <View style={[a.mt_lg]}>
-                            <Button
-                                label={isStyle4 ? _(msg`Next`) : _(msg`Create`)}
-                                variant="solid"
-                                color="primary"
-                                size="large"
-                                disabled={isStyle4 ? mediaState.motion.length === 0 : !canCreate}
-                                onPress={isStyle4 ? handleNext : handleCreate}>
-                                <ButtonText>
-                                    {isStyle4 ? <Trans>Next</Trans> : <Trans>Create</Trans>}
-                                </ButtonText>
-                            </Button>
-                        </View>
-                    </View>
-                )}
-
-                {step === 3 && (
-                    /* Step 3: Loading (Style 4 only) */
-                    <View style={[a.align_center, a.justify_center, { minHeight: 300 }]}>
-                        <ActivityIndicator size="large" color={t.palette.primary_500} />
-                        <Text style={[a.text_lg, a.mt_lg, a.font_semi_bold]}>
-                            <Trans>Loading...</Trans>
-                        </Text>
-                        <Text style={[a.text_md, a.mt_sm, t.atoms.text_contrast_medium]}>
-                            <Trans>Analyzing your motion video</Trans>
-                        </Text>
-                    </View>
-                )}
-
-                {step === 4 && (
-                    /* Step 4: Character/Background/Objects Selection (Style 4 only) */
-                    <View>
-                        <Text style={[a.text_md, a.mb_lg, t.atoms.text_contrast_medium]}>
-                            <Trans>Select characters, background, and objects</Trans>
-                        </Text>
-
-                        {/* Character Selection with placeholders */}
-                        <View style={[a.mb_lg]}>
-                            <Text style={[a.font_semi_bold, a.text_md, a.mb_sm]}>
-                                <Trans>Character</Trans>
-                            </Text>
-                            <View style={[a.flex_row, a.flex_wrap, a.gap_sm]}>
-                                {PLACEHOLDER_CHARACTERS.map(char => (
-                                    <Pressable
-                                        key={char.id}
-                                        onPress={() => handlePickCharacterImage(char.id)}
-                                        style={[
-                                            styles.placeholderItem,
-                                            selectedCharacters.includes(char.id) && {
-                                                borderColor: t.palette.primary_500,
-                                                borderWidth: 3,
-                                            },
-                                        ]}>
-                                        <Image
-                                            source={{ uri: customCharacterImages[char.id] || char.uri }}
-                                            style={styles.placeholderImage}
-                                        />
-                                        {/* Corner reference thumbnail */}
-                                        <View style={styles.cornerThumbnail}>
-                                            <Image
-                                                source={{ uri: char.refUri }}
-                                                style={styles.cornerThumbnailImage}
-                                            />
-                                        </View>
-                                        {selectedCharacters.includes(char.id) && (
-                                            <Pressable
-                                                onPress={(e) => {
-                                                    e.stopPropagation()
-                                                    handleRemoveCharacter(char.id)
-                                                }}
-                                                style={[styles.deleteButton, { backgroundColor: t.palette.negative_500 }]}>
-                                                <XIcon size="xs" style={{ color: '#fff' }} />
-                                            </Pressable>
-                                        )}
-                                    </Pressable>
-                                ))}
-                            </View>
-                        </View>
-
-                        {/* Background Upload */}
-                        <MediaUploadSelector
-                            label={_(msg`Background`)}
-                            acceptType="images"
-                            optional
-                            files={mediaState.background}
-                            onFilesChange={files =>
-                                setMediaState(prev => ({ ...prev, background: files }))
-                            }
-                        />
-
-                        {/* Objects Selection with placeholders */}
-                        <View style={[a.mb_lg]}>
-                            <Text style={[a.font_semi_bold, a.text_md, a.mb_sm]}>
-                                <Trans>Objects</Trans>
-                                <Text style={[t.atoms.text_contrast_medium]}> (optional)</Text>
-                            </Text>
-                            <View style={[a.flex_row, a.flex_wrap, a.gap_sm]}>
-                                {PLACEHOLDER_OBJECTS.map(obj => (
-                                    <Pressable
-                                        key={obj.id}
-                                        onPress={() => handlePickObjectImage(obj.id)}
-                                        style={[
-                                            styles.placeholderItem,
-                                            selectedObjects.includes(obj.id) && {
-                                                borderColor: t.palette.primary_500,
-                                                borderWidth: 3,
-                                            },
-                                        ]}>
-                                        <Image
-                                            source={{ uri: customObjectImages[obj.id] || obj.uri }}
-                                            style={styles.placeholderImage}
-                                        />
-                                        {/* Corner reference thumbnail */}
-                                        <View style={styles.cornerThumbnail}>
-                                            <Image
-                                                source={{ uri: obj.refUri }}
-                                                style={styles.cornerThumbnailImage}
-                                            />
-                                        </View>
-                                        {selectedObjects.includes(obj.id) && (
-                                            <Pressable
-                                                onPress={(e) => {
-                                                    e.stopPropagation()
-                                                    handleRemoveObject(obj.id)
-                                                }}
-                                                style={[styles.deleteButton, { backgroundColor: t.palette.negative_500 }]}>
-                                                <XIcon size="xs" style={{ color: '#fff' }} />
-                                            </Pressable>
-                                        )}
-                                    </Pressable>
-                                ))}
-                            </View>
-                        </View>
-
-                        <View style={[a.mt_lg]}>
-                            <Button
-                                label={_(msg`Create`)}
-                                variant="solid"
-                                color="primary"
-                                size="large"
-                                onPress={handleCreate}>
-                                <ButtonText>
-                                    <Trans>Create</Trans>
-                                </ButtonText>
-                            </Button>
-                        </View>
-                    </View>
-                )}
-
-                <Dialog.Close />
-            </Dialog.ScrollableInner>
-        </Dialog.Outer>
-    )
-}
-
-export function useCreateWithAIDialog() {
-    return useDialogControl()
-}
-
-const styles = StyleSheet.create({
-    cardGrid: {
-        gap: 8,
-    },
-    cardGridDesktop: {
-        flexDirection: 'row',
-        flexWrap: 'wrap',
-    },
-    cardGridMobile: {
-        flexDirection: 'column',
-    },
-    cardDesktop: {
-        // @ts-expect-error web only
-        flexBasis: 'calc(50% - 4px)',
-        maxWidth: 'calc(50% - 4px)',
-    },
-    textInput: {
-        borderWidth: 1,
-        borderRadius: 8,
-        padding: 12,
-        minHeight: 100,
-        textAlignVertical: 'top',
-    },
-    placeholderItem: {
-        width: 70,
-        height: 70,
-        borderRadius: 8,
-        overflow: 'hidden',
-        borderWidth: 2,
-        borderColor: 'transparent',
-        cursor: 'pointer',
-    },
-    placeholderImage: {
-        width: '100%',
-        height: '100%',
-    },
-    deleteButton: {
-        position: 'absolute',
-        top: 4,
-        right: 4,
-        width: 20,
-        height: 20,
-        borderRadius: 10,
-        alignItems: 'center',
-        justifyContent: 'center',
-    },
-    cornerThumbnail: {
-        position: 'absolute',
-        bottom: 4,
-        left: 4,
-        width: 24,
-        height: 24,
-        borderRadius: 4,
-        overflow: 'hidden',
-        borderWidth: 1,
-        borderColor: 'rgba(255,255,255,0.5)',
-    },
-    cornerThumbnailImage: {
-        width: '100%',
-        height: '100%',
-    },
-})
-"""
-
-def write_file(path, content):
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(content)
-    print(f"Written: {path}")
+import sys
+
+import patch_events
+import patch_io
+import patch_manifest
+import pattern_guard
+import pattern_registry
+import tsx_tree
+
+MANIFEST = 'apply_ai_changes'
+
+USE_DIALOG_CONTROL_IMPORT_RE = pattern_registry.compile(
+    r"import \{[^}]*useDialogControl[^}]*\}", name='useDialogControl import'
+)
+DIALOG_IMPORT_RE = pattern_registry.compile(
+    r"import \{([^}]*)\} from '#/components/Dialog'", name='#/components/Dialog import'
+)
+CREATE_WITH_AI_BTN_RE = pattern_registry.compile(
+    r"function CreateWithAIBtn\(\) \{[\s\S]*?\n\}", name='CreateWithAIBtn function'
+)
+# Robust regex specifically targeting the hasSession FAB block
+COMPOSE_FAB_RE = pattern_registry.compile(
+    r"\{hasSession && \(\s*<FAB[\s\S]*?testID=\"composeFAB\"[\s\S]*?/>\s*\)\}", name='hasSession compose FAB'
+)
+
+def find_create_with_ai_btn(path, content):
+    """Span of an existing CreateWithAIBtn function, or None."""
+    try:
+        declaration = tsx_tree.parse(content).find_declaration('CreateWithAIBtn')
+    except tsx_tree.TsxSyntaxError as e:
+        patch_events.note(f"Warning: could not parse {path} ({e}), falling back to regex match", 'warning', path)
+        match = CREATE_WITH_AI_BTN_RE.search(content)
+        return match.span() if match else None
+    return (declaration.start, declaration.end) if declaration else None
 
 def update_left_nav(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = patch_io.read_file(path)
 
     # Add imports
     if "Sparkle_Stroke2_Corner0_Rounded as SparkleIcon" not in content:
-        content = content.replace(
+        content = patch_events.replace(
+            content,
             "import {PlusLarge_Stroke2_Corner0_Rounded as PlusIcon} from '#/components/icons/Plus'",
-            "import {PlusLarge_Stroke2_Corner0_Rounded as PlusIcon} from '#/components/icons/Plus'\nimport {Sparkle_Stroke2_Corner0_Rounded as SparkleIcon} from '#/components/icons/Sparkle'"
+            "import {PlusLarge_Stroke2_Corner0_Rounded as PlusIcon} from '#/components/icons/Plus'\nimport {Sparkle_Stroke2_Corner0_Rounded as SparkleIcon} from '#/components/icons/Sparkle'",
+            path
         )
     if "CreateWithAIDialog" not in content:
-        content = content.replace(
+        content = patch_events.replace(
+            content,
             "from '#/components/Button'",
-            "from '#/components/Button'\nimport {CreateWithAIDialog} from '#/components/dialogs/CreateWithAIDialog'"
+            "from '#/components/Button'\nimport {CreateWithAIDialog} from '#/components/dialogs/CreateWithAIDialog'",
+            path
         )
     # Add useDialogControl import
-    if not re.search(r"import \{[^}]*useDialogControl[^}]*\}", content):
+    if not USE_DIALOG_CONTROL_IMPORT_RE.search(content):
         if "#/components/Dialog" in content:
-            content = re.sub(r"import \{([^}]*)\} from '#/components/Dialog'", r"import {\1, useDialogControl} from '#/components/Dialog'", content)
+            content = pattern_guard.sub(DIALOG_IMPORT_RE, r"import {\1, useDialogControl} from '#/components/Dialog'",
+                                        content, path=path)
         else:
-             content = content.replace(
+             content = patch_events.replace(
+                content,
                 "from '#/components/Button'",
-                "from '#/components/Button'\nimport {useDialogControl} from '#/components/Dialog'"
+                "from '#/components/Button'\nimport {useDialogControl} from '#/components/Dialog'",
+                path
             )
 
     # Replacement for CreateWithAIBtn function
-    new_create_btn = """function CreateWithAIBtn() {
-  const { _ } = useLingui()
-  const { leftNavMinimal } = useLayoutBreakpoints()
-  const dialogControl = useDialogControl()
-
-  if (leftNavMinimal) {
-    return (
-      <>
-        <View style={[a.flex_row, a.justify_center, a.pt_xl]}>
-          <View
-            style={[
-              a.rounded_full,
-              {
-                // @ts-expect-error web only
-                background:
-                  'linear-gradient(135deg, #8B5CF6 0%, #EC4899 50%, #F59E0B 100%)',
-                padding: 12,
-                cursor: 'pointer',
-              },
-            ]}
-            // @ts-expect-error web only
-            onClick={dialogControl.open}>
-            <SparkleIcon size="lg" style={{ color: '#fff' }} />
-          </View>
-        </View>
-        <CreateWithAIDialog control={dialogControl} />
-      </>
-    )
-  }
-
-  return (
-    <>
-      <View style={[a.flex_row, a.pl_md, a.pt_xl]}>
-        <Button
-          label={_(msg`Create with AI`)}
-          onPress={dialogControl.open}
-          size="large"
-          variant="solid"
-          color="primary"
-          style={[a.rounded_full, {
-            // @ts-expect-error web only
-            background: 'linear-gradient(135deg, #8B5CF6 0%, #EC4899 50%, #F59E0B 100%)',
-          }]}>
-          <ButtonText>
-            <Trans>Create with AI</Trans>
-          </ButtonText>
-        </Button>
-      </View>
-      <CreateWithAIDialog control={dialogControl} />
-    </>
-  )
-}"""
+    new_create_btn = patch_manifest.template(MANIFEST, 'CreateWithAIBtn.tsx.tmpl')
 
     # Add or Replace CreateWithAIBtn
-    pattern = r"function CreateWithAIBtn\(\) \{[\s\S]*?\n\}"
-    if re.search(pattern, content):
-        content = re.sub(pattern, new_create_btn, content)
+    span = find_create_with_ai_btn(path, content)
+    if span is not None:
+        with patch_events.operation(path, 'CreateWithAIBtn') as op:
+            new_content = tsx_tree.apply_edits(content, [(span[0], span[1], new_create_btn)])
+            op.update(status='applied' if new_content != content else 'already',
+                      before=content, after=new_content)
+            content = new_content
     else:
         # Insert before DesktopLeftNav
-        content = content.replace("export function DesktopLeftNav()", new_create_btn + "\n\nexport function DesktopLeftNav()")
+        content = patch_events.replace(content, "export function DesktopLeftNav()", new_create_btn + "\n\nexport function DesktopLeftNav()", path)
 
     # Remove ComposeBtn usage and insert CreateWithAIBtn usage
     if "<CreateWithAIBtn />" not in content:
         # If ComposeBtn is still there, replace it
         if "<ComposeBtn />" in content:
-            content = content.replace("<ComposeBtn />", "<CreateWithAIBtn />")
+            content = patch_events.replace(content, "<ComposeBtn />", "<CreateWithAIBtn />", path)
         else:
             # Otherwise insert after Settings NavItem
             settings_marker = 'label={_(msg`Settings`)}\n          />'
             if settings_marker in content:
-                content = content.replace(settings_marker, settings_marker + "\n          <CreateWithAIBtn />")
+                content = patch_events.replace(content, settings_marker, settings_marker + "\n          <CreateWithAIBtn />", path)
 
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    patch_io.write_file(path, content)
     print(f"Updated: {path}")
 
 def update_feed_page(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = patch_io.read_file(path)
 
     # Match the {hasSession && ( ... <FAB testID="composeFAB" ... /> ... )} block
     replacement = "      {/* FABs removed - Create AI button moved to navigation bars */}"
     
-    # Robust regex specifically targeting the hasSession FAB block
-    pattern = r"\{hasSession && \(\s*<FAB[\s\S]*?testID=\"composeFAB\"[\s\S]*?/>\s*\)\}"
-    
-    if re.search(pattern, content):
-        content = re.sub(pattern, replacement, content)
+    if COMPOSE_FAB_RE.search(content):
+        content = pattern_guard.sub(COMPOSE_FAB_RE, replacement, content, path=path)
     
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    patch_io.write_file(path, content)
     print(f"Updated: {path}")
 
-def update_bottom_bar(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Add imports
-    if "Sparkle_Stroke2_Corner0_Rounded as SparkleIcon" not in content:
-        # Add imports near other component imports
-        content = content.replace(
-            "import {styles} from './BottomBarStyles'",
-            "import {styles} from './BottomBarStyles'\nimport { CreateWithAIDialog } from '#/components/dialogs/CreateWithAIDialog'\nimport { Sparkle_Stroke2_Corner0_Rounded as SparkleIcon } from '#/components/icons/Sparkle'\nimport { useDialogControl } from '#/components/Dialog'"
-        )
-
-    # Initialize hook
-    if "const aiDialogControl = useDialogControl()" not in content:
-        content = content.replace(
-            "export function BottomBarWeb() {",
-            "export function BottomBarWeb() {\n  const aiDialogControl = useDialogControl()"
-        )
-
-    # Add Create AI button JSX
-    # We want to insert it between Search and Notifications
-    # Locate NavItem for Search
-    marker = """          <NavItem routeName="Search" href="/search">
-            {({isActive}) => {
-              const Icon = isActive ? MagnifyingGlassFilled : MagnifyingGlass
-              return (
-                <Icon
-                  aria-hidden={true}
-                  width={iconWidth + 2}
-                  style={[styles.ctrlIcon, t.atoms.text, styles.searchIcon]}
-                />
-              )
-            }}
-          </NavItem>"""
-          
-    if "SparkleIcon" not in content and marker in content:
-        # Check if we already have the button block to avoid duplicating if the script is run multiple times
-        # identifying it by the comment or unique structure
-        pass
-    
-    # Actually, we already verified the button block IS there, but imports and hook are missing.
-    # So we should be careful. 
-    # If SparkleIcon IS in content (as we saw in the file view), we might skip the button block insertion.
-    # But wait, my previous check said: `if "SparkleIcon" not in content`.
-    # But I saw SparkleIcon usage in the file view!
-    # So `SparkleIcon` string IS in content (in the usage part).
-    # But checking for the *Import* string specifically is better for imports.
-    
-    # Let's fix the button block insertion to be conditional on the usage NOT being there?
-    # Or rely on the fact that if it's there, we shouldn't add it again.
-    
-    # The previous script run DID insert the button block because `SparkleIcon` wasn't there *initially*.
-    # Now valid code is there (except imports).
-    # So we don't need to touch the button block insertion logic if it checks for "SparkleIcon" existence properly.
-    # However, I need to make sure the import addition works even if SparkleIcon usage is there.
-    
-    # My new import logic checks: `if "Sparkle_Stroke2_Corner0_Rounded as SparkleIcon" not in content:`
-    # This is good. It checks for the IMPORT specifically.
-    
-    # My new hook logic checks: `if "const aiDialogControl = useDialogControl()" not in content:`
-    # This is good.
-
-    # Button logic:
-    new_button_block = """
-          {/* Create AI Button - Center of navbar with gradient */}
-          <View style={[a.flex_1, a.align_center, a.justify_center]}>
-            <View
-              style={[
-                a.align_center,
-                a.justify_center,
-                {
-                  width: 44,
-                  height: 44,
-                  borderRadius: 22,
-                  // @ts-expect-error web only
-                  background: 'linear-gradient(135deg, #8B5CF6 0%, #EC4899 50%, #F59E0B 100%)',
-                  cursor: 'pointer',
-                },
-              ]}
-              // @ts-expect-error web only
-              onClick={aiDialogControl.open}>
-              <SparkleIcon size="md" style={{ color: '#fff' }} />
-            </View>
-          </View>
-          <CreateWithAIDialog control={aiDialogControl} />
-"""
-    
-    if marker in content and "Create AI Button" not in content:
-         content = content.replace(marker, marker + new_button_block)
-
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(content)
-    print(f"Updated: {path}")
-
-def update_bottom_bar_native(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Add imports
-    if "Sparkle_Stroke2_Corner0_Rounded as SparkleIcon" not in content:
-        content = content.replace(
-            "import {styles} from './BottomBarStyles'",
-            "import {styles} from './BottomBarStyles'\nimport { CreateWithAIDialog } from '#/components/dialogs/CreateWithAIDialog'\nimport { Sparkle_Stroke2_Corner0_Rounded as SparkleIcon } from '#/components/icons/Sparkle'\nimport { LinearGradient } from 'expo-linear-gradient'"
-        )
-
-    # Initialize hook
-    if "const aiDialogControl = useDialogControl()" not in content:
-        content = content.replace(
-            "export function BottomBar({navigation}: BottomTabBarProps) {",
-            "export function BottomBar({navigation}: BottomTabBarProps) {\n  const aiDialogControl = useDialogControl()"
-        )
-
-    # Add Create AI button JSX
-    # Insert after Search button
-    # Search button ends with accessibilityHint=""\n            />
-    # But there's also Home button.
-    # Let's search for the Search button specifically.
-    search_btn_marker = """              accessibilityLabel={_(msg`Search`)}
-              accessibilityHint=""
-            />"""
-            
-    new_button_block = """
-            {/* Create AI Button */}
-            <View style={[a.flex_1, a.align_center, a.justify_center]}>
-              <PressableScale
-                onPress={aiDialogControl.open}
-                style={[
-                    a.align_center,
-                    a.justify_center,
-                    {
-                        width: 44,
-                        height: 44,
-                        borderRadius: 22,
-                        overflow: 'hidden',
-                    }
-                ]}>
-                <LinearGradient
-                    colors={['#8B5CF6', '#EC4899', '#F59E0B']}
-                    start={{x: 0, y: 0}}
-                    end={{x: 1, y: 1}}
-                    style={[a.absolute_fill]}
-                />
-                <View style={[a.align_center, a.justify_center, {width: 44, height: 44}]}>
-                    <SparkleIcon size="md" style={{ color: '#fff' }} />
-                </View>
-              </PressableScale>
-            </View>
-            <CreateWithAIDialog control={aiDialogControl} />
-"""
-
-    if search_btn_marker in content and "Create AI Button" not in content:
-        content = content.replace(search_btn_marker, search_btn_marker + new_button_block)
-
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(content)
-    print(f"Updated: {path}")
-
-# Paths
-BASE_DIR = '/teamspace/studios/this_studio/social-app/src'
-DIALOGS_DIR = os.path.join(BASE_DIR, 'components/dialogs')
+# Paths, relative to the checkout root like the other scripts'
+BASE_DIR = 'src'
 SHELL_DIR = os.path.join(BASE_DIR, 'view/shell')
 FEEDS_DIR = os.path.join(BASE_DIR, 'view/com/feeds')
 
-# Ensure directories exist
-os.makedirs(DIALOGS_DIR, exist_ok=True)
-
-# Execute
-write_file(os.path.join(DIALOGS_DIR, 'AIOptionCard.tsx'), AI_OPTION_CARD_CONTENT)
-write_file(os.path.join(DIALOGS_DIR, 'MediaUploadSelector.tsx'), MEDIA_UPLOAD_SELECTOR_CONTENT)
-write_file(os.path.join(DIALOGS_DIR, 'CreateWithAIDialog.tsx'), CREATE_WITH_AI_DIALOG_CONTENT)
-
-update_left_nav(os.path.join(SHELL_DIR, 'desktop/LeftNav.tsx'))
-update_feed_page(os.path.join(FEEDS_DIR, 'FeedPage.tsx')) 
-update_bottom_bar(os.path.join(SHELL_DIR, 'bottom-bar/BottomBarWeb.tsx'))
-update_bottom_bar_native(os.path.join(SHELL_DIR, 'bottom-bar/BottomBar.tsx'))
-
-print("All changes applied successfully!")
+def main():
+    # Dialog components and the bottom bar edits are in manifests/apply_ai_changes.toml
+    manifest = patch_manifest.load(MANIFEST)
+    patch_manifest.create_files(manifest)
+
+    update_left_nav(os.path.join(SHELL_DIR, 'desktop/LeftNav.tsx'))
+    update_feed_page(os.path.join(FEEDS_DIR, 'FeedPage.tsx')) 
+    failed = []
+    for patch in manifest['patch']:
+        if not patch_manifest.apply_patch(manifest, patch):
+            failed.append(patch.get('name') or patch['file'])
+    if failed:
+        print(f"⚠️  Could not apply: {', '.join(failed)}. Check error messages above.")
+        sys.exit(1)
+
+    print("All changes applied successfully!")
+
+if __name__ == "__main__":
+    with patch_io.cli():
+        main()
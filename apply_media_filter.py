@@ -1,6 +1,9 @@
-import os
 import re
 
+import patch_events
+import patch_io
+import pattern_registry
+
 TARGET_FILE = 'src/view/com/posts/PostFeed.tsx'
 
 FILTER_LOGIC = """              if (
@@ -33,15 +36,17 @@ FILTER_LOGIC = """              if (
               }
 """
 
+# Regex to find the @atproto/api import block
+# It might be multi-line.
+# Pattern looks for: import { ... } from '@atproto/api'
+ATPROTO_IMPORT_RE = pattern_registry.compile(
+    r'(import\s*\{[^}]+\}\s*from\s*\'@atproto/api\')', re.DOTALL, name='@atproto/api import block'
+)
+
 def process_imports(content):
-    # Regex to find the @atproto/api import block
-    # It might be multi-line.
-    # Pattern looks for: import { ... } from '@atproto/api'
-    pattern = r'(import\s*\{[^}]+\}\s*from\s*\'@atproto/api\')'
-    
-    match = re.search(pattern, content, re.DOTALL)
+    match = ATPROTO_IMPORT_RE.search(content)
     if not match:
-        print("Error: Could not find @atproto/api imports.")
+        patch_events.note("Error: Could not find @atproto/api imports.", file=TARGET_FILE, anchor='@atproto/api import block')
         return content
 
     import_block = match.group(0)
@@ -82,7 +87,7 @@ def process_imports(content):
     missing = [req for req in required_imports if req not in import_block]
     
     if not missing:
-        print("Imports already present.")
+        patch_events.note("Imports already present.", 'already', TARGET_FILE, '@atproto/api import block')
         return content
 
     print(f"Adding missing imports: {missing}")
@@ -108,7 +113,7 @@ def process_imports(content):
 
     updated_import_block = prefix + connector + to_add + "\n" + suffix
     
-    return content.replace(import_block, updated_import_block)
+    return patch_events.replace(content, import_block, updated_import_block, TARGET_FILE)
 
 def process_logic(content):
     # Target: inside the loop `for (const slice of page.slices) {`
@@ -119,7 +124,7 @@ def process_logic(content):
     # target line: "for (const slice of page.slices) {"
     
     if FILTER_LOGIC.strip() in content:
-        print("Filter logic already applied.")
+        patch_events.note("Filter logic already applied.", 'already', TARGET_FILE, "for (const slice of page.slices) {")
         return content
 
     lines = content.split('\n')
@@ -130,40 +135,43 @@ def process_logic(content):
     # 1 = searching for inner loop
     state = 0
     
-    for line in lines:
-        new_lines.append(line)
-        
-        if state == 0:
-            if "for (const page of data?.pages) {" in line:
-                state = 1
-        elif state == 1:
-            if "for (const slice of page.slices) {" in line:
-                print("Found target loop for logic injection.")
-                new_lines.append(FILTER_LOGIC)
-                state = 0 # specific injection done, return to search or finish if we only expect one.
-                # If we expect only one, we could set state = 2.
-                # But allowing state 0 is fine if there were multiple blocks (there aren't).
+    with patch_events.operation(TARGET_FILE, "for (const slice of page.slices) {") as op:
+        for line in lines:
+            new_lines.append(line)
             
-    return '\n'.join(new_lines)
+            if state == 0:
+                if "for (const page of data?.pages) {" in line:
+                    state = 1
+            elif state == 1:
+                if "for (const slice of page.slices) {" in line:
+                    print("Found target loop for logic injection.")
+                    new_lines.append(FILTER_LOGIC)
+                    state = 0 # specific injection done, return to search or finish if we only expect one.
+                    # If we expect only one, we could set state = 2.
+                    # But allowing state 0 is fine if there were multiple blocks (there aren't).
+                
+        new_content = '\n'.join(new_lines)
+        op.update(status='applied' if new_content != content else 'not found',
+                  before=content, after=new_content)
+    return new_content
 
 
 def main():
-    if not os.path.exists(TARGET_FILE):
-        print(f"File not found: {TARGET_FILE}")
+    if not patch_io.exists(TARGET_FILE):
+        patch_events.note(f"File not found: {TARGET_FILE}", 'error', TARGET_FILE)
         return
 
-    with open(TARGET_FILE, 'r') as f:
-        content = f.read()
+    content = patch_io.read_file(TARGET_FILE)
 
     new_content = process_imports(content)
     new_content = process_logic(new_content)
 
     if content != new_content:
-        with open(TARGET_FILE, 'w') as f:
-            f.write(new_content)
+        patch_io.write_file(TARGET_FILE, new_content)
         print(f"Successfully modified {TARGET_FILE}")
     else:
         print("No changes needed.")
 
 if __name__ == "__main__":
-    main()
+    with patch_io.cli():
+        main()
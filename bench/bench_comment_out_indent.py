@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark the linear comment_out_indent engine against the original
+rescanning loop on the real target files, plus a synthetic file with many
+sibling start tags that never close (the rescan engine's worst case).
+
+Usage: python bench/bench_comment_out_indent.py [repo_root] [--number N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import comment_out_ui
+
+
+def synthetic_content(count=2000):
+    """Many unclosed start tags at the same indent, each rescanning to EOF."""
+    lines = ['export function Big() {', '  return (', '    <View>']
+    for n in range(count):
+        lines.append(f'      <NavItem href="/item{n}"')
+        lines.append('        label="x"')
+    lines.extend(['    </View>', '  )', '}'])
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare comment_out_indent engines on the real target files.')
+    parser.add_argument('root', nargs='?', default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help='Checkout to read target files from (default: this repo).')
+    parser.add_argument('--number', type=int, default=200, help='Iterations per measurement.')
+    args = parser.parse_args()
+
+    cases = []
+    for rel_path, (start_tags, targets) in comment_out_ui.INDENT_TARGETS:
+        path = os.path.join(args.root, rel_path)
+        if not os.path.exists(path):
+            print(f"{rel_path:<60} missing")
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            cases.append((rel_path, f.read(), start_tags, targets, args.number))
+    cases.append(('<synthetic: 2000 unclosed NavItems>', synthetic_content(),
+                  ['<NavItem'], ['href="/lists"'], 1))
+
+    print(f"{'file':<60} {'lines':>6} {'rescan ms':>10} {'index ms':>9} {'speedup':>8}  output")
+    print("-" * 108)
+    total_rescan = total_index = 0.0
+    mismatches = 0
+
+    for name, content, start_tags, targets, number in cases:
+        expected = comment_out_ui.comment_out_indent_rescan(content, start_tags, targets)
+        actual = comment_out_ui.comment_out_indent(content, start_tags, targets)
+        same = expected == actual
+        mismatches += not same
+
+        rescan = min(timeit.repeat(lambda: comment_out_ui.comment_out_indent_rescan(content, start_tags, targets),
+                                   number=number, repeat=3)) / number
+        index = min(timeit.repeat(lambda: comment_out_ui.comment_out_indent(content, start_tags, targets),
+                                  number=number, repeat=3)) / number
+        total_rescan += rescan
+        total_index += index
+
+        print(f"{name:<60} {content.count(chr(10)) + 1:>6} {rescan * 1000:>10.3f} {index * 1000:>9.3f} "
+              f"{rescan / index:>7.1f}x  {'identical' if same else 'MISMATCH'}")
+
+    print("-" * 108)
+    print(f"{'total':<60} {'':>6} {total_rescan * 1000:>10.3f} {total_index * 1000:>9.3f} "
+          f"{total_rescan / total_index:>7.1f}x")
+
+    if mismatches:
+        print(f"\n❌ {mismatches} file(s) produced different output")
+        sys.exit(1)
+    print("\n✅ Outputs identical on all files")
+
+
+if __name__ == "__main__":
+    main()
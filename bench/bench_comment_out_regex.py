@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass comment_out_regex engine against the original
+one-re.sub-per-pattern loop on the real target files.
+
+Usage: python bench/bench_comment_out_regex.py [repo_root] [--number N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import comment_out_ui
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare comment_out_regex engines on the real target files.')
+    parser.add_argument('root', nargs='?', default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help='Checkout to read target files from (default: this repo).')
+    parser.add_argument('--number', type=int, default=200, help='Iterations per measurement.')
+    args = parser.parse_args()
+
+    print(f"{'file':<60} {'patterns':>8} {'loop ms':>9} {'single ms':>9} {'speedup':>8}  output")
+    print("-" * 108)
+    total_loop = total_single = 0.0
+    mismatches = 0
+
+    for rel_path, patterns in comment_out_ui.REGEX_TARGETS:
+        path = os.path.join(args.root, rel_path)
+        if not os.path.exists(path):
+            print(f"{rel_path:<60} missing")
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        expected = comment_out_ui.comment_out_regex_sequential(content, patterns)
+        actual = comment_out_ui.comment_out_regex(content, patterns)
+        same = expected == actual
+        mismatches += not same
+
+        loop = min(timeit.repeat(lambda: comment_out_ui.comment_out_regex_sequential(content, patterns),
+                                 number=args.number, repeat=3)) / args.number
+        single = min(timeit.repeat(lambda: comment_out_ui.comment_out_regex(content, patterns),
+                                   number=args.number, repeat=3)) / args.number
+        total_loop += loop
+        total_single += single
+
+        print(f"{rel_path:<60} {len(patterns):>8} {loop * 1000:>9.3f} {single * 1000:>9.3f} "
+              f"{loop / single:>7.1f}x  {'identical' if same else 'MISMATCH'}")
+
+    print("-" * 108)
+    print(f"{'total':<60} {'':>8} {total_loop * 1000:>9.3f} {total_single * 1000:>9.3f} "
+          f"{total_loop / total_single:>7.1f}x")
+
+    if mismatches:
+        print(f"\n❌ {mismatches} file(s) produced different output")
+        sys.exit(1)
+    print("\n✅ Outputs identical on all files")
+
+
+if __name__ == "__main__":
+    main()
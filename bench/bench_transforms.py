@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmark every patch transform, and every script as a whole, on the real
+target files and on synthetic inputs built by repeating each file 10x and
+100x. Reports ops/sec, peak memory and how time grows with input size, so a
+regex that starts backtracking shows up as super-linear growth.
+
+Transforms: comment_out_regex, comment_out_indent (comment_out_ui),
+replace_regex (process_feed_ui), process_imports and process_logic
+(apply_media_filter). Scripts: each a.py entry point, run against an
+in-memory overlay so nothing is written.
+
+Usage: python bench/bench_transforms.py [repo_root] [--scales 1,10,100]
+           [--filter NAME] [--max-exponent 1.5] [--strict]
+"""
+import argparse
+import contextlib
+import io
+import math
+import os
+import sys
+import timeit
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import a
+import apply_media_filter
+import comment_out_ui
+import patch_io
+import process_feed_ui
+import tsx_tree
+
+
+def scale_content(content, factor):
+    """A synthetic input `factor` times the size of the real file."""
+    return '\n'.join([content] * factor)
+
+
+def read(root, rel_path):
+    path = os.path.join(root, rel_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def captured_replace_regex_calls():
+    """
+    Run process_feed_ui.main() against a dry-run overlay and record each
+    regex_replacements list with the file content it was applied to.
+    """
+    calls = []
+    original = process_feed_ui.process_file
+
+    def recorder(file_path, patterns=None, regex_replacements=None, literal_replacements=None):
+        if regex_replacements and patch_io.exists(file_path):
+            calls.append((patch_io.read_file(file_path), regex_replacements))
+        return original(file_path, patterns, regex_replacements, literal_replacements)
+
+    process_feed_ui.process_file = recorder
+    try:
+        with patch_io.overlay(write=False), contextlib.redirect_stdout(io.StringIO()):
+            process_feed_ui.main()
+    finally:
+        process_feed_ui.process_file = original
+    return calls
+
+
+def transform_cases(root):
+    """(name, inputs, fn) where fn(inputs) runs the transform over every input."""
+    cases = []
+
+    regex_inputs = [(read(root, path), patterns) for path, patterns in comment_out_ui.REGEX_TARGETS]
+    regex_inputs = [(content, patterns) for content, patterns in regex_inputs if content is not None]
+    cases.append(('comment_out_regex', regex_inputs,
+                  lambda inputs: [comment_out_ui.comment_out_regex(c, p) for c, p in inputs]))
+
+    indent_inputs = [(read(root, path), config) for path, config in comment_out_ui.INDENT_TARGETS]
+    indent_inputs = [(content, config) for content, config in indent_inputs if content is not None]
+    cases.append(('comment_out_indent', indent_inputs,
+                  lambda inputs: [comment_out_ui.comment_out_indent(c, *config) for c, config in inputs]))
+
+    cases.append(('replace_regex', captured_replace_regex_calls(),
+                  lambda inputs: [process_feed_ui.replace_regex(c, r) for c, r in inputs]))
+
+    post_feed = read(root, apply_media_filter.TARGET_FILE)
+    if post_feed is not None:
+        cases.append(('process_imports', [(post_feed, None)],
+                      lambda inputs: [apply_media_filter.process_imports(c) for c, _ in inputs]))
+        cases.append(('process_logic', [(post_feed, None)],
+                      lambda inputs: [apply_media_filter.process_logic(c) for c, _ in inputs]))
+    return cases
+
+
+def script_cases():
+    """(name, inputs, fn) for each script; fn(inputs) runs it on those (path, content) pairs."""
+    cases = []
+    for key, info in sorted(a.SCRIPT_MAP.items()):
+        entry = a.load_entry_point(key)
+        # Learn which files the script touches from one dry run
+        with patch_io.overlay(write=False), patch_io.tracking() as accessed, \
+                contextlib.redirect_stdout(io.StringIO()):
+            try:
+                entry()
+            except Exception:
+                continue  # e.g. apply_ai_changes outside its expected checkout
+        # Outside the overlay peek() reads the unpatched files from disk
+        inputs = [(path, patch_io.peek(path)) for path in sorted(accessed)]
+        inputs = [(path, content) for path, content in inputs if content is not None]
+
+        def run(inputs, entry=entry):
+            tsx_tree.parse.cache_clear()  # measure a cold run, not a cached parse
+            with patch_io.overlay(write=False):
+                for path, content in inputs:
+                    patch_io.preload(path, content)
+                entry()
+
+        cases.append((f"script {key} ({info['file']})", inputs, run))
+    return cases
+
+
+def scaled(inputs, factor):
+    return [(scale_content(content, factor), extra) for content, extra in inputs]
+
+
+def measure(fn, inputs):
+    """Seconds per call (best of 3 autoranged runs) and peak traced memory in bytes."""
+    timer = timeit.Timer(lambda: fn(inputs))
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat=3, number=number)) / number
+    tracemalloc.start()
+    fn(inputs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark patch transforms and scripts at several input sizes.')
+    parser.add_argument('root', nargs='?', default=ROOT,
+                        help='Checkout to read target files from (default: this repo).')
+    parser.add_argument('--scales', default='1,10,100', help='Comma-separated input size multipliers.')
+    parser.add_argument('--filter', default='', help='Only run cases whose name contains this text.')
+    parser.add_argument('--max-exponent', type=float, default=1.5,
+                        help='Flag cases whose time grows faster than size**N between the smallest and largest scale.')
+    parser.add_argument('--strict', action='store_true', help='Exit with status 1 if any case is flagged.')
+    args = parser.parse_args()
+
+    scales = sorted(int(s) for s in args.scales.split(','))
+    os.chdir(args.root)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        cases = [(name, inputs, fn, 'transform') for name, inputs, fn in transform_cases(args.root)]
+        cases += [(name, inputs, fn, 'script') for name, inputs, fn in script_cases()]
+    cases = [case for case in cases if args.filter in case[0]]
+
+    print(f"{'case':<44} {'scale':>5} {'lines':>8} {'ops/sec':>10} {'ms/op':>10} {'peak MB':>8}")
+    print("-" * 90)
+    flagged = []
+    for name, inputs, fn, kind in cases:
+        if not inputs:
+            print(f"{name:<44} no inputs found")
+            continue
+        times = {}
+        for factor in scales:
+            if kind == 'script':
+                data = [(path, scale_content(content, factor)) for path, content in inputs]
+                lines = sum(content.count('\n') + 1 for _, content in data)
+            else:
+                data = scaled(inputs, factor)
+                lines = sum(content.count('\n') + 1 for content, _ in data)
+            with contextlib.redirect_stdout(io.StringIO()):
+                seconds, peak = measure(fn, data)
+            times[factor] = seconds
+            print(f"{name:<44} {factor:>4}x {lines:>8} {1 / seconds:>10.1f} {seconds * 1000:>10.3f} "
+                  f"{peak / 1e6:>8.2f}")
+
+        if len(scales) > 1:
+            low, high = scales[0], scales[-1]
+            exponent = math.log(times[high] / times[low]) / math.log(high / low)
+            mark = ''
+            if exponent > args.max_exponent:
+                mark = '  ⚠️  super-linear'
+                flagged.append(name)
+            print(f"{'':<44} growth ~ size^{exponent:.2f}{mark}")
+
+    print("-" * 90)
+    if flagged:
+        print(f"\n⚠️  {len(flagged)} case(s) grow faster than size^{args.max_exponent}: {', '.join(flagged)}")
+        if args.strict:
+            sys.exit(1)
+    else:
+        print("\n✅ All cases scale within the expected bound")
+
+
+if __name__ == "__main__":
+    main()
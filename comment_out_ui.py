@@ -1,8 +1,15 @@
-import sys
 import re
 import os
+import bisect
+import time
 
-def comment_out_regex(content, patterns):
+import patch_events
+import patch_io
+import pattern_guard
+import pattern_registry
+
+def comment_out_regex_sequential(content, patterns, path=None):
+    """Reference engine: one re.sub pass over the whole file per pattern."""
     new_content = content
     for pattern_name, pattern_tuple in patterns:
         pattern = pattern_tuple[0]
@@ -26,10 +33,111 @@ def comment_out_regex(content, patterns):
             else:
                 return f"/* {content} */"
         
-        new_content = re.sub(full_pattern, replacement, new_content, flags=re.DOTALL)
+        new_content = pattern_guard.sub(pattern_registry.compile(full_pattern, re.DOTALL), replacement,
+                                        new_content, path=path, budget=pattern_guard.budget_for(pattern_name))
     return new_content
 
-def comment_out_indent(content, target_starts_with, matching_strings):
+COMMENT_MARKERS = {
+    # style: (opening marker, pattern for an optional closing marker)
+    'jsx': ('{/*', re.compile(r'\s*\*/\}')),
+    'js': ('/*', re.compile(r'\s*\*/')),
+}
+
+def compile_pattern(pattern):
+    return pattern_registry.compile(pattern, re.DOTALL)
+
+def compile_anchor_scanner(anchors):
+    """One alternation of every literal anchor, longest first."""
+    ordered = sorted(set(anchors), key=len, reverse=True)
+    return pattern_registry.compile('|'.join(re.escape(anchor) for anchor in ordered))
+
+def is_commented_before(content, pos, opening):
+    # Equivalent of the optional (\{/\*\s*)? prefix in front of a match
+    i = pos
+    while i > 0 and content[i - 1].isspace():
+        i -= 1
+    return content.startswith(opening, i - len(opening))
+
+def comment_out_regex(content, patterns, path=None):
+    """
+    Single-pass equivalent of comment_out_regex_sequential.
+
+    Every pattern starts with a literal anchor (e.g. 'showListsTab'). Patterns
+    whose anchor is absent from the file are dropped up front; the remaining
+    anchors are found in one left-to-right scan and each pattern is only tried
+    where its anchor occurs. Where two patterns match at the same position the
+    one listed first wins, so patterns for a file must not overlap (duplicates
+    are fine). Each pattern records one patch event, as the sequential
+    engine's pattern_guard.sub() calls do.
+    """
+    active = []
+    for pattern_name, (pattern, style) in patterns:
+        anchor = pattern_registry.literal_prefix(pattern)
+        if not anchor:
+            # Nothing to scan for, keep the exact semantics of the old loop
+            return comment_out_regex_sequential(content, patterns, path)
+        if anchor in content and all(entry[:3] != (pattern, style, anchor) for entry in active):
+            active.append((pattern, style, anchor, pattern_guard.budget_for(pattern_name)))
+    # (pattern, style) -> [matches, bytes changed, seconds matching]
+    results = {(pattern, style): [0, 0, 0.0] for _, (pattern, style) in patterns}
+    if not active:
+        record_regex_events(patterns, results, content, path)
+        return content
+
+    scanner = compile_anchor_scanner(tuple(entry[2] for entry in active))
+    out = []
+    last = 0
+    pos = 0
+    while True:
+        hit = scanner.search(content, pos)
+        if not hit:
+            break
+        start = hit.start()
+        match = None
+        for pattern, style, anchor, budget in active:
+            if content.startswith(anchor, start):
+                began = time.perf_counter()
+                match = pattern_guard.match(compile_pattern(pattern), content, start, path=path, budget=budget)
+                results[(pattern, style)][2] += time.perf_counter() - began
+                if match:
+                    break
+        if not match:
+            pos = start + 1
+            continue
+
+        opening, closing = COMMENT_MARKERS[style]
+        end = match.end()
+        result = results[(pattern, style)]
+        result[0] += 1
+        if not is_commented_before(content, start, opening):
+            body = match.group(0)
+            wrapped = f"{{/* {body} */}}" if style == 'jsx' else f"/* {body} */"
+            out.append(content[last:start])
+            out.append(wrapped)
+            # A stray closing marker right after the body is absorbed, as before
+            suffix = closing.match(content, end)
+            last = suffix.end() if suffix else end
+            result[1] += patch_events.bytes_changed(content[start:last], wrapped)
+            end = last
+        pos = max(end, start + 1)
+
+    out.append(content[last:])
+    record_regex_events(patterns, results, content, path)
+    return ''.join(out)
+
+def record_regex_events(patterns, results, content, path):
+    """One event per pattern: applied, already (matched but commented) or no match."""
+    for pattern_name, key in patterns:
+        matches, size, seconds = results[key]
+        status = 'no match' if not matches else 'applied' if size else 'already'
+        patch_events.record(status, path, pattern_name, size, seconds)
+
+def opens_comment(stripped_line):
+    """True for a line that starts a JSX comment block left open, like '{/* {cond && ('."""
+    return stripped_line.startswith('{/*') and '*/' not in stripped_line
+
+def comment_out_indent_rescan(content, target_starts_with, matching_strings):
+    """Reference engine: rescans forward from every candidate start tag."""
     lines = content.split('\n')
     new_lines = []
     i = 0
@@ -192,38 +300,305 @@ def comment_out_indent(content, target_starts_with, matching_strings):
             
     return '\n'.join(new_lines)
 
+def find_start_lines(content, start_tags):
+    """
+    Line numbers of the lines whose stripped text starts with one of the
+    start tags, found with str.find so other lines are never visited.
+    """
+    hits = set()
+    for tag in start_tags:
+        pos = content.find(tag)
+        while pos != -1:
+            line_start = content.rfind('\n', 0, pos) + 1
+            if not content[line_start:pos] or content[line_start:pos].isspace():
+                hits.add(line_start)
+            pos = content.find(tag, pos + 1)
+    starts = []
+    line = prev = 0
+    for line_start in sorted(hits):
+        line += content.count('\n', prev, line_start)
+        prev = line_start
+        starts.append(line)
+    return starts
+
+def is_closing_line(stripped_line):
+    return stripped_line == '/>' or (stripped_line.startswith('</') and stripped_line.endswith('>'))
+
+def compile_matcher(matching_strings):
+    """One alternation of every target string, or None if there are none."""
+    if not matching_strings:
+        return None
+    return pattern_registry.compile('|'.join(re.escape(target) for target in matching_strings))
+
+def comment_out_indent(content, target_starts_with, matching_strings, path=None):
+    """
+    Linear-time equivalent of comment_out_indent_rescan. Start lines are found
+    with str.find and only the lines inside candidate blocks are visited; the
+    search for a block end is shared by the starts it passes over, and targets
+    are matched against each block span with one multi-string regex. Each
+    target records one patch event.
+
+    Unlike the reference engine, a block whose previous line opens a JSX
+    comment that wraps a conditional ('{/* {hasSession && (') counts as
+    already commented, so a re-run does not wrap it a second time. The two
+    engines agree on files that have not been patched yet.
+    """
+    began = time.perf_counter()
+    lines = content.split('\n')
+    starts = find_start_lines(content, target_starts_with)
+    matcher = compile_matcher(matching_strings)
+    scanned = {}  # indent -> (line the last scan started from, closing line it found)
+
+    def indent_of(k):
+        return len(lines[k]) - len(lines[k].lstrip())
+
+    def block_end(k):
+        # The first closing line below k at k's indent. A scan that started
+        # above k and ended below it saw no such line in between, so its
+        # result is reused; every line is scanned at most once per indent.
+        indent = indent_of(k)
+        origin, end = scanned.get(indent, (None, None))
+        if origin is not None and origin < k and (end is None or k < end):
+            return end
+        end = None
+        for j in range(k + 1, len(lines)):
+            line = lines[j]
+            if is_closing_line(line.strip()) and len(line) - len(line.lstrip()) == indent:
+                end = j
+                break
+        scanned[indent] = (k, end)
+        return end
+
+    def span_of(first, last):
+        return '\n'.join(lines[first:last + 1])
+
+    commented = {}  # target -> bytes changed by the blocks commented out for it
+    already = set()  # targets found in blocks commented out before
+
+    def note_commented(first, last, before, after):
+        size = patch_events.bytes_changed('\n'.join(before), '\n'.join(after))
+        for target in set(matcher.findall(span_of(first, last))):
+            commented[target] = commented.get(target, 0) + size
+
+    new_lines = []
+    i = 0  # first line not yet copied to new_lines
+    for start in starts:
+        if start < i:
+            continue
+        new_lines.extend(lines[i:start])
+        i = start
+        stripped = lines[i].strip()
+        if stripped.startswith('{/*'):
+            continue
+        prev_line = lines[i - 1].strip() if i > 0 else ''
+
+        # Check if already commented (including a wrapped conditional line)
+        if opens_comment(prev_line):
+            end = i if stripped.endswith('/>') else block_end(i)
+            if end is not None and matcher is not None:
+                already.update(matcher.findall(span_of(i, end)))
+            continue
+
+        end = i if stripped.endswith('/>') else block_end(i)
+        if end is None:
+            continue
+
+        if matcher is None or matcher.search(span_of(i, end)) is None:
+            new_lines.extend(lines[i:end + 1])
+            i = end + 1
+            continue
+
+        # Check if we're inside a conditional expression like {hasSession && (
+        # by looking at the previous line
+        inside_conditional = prev_line.endswith('(') and ('&&' in prev_line or '?' in prev_line)
+        if not inside_conditional:
+            indent = indent_of(i)
+            wrapped = [f"{' ' * indent}{{/*"] + lines[i:end + 1] + [f"{' ' * indent}*/}}"]
+            note_commented(i, end, lines[i:end + 1], wrapped)
+            new_lines.extend(wrapped)
+            i = end + 1
+            continue
+
+        if new_lines and new_lines[-1] == lines[i - 1]:
+            # Pop the conditional line and wrap everything up to its closing )}
+            cond_line = new_lines.pop()
+            cond_indent = indent_of(i - 1)
+            close = end + 1
+            while close < len(lines) and lines[close].strip() in (')', ')}'):
+                close += 1
+            wrapped = ([f"{' ' * cond_indent}{{/* {cond_line.strip()}"] + lines[i:close]
+                       + [f"{' ' * cond_indent}*/}}"])
+            note_commented(i, end, lines[i - 1:close], wrapped)
+            new_lines.extend(wrapped)
+            i = close
+        else:
+            # The conditional line was already rewritten; like the rescan
+            # engine, the block is skipped without being emitted.
+            i = end + 1
+    new_lines.extend(lines[i:])
+
+    # The pass is shared by every target; split its time between them
+    seconds = (time.perf_counter() - began) / max(len(matching_strings), 1)
+    for target in matching_strings:
+        if target in commented:
+            patch_events.record('applied', path, target, commented[target], seconds)
+        else:
+            status = 'already' if target in already else 'no match'
+            patch_events.record(status, path, target, 0, seconds)
+    return '\n'.join(new_lines)
+
 def process_file(file_path, patterns=None, indent_config=None):
-    if not os.path.exists(file_path):
-        print(f"File not found: {file_path}")
+    if not patch_io.exists(file_path):
+        patch_events.note(f"File not found: {file_path}", 'error', file_path)
         return
 
     print(f"Reading {file_path}...")
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = patch_io.read_file(file_path)
 
     new_content = content
     if patterns:
-        new_content = comment_out_regex(new_content, patterns)
+        new_content = comment_out_regex(new_content, patterns, file_path)
     
     if indent_config:
-        new_content = comment_out_indent(new_content, indent_config[0], indent_config[1])
+        new_content = comment_out_indent(new_content, indent_config[0], indent_config[1], file_path)
 
     if new_content != content:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        patch_io.write_file(file_path, new_content)
         print(f"Modified {file_path}")
     else:
         print(f"No changes for {file_path}")
 
+# Regex-based targets (pattern name, (pattern, comment style))
+SETTINGS_PATTERNS = [
+    ("Manage Saved Feeds", (r'(<SettingsList\.LinkItem\s+[^>]*label=\{_\(msg`Manage saved feeds`\)\}.*?</SettingsList\.LinkItem>)', 'jsx')),
+    ("Thread Preferences", (r'(<SettingsList\.LinkItem\s+[^>]*label=\{_\(msg`Thread preferences`\)\}.*?</SettingsList\.LinkItem>)', 'jsx')),
+    ("Following Feed Preferences", (r'(<SettingsList\.LinkItem\s+[^>]*label=\{_\(msg`Following feed preferences`\)\}.*?</SettingsList\.LinkItem>)', 'jsx')),
+    ("External Media", (r'(<SettingsList\.LinkItem\s+[^>]*label=\{_\(msg`External media`\)\}.*?</SettingsList\.LinkItem>)', 'jsx')),
+]
+
+THREAD_ANCHOR_PATTERNS = [
+    ("Quotes Link", (r'(<Link\s+[^>]*to=\{quotesHref\}[^>]*label=\{_\(msg`Quotes of this post`\)\}.*?</Link>)', 'jsx')),
+]
+
+PROFILE_PATTERNS = [
+    ("Starter Packs Tab Title", (r'(showStarterPacksTab\s*\?\s*_\(msg`Starter Packs`\)\s*:\s*undefined,)', 'js')),
+    ("Starter Packs Tab Content", (r'(\{showStarterPacksTab\s*\?\s*\(\{headerHeight,\s*isFocused,\s*scrollElRef\}\)\s*=>\s*\(\s*<ProfileStarterPacks.*?: null\})', 'jsx')),
+    
+    # New pattern additions for Feeds, Lists, Media
+    ("Lists Tab Title 1", (r'(showListsTab && hasLabeler\s*\?\s*_\(msg`Lists`\)\s*:\s*undefined,)', 'js')),
+    ("Lists Tab Title 2", (r'(showListsTab && !hasLabeler\s*\?\s*_\(msg`Lists`\)\s*:\s*undefined,)', 'js')),
+    ("Media Tab Title", (r'(showMediaTab\s*\?\s*_\(msg`Media`\)\s*:\s*undefined,)', 'js')),
+    ("Feeds Tab Title", (r'(showFeedsTab\s*\?\s*_\(msg`Feeds`\)\s*:\s*undefined,)', 'js')),
+    
+    ("Lists Tab Content 1", (r'(\{showListsTab && !!profile\.associated\?\.labeler\s*\?.*?: null\})', 'jsx')),
+    ("Lists Tab Content 2", (r'(\{showListsTab && !profile\.associated\?\.labeler\s*\?.*?: null\})', 'jsx')),
+    ("Media Tab Content", (r'(\{showMediaTab\s*\?\s*\(\{headerHeight,\s*isFocused,\s*scrollElRef\}\)\s*=>\s*\(\s*<ProfileFeedSection\s+ref=\{mediaSectionRef\}.*?: null\})', 'jsx')),
+    ("Feeds Tab Content", (r'(\{showFeedsTab\s*\?\s*\(\{headerHeight,\s*isFocused,\s*scrollElRef\}\)\s*=>\s*\(\s*<ProfileFeedgens.*?: null\})', 'jsx')),
+]
+
+EXPLORE_PATTERNS = [
+    ("Top Border", (r'(i\.push\(topBorder\))', 'js')),
+    ("Interests Nux", (r'(i\.push\(\.\.\.interestsNuxModule\))', 'js')),
+    ("Trending Topics", (r'(i\.push\(trendingTopicsModule\))', 'js')),
+    ("Suggested Feeds", (r'(i\.push\(\.\.\.suggestedFeedsModule\))', 'js')),
+    ("Suggested Follows", (r'(i\.push\(\.\.\.suggestedFollowsModule\))', 'js')),
+    ("Suggested Follows (Simple)", (r'(i\.push\(\.\.\.suggestedFollowsModule\))', 'js')), # Duplicate handle? regex will catch all
+    ("Suggested Starter Packs", (r'(i\.push\(\.\.\.suggestedStarterPacksModule\))', 'js')),
+    ("Feed Previews", (r'(i\.push\(\.\.\.feedPreviewsModule\))', 'js')),
+]
+
+DIVIDER_PATTERNS = [
+    ("Menu Divider", (r'(<Menu\.Divider\s*/>)', 'jsx')),
+]
+
+INTERSTITIALS_PATTERNS = [
+    ("Progress Guide List", (r'(<ProgressGuideList\s*/>)', 'jsx')),
+]
+
+# Files handled by comment_out_regex, relative to the repo root
+REGEX_TARGETS = [
+    ('src/screens/Settings/ContentAndMediaSettings.tsx', SETTINGS_PATTERNS),
+    ('src/screens/PostThread/components/ThreadItemAnchor.tsx', THREAD_ANCHOR_PATTERNS),
+    ('src/view/screens/Profile.tsx', PROFILE_PATTERNS),
+    ('src/screens/Search/Explore.tsx', EXPLORE_PATTERNS),
+    ('src/components/PostControls/PostMenu/PostMenuItems.tsx', DIVIDER_PATTERNS),
+    ('src/view/com/profile/ProfileMenu.tsx', DIVIDER_PATTERNS),
+    ('src/components/FeedInterstitials.tsx', INTERSTITIALS_PATTERNS),
+]
+
+# Indentation-based targets (start tags, strings marking a block to comment out)
+DRAWER_INDENT = (
+    ['<ChatMenuItem', '<FeedsMenuItem', '<ListsMenuItem'],
+    ['ChatMenuItem', 'FeedsMenuItem', 'ListsMenuItem'],
+)
+
+RIGHT_NAV_INDENT = (
+    ['<DesktopFeeds', '<SidebarTrendingTopics', '<ProgressGuideList'],
+    ['DesktopFeeds', 'SidebarTrendingTopics', 'ProgressGuideList'],
+)
+
+PROFILE_MENU_INDENT = (
+    ['<Menu.Item'],
+    [
+        'testID="profileHeaderDropdownStarterPackAddRemoveBtn"',
+        'testID="profileHeaderDropdownListAddRemoveBtn"'
+    ],
+)
+
+BOTTOM_BAR_INDENT = (
+    ['<Btn'],
+    [
+        'testID="bottomBarMessagesBtn"',
+    ],
+)
+
+LEFT_NAV_INDENT = (
+    ['<NavItem', '<ChatNavItem'],
+    [
+        '<ChatNavItem',
+        'href="/feeds"',
+        'href="/lists"',
+    ],
+)
+
+BOTTOM_BAR_WEB_INDENT = (
+    ['<NavItem'],
+    [
+        'routeName="Messages"',
+    ],
+)
+
+HOME_HEADER_INDENT = (['<Link'], ['testID="viewHeaderHomeFeedPrefsBtn"'])
+
+HOME_HEADER_WEB_INDENT = (['<Link'], ['to="/feeds"'])
+
+# Files handled by comment_out_indent, relative to the repo root
+INDENT_TARGETS = [
+    ('src/view/shell/Drawer.tsx', DRAWER_INDENT),
+    ('src/view/shell/desktop/RightNav.tsx', RIGHT_NAV_INDENT),
+    ('src/view/com/profile/ProfileMenu.tsx', PROFILE_MENU_INDENT),
+    ('src/view/shell/bottom-bar/BottomBar.tsx', BOTTOM_BAR_INDENT),
+    ('src/view/shell/desktop/LeftNav.tsx', LEFT_NAV_INDENT),
+    ('src/view/shell/bottom-bar/BottomBarWeb.tsx', BOTTOM_BAR_WEB_INDENT),
+    ('src/view/com/home/HomeHeaderLayoutMobile.tsx', HOME_HEADER_INDENT),
+    ('src/view/com/home/HomeHeaderLayout.web.tsx', HOME_HEADER_WEB_INDENT),
+]
+
+def register_patterns():
+    """Compile every regex target once, at import, under its pattern name."""
+    for file_path, patterns in REGEX_TARGETS:
+        for pattern_name, (pattern, style) in patterns:
+            pattern_registry.compile(pattern, re.DOTALL, name=pattern_name)
+
+register_patterns()
+
 def main():
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+    base_dir = os.getcwd()  # the checkout root, as for the other scripts
     def p(path): return os.path.join(base_dir, path)
 
     # 2. Drawer.tsx
     # Reverted SearchMenuItem
-    drawer_start_tags = ['<ChatMenuItem', '<FeedsMenuItem', '<ListsMenuItem']
-    drawer_targets = ['ChatMenuItem', 'FeedsMenuItem', 'ListsMenuItem']
-    process_file(p('src/view/shell/Drawer.tsx'), indent_config=(drawer_start_tags, drawer_targets))
+    process_file(p('src/view/shell/Drawer.tsx'), indent_config=DRAWER_INDENT)
 
     # 3. PostMenuItems.tsx - MOVED TO process_feed_ui.py due to nesting issues
     # post_menu_start_tags = ['<Menu.Item']
@@ -238,106 +613,46 @@ def main():
     # process_file(p('src/components/PostControls/PostMenu/PostMenuItems.tsx'), indent_config=(post_menu_start_tags, post_menu_targets))
 
     # 4. ContentAndMediaSettings.tsx
-    settings_patterns = [
-        ("Manage Saved Feeds", (r'(<SettingsList\.LinkItem\s+[^>]*label=\{_\(msg`Manage saved feeds`\)\}.*?</SettingsList\.LinkItem>)', 'jsx')),
-        ("Thread Preferences", (r'(<SettingsList\.LinkItem\s+[^>]*label=\{_\(msg`Thread preferences`\)\}.*?</SettingsList\.LinkItem>)', 'jsx')),
-        ("Following Feed Preferences", (r'(<SettingsList\.LinkItem\s+[^>]*label=\{_\(msg`Following feed preferences`\)\}.*?</SettingsList\.LinkItem>)', 'jsx')),
-        ("External Media", (r'(<SettingsList\.LinkItem\s+[^>]*label=\{_\(msg`External media`\)\}.*?</SettingsList\.LinkItem>)', 'jsx')),
-    ]
-    process_file(p('src/screens/Settings/ContentAndMediaSettings.tsx'), patterns=settings_patterns)
+    process_file(p('src/screens/Settings/ContentAndMediaSettings.tsx'), patterns=SETTINGS_PATTERNS)
 
     # 5. ThreadItemAnchor.tsx
-    thread_anchor_patterns = [
-        ("Quotes Link", (r'(<Link\s+[^>]*to=\{quotesHref\}[^>]*label=\{_\(msg`Quotes of this post`\)\}.*?</Link>)', 'jsx')),
-    ]
-    process_file(p('src/screens/PostThread/components/ThreadItemAnchor.tsx'), patterns=thread_anchor_patterns)
+    process_file(p('src/screens/PostThread/components/ThreadItemAnchor.tsx'), patterns=THREAD_ANCHOR_PATTERNS)
 
     # 6. Profile.tsx
-    profile_patterns = [
-        ("Starter Packs Tab Title", (r'(showStarterPacksTab\s*\?\s*_\(msg`Starter Packs`\)\s*:\s*undefined,)', 'js')),
-        ("Starter Packs Tab Content", (r'(\{showStarterPacksTab\s*\?\s*\(\{headerHeight,\s*isFocused,\s*scrollElRef\}\)\s*=>\s*\(\s*<ProfileStarterPacks.*?: null\})', 'jsx')),
-        
-        # New pattern additions for Feeds, Lists, Media
-        ("Lists Tab Title 1", (r'(showListsTab && hasLabeler\s*\?\s*_\(msg`Lists`\)\s*:\s*undefined,)', 'js')),
-        ("Lists Tab Title 2", (r'(showListsTab && !hasLabeler\s*\?\s*_\(msg`Lists`\)\s*:\s*undefined,)', 'js')),
-        ("Media Tab Title", (r'(showMediaTab\s*\?\s*_\(msg`Media`\)\s*:\s*undefined,)', 'js')),
-        ("Feeds Tab Title", (r'(showFeedsTab\s*\?\s*_\(msg`Feeds`\)\s*:\s*undefined,)', 'js')),
-        
-        ("Lists Tab Content 1", (r'(\{showListsTab && !!profile\.associated\?\.labeler\s*\?.*?: null\})', 'jsx')),
-        ("Lists Tab Content 2", (r'(\{showListsTab && !profile\.associated\?\.labeler\s*\?.*?: null\})', 'jsx')),
-        ("Media Tab Content", (r'(\{showMediaTab\s*\?\s*\(\{headerHeight,\s*isFocused,\s*scrollElRef\}\)\s*=>\s*\(\s*<ProfileFeedSection\s+ref=\{mediaSectionRef\}.*?: null\})', 'jsx')),
-        ("Feeds Tab Content", (r'(\{showFeedsTab\s*\?\s*\(\{headerHeight,\s*isFocused,\s*scrollElRef\}\)\s*=>\s*\(\s*<ProfileFeedgens.*?: null\})', 'jsx')),
-    ]
-    process_file(p('src/view/screens/Profile.tsx'), patterns=profile_patterns)
+    process_file(p('src/view/screens/Profile.tsx'), patterns=PROFILE_PATTERNS)
 
     # 8. Desktop RightNav.tsx
     # Reverted Desktop Search
-    right_nav_start_tags = ['<DesktopFeeds', '<SidebarTrendingTopics', '<ProgressGuideList']
-    right_nav_targets = ['DesktopFeeds', 'SidebarTrendingTopics', 'ProgressGuideList']
-    process_file(p('src/view/shell/desktop/RightNav.tsx'), indent_config=(right_nav_start_tags, right_nav_targets))
+    process_file(p('src/view/shell/desktop/RightNav.tsx'), indent_config=RIGHT_NAV_INDENT)
 
     # 9. ProfileMenu.tsx
-    profile_menu_start_tags = ['<Menu.Item']
-    profile_menu_targets = [
-        'testID="profileHeaderDropdownStarterPackAddRemoveBtn"',
-        'testID="profileHeaderDropdownListAddRemoveBtn"'
-    ]
-    process_file(p('src/view/com/profile/ProfileMenu.tsx'), indent_config=(profile_menu_start_tags, profile_menu_targets))
+    process_file(p('src/view/com/profile/ProfileMenu.tsx'), indent_config=PROFILE_MENU_INDENT)
 
     # Indentation Based files
     
     # 1. BottomBar.tsx
     # Reverted bottomBarSearchBtn
-    bottom_bar_targets = [
-        'testID="bottomBarMessagesBtn"',
-    ]
-    process_file(p('src/view/shell/bottom-bar/BottomBar.tsx'), indent_config=(['<Btn'], bottom_bar_targets))
+    process_file(p('src/view/shell/bottom-bar/BottomBar.tsx'), indent_config=BOTTOM_BAR_INDENT)
 
     # 7. Desktop LeftNav.tsx
     # Reverted href="/search"
-    left_nav_start_tags = ['<NavItem', '<ChatNavItem']
-    left_nav_targets = [
-        '<ChatNavItem',
-        'href="/feeds"',
-        'href="/lists"',
-    ]
-    process_file(p('src/view/shell/desktop/LeftNav.tsx'), indent_config=(left_nav_start_tags, left_nav_targets))
+    process_file(p('src/view/shell/desktop/LeftNav.tsx'), indent_config=LEFT_NAV_INDENT)
 
     # 10. BottomBarWeb.tsx
     # Reverted routeName="Search"
-    bottom_bar_web_start_tags = ['<NavItem']
-    bottom_bar_web_targets = [
-        'routeName="Messages"',
-    ]
-    process_file(p('src/view/shell/bottom-bar/BottomBarWeb.tsx'), indent_config=(bottom_bar_web_start_tags, bottom_bar_web_targets))
+    process_file(p('src/view/shell/bottom-bar/BottomBarWeb.tsx'), indent_config=BOTTOM_BAR_WEB_INDENT)
 
     # 11. Explore.tsx (Search Screen Content)
-    explore_patterns = [
-        ("Top Border", (r'(i\.push\(topBorder\))', 'js')),
-        ("Interests Nux", (r'(i\.push\(\.\.\.interestsNuxModule\))', 'js')),
-        ("Trending Topics", (r'(i\.push\(trendingTopicsModule\))', 'js')),
-        ("Suggested Feeds", (r'(i\.push\(\.\.\.suggestedFeedsModule\))', 'js')),
-        ("Suggested Follows", (r'(i\.push\(\.\.\.suggestedFollowsModule\))', 'js')),
-        ("Suggested Follows (Simple)", (r'(i\.push\(\.\.\.suggestedFollowsModule\))', 'js')), # Duplicate handle? regex will catch all
-        ("Suggested Starter Packs", (r'(i\.push\(\.\.\.suggestedStarterPacksModule\))', 'js')),
-        ("Feed Previews", (r'(i\.push\(\.\.\.feedPreviewsModule\))', 'js')),
-    ]
     # Note: re.sub replaces all occurrences by default, so 'Suggested Follows' covers both if-else branches 
     # if the string is identical.
-    process_file(p('src/screens/Search/Explore.tsx'), patterns=explore_patterns)
+    process_file(p('src/screens/Search/Explore.tsx'), patterns=EXPLORE_PATTERNS)
 
     # 12. Menu Dividers (PostMenuItems.tsx and ProfileMenu.tsx)
-    divider_patterns = [
-        ("Menu Divider", (r'(<Menu\.Divider\s*/>)', 'jsx')),
-    ]
-    process_file(p('src/components/PostControls/PostMenu/PostMenuItems.tsx'), patterns=divider_patterns)
-    process_file(p('src/view/com/profile/ProfileMenu.tsx'), patterns=divider_patterns)
+    process_file(p('src/components/PostControls/PostMenu/PostMenuItems.tsx'), patterns=DIVIDER_PATTERNS)
+    process_file(p('src/view/com/profile/ProfileMenu.tsx'), patterns=DIVIDER_PATTERNS)
 
     # 13. FeedInterstitials.tsx (Assign Topic for Algo)
-    interstitials_patterns = [
-        ("Progress Guide List", (r'(<ProgressGuideList\s*/>)', 'jsx')),
-    ]
-    process_file(p('src/components/FeedInterstitials.tsx'), patterns=interstitials_patterns)
+    process_file(p('src/components/FeedInterstitials.tsx'), patterns=INTERSTITIALS_PATTERNS)
 
     # 14. HomeHeaderLayoutMobile.tsx (Feed Hashtag Button)
     # Target the Link component with testID="viewHeaderHomeFeedPrefsBtn"
@@ -346,15 +661,12 @@ def main():
     # Actually, indentation logic is safest for components.
     
     # We will use the indent_config approach.
-    home_header_start_tags = ['<Link']
-    home_header_targets = ['testID="viewHeaderHomeFeedPrefsBtn"']
-    process_file(p('src/view/com/home/HomeHeaderLayoutMobile.tsx'), indent_config=(home_header_start_tags, home_header_targets))
+    process_file(p('src/view/com/home/HomeHeaderLayoutMobile.tsx'), indent_config=HOME_HEADER_INDENT)
 
     # 15. HomeHeaderLayout.web.tsx (Desktop Feed Hashtag Button)
     # Target the Link to /feeds
-    home_header_web_start_tags = ['<Link']
-    home_header_web_targets = ['to="/feeds"']
-    process_file(p('src/view/com/home/HomeHeaderLayout.web.tsx'), indent_config=(home_header_web_start_tags, home_header_web_targets))
+    process_file(p('src/view/com/home/HomeHeaderLayout.web.tsx'), indent_config=HOME_HEADER_WEB_INDENT)
 
 if __name__ == "__main__":
-    main()
+    with patch_io.cli():
+        main()
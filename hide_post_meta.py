@@ -4,53 +4,69 @@ Script to hide post metadata (username, date) in the feed view.
 Posts will only show their content/media. The metadata will still be
 visible when clicking on the post (in thread view).
 """
-import os
-import re
+
+import patch_events
+import patch_fuzzy
+import patch_io
+import tsx_tree
 
 POST_FEED_ITEM_FILE = 'src/view/com/posts/PostFeedItem.tsx'
 
+# Text matched, or relocated if reformatted, when the file cannot be parsed
+POST_META_CODE = '''<PostMeta
+            author={post.author}
+            moderation={moderation}
+            timestamp={post.indexedAt}
+            postHref={href}
+            onOpenAuthor={onOpenAuthor}
+          />'''
+
+
+def find_post_meta(content):
+    """Span of the <PostMeta> element rendered by FeedItemInner, or None."""
+    try:
+        tree = tsx_tree.parse(content)
+    except tsx_tree.TsxSyntaxError as e:
+        patch_events.note(f"Warning: could not parse {POST_FEED_ITEM_FILE} ({e}), falling back to text match",
+                          'warning', POST_FEED_ITEM_FILE)
+        return patch_fuzzy.find(content, POST_META_CODE, POST_FEED_ITEM_FILE)
+
+    feed_item = tree.find_declaration('FeedItemInner')
+    if feed_item is None:
+        return None
+    post_meta = tree.find_element('PostMeta', within=feed_item)
+    if post_meta is None:
+        return None
+    return post_meta.start, post_meta.end
+
 
 def modify_post_feed_item():
     """Comment out PostMeta component in feed items."""
-    if not os.path.exists(POST_FEED_ITEM_FILE):
-        print(f"Error: File not found: {POST_FEED_ITEM_FILE}")
+    if not patch_io.exists(POST_FEED_ITEM_FILE):
+        patch_events.note(f"Error: File not found: {POST_FEED_ITEM_FILE}", 'error', POST_FEED_ITEM_FILE)
         return False
 
     print(f"Reading {POST_FEED_ITEM_FILE}...")
-    with open(POST_FEED_ITEM_FILE, 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = patch_io.read_file(POST_FEED_ITEM_FILE)
 
     # Check if already modified
     if '{/* <PostMeta' in content:
-        print(f"{POST_FEED_ITEM_FILE} already modified.")
+        patch_events.note(f"{POST_FEED_ITEM_FILE} already modified.", 'already', POST_FEED_ITEM_FILE, '<PostMeta')
         return True
 
-    # Comment out the PostMeta component
-    old_code = '''<PostMeta
-            author={post.author}
-            moderation={moderation}
-            timestamp={post.indexedAt}
-            postHref={href}
-            onOpenAuthor={onOpenAuthor}
-          />'''
-
-    new_code = '''{/* <PostMeta
-            author={post.author}
-            moderation={moderation}
-            timestamp={post.indexedAt}
-            postHref={href}
-            onOpenAuthor={onOpenAuthor}
-          /> */}'''
-
-    if old_code not in content:
-        print("Error: Could not find PostMeta code to comment out.")
+    span = find_post_meta(content)
+    if span is None:
+        patch_events.note("Error: Could not find PostMeta code to comment out.", file=POST_FEED_ITEM_FILE, anchor='<PostMeta')
         print("The file structure may have changed.")
         return False
 
-    content = content.replace(old_code, new_code)
+    with patch_events.operation(POST_FEED_ITEM_FILE, '<PostMeta') as op:
+        start, end = span
+        op['before'] = content
+        content = op['after'] = tsx_tree.apply_edits(content, [(start, end, '{/* ' + content[start:end] + ' */}')])
+        op['status'] = 'applied'
 
-    with open(POST_FEED_ITEM_FILE, 'w', encoding='utf-8') as f:
-        f.write(content)
+    patch_io.write_file(POST_FEED_ITEM_FILE, content)
 
     print(f"Successfully modified {POST_FEED_ITEM_FILE}")
     return True
@@ -72,4 +88,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with patch_io.cli():
+        main()
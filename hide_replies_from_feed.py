@@ -16,7 +16,11 @@ What this script does:
 """
 
 import os
-import re
+
+import patch_events
+import patch_fuzzy
+import patch_io
+import patch_journal
 
 
 def modify_post_feed():
@@ -26,12 +30,11 @@ def modify_post_feed():
     """
     file_path = 'src/view/com/posts/PostFeed.tsx'
     
-    if not os.path.exists(file_path):
-        print(f"Error: {file_path} not found.")
+    if not patch_io.exists(file_path):
+        patch_events.note(f"Error: {file_path} not found.", 'error', file_path)
         return False
     
-    with open(file_path, 'r') as f:
-        content = f.read()
+    content = patch_io.read_file(file_path)
     
     # Store original content for comparison
     original_content = content
@@ -97,13 +100,14 @@ def modify_post_feed():
                 )
               }'''
     
-    if incomplete_thread_old in content:
-        content = content.replace(incomplete_thread_old, incomplete_thread_new)
-        print("  ✓ Modified incomplete thread handling")
+    # Check if already modified
+    if '// MODIFIED: Only show the last item in incomplete threads' in content:
+        print("  ✓ Incomplete thread handling already modified")
     else:
-        # Check if already modified
-        if '// MODIFIED: Only show the last item in incomplete threads' in content:
-            print("  ✓ Incomplete thread handling already modified")
+        modified = patch_fuzzy.replace(content, incomplete_thread_old, incomplete_thread_new, file_path)
+        if modified != content:
+            content = modified
+            print("  ✓ Modified incomplete thread handling")
         else:
             print("  ⚠ Incomplete thread code not found")
     
@@ -145,8 +149,9 @@ def modify_post_feed():
                 )
               }'''
         
-        if regular_slice_old in content:
-            content = content.replace(regular_slice_old, regular_slice_new)
+        modified = patch_fuzzy.replace(content, regular_slice_old, regular_slice_new, file_path)
+        if modified != content:
+            content = modified
             print("  ✓ Modified regular slice handling")
         else:
             print("  ⚠ Regular slice code not found")
@@ -156,8 +161,7 @@ def modify_post_feed():
     # =========================================================================
     
     if content != original_content:
-        with open(file_path, 'w') as f:
-            f.write(content)
+        patch_io.write_file(file_path, content)
         print(f"  → Updated {file_path}")
         return True
     else:
@@ -172,12 +176,11 @@ def modify_feed_tuners():
     """
     file_path = 'src/state/preferences/feed-tuners.tsx'
     
-    if not os.path.exists(file_path):
-        print(f"Error: {file_path} not found.")
+    if not patch_io.exists(file_path):
+        patch_events.note(f"Error: {file_path} not found.", 'error', file_path)
         return False
     
-    with open(file_path, 'r') as f:
-        content = f.read()
+    content = patch_io.read_file(file_path)
     
     original_content = content
     
@@ -201,13 +204,15 @@ def modify_feed_tuners():
       ]
     }'''
     
-    if feedgen_old in content:
-        content = content.replace(feedgen_old, feedgen_new)
-        print("  ✓ Added removeReplies to feedgen feeds")
-    elif '// MODIFIED: Always remove replies from feedgen feeds' in content:
+    if '// MODIFIED: Always remove replies from feedgen feeds' in content:
         print("  ✓ Feedgen modification already applied")
     else:
-        print("  ⚠ Feedgen code not found")
+        modified = patch_fuzzy.replace(content, feedgen_old, feedgen_new, file_path)
+        if modified != content:
+            content = modified
+            print("  ✓ Added removeReplies to feedgen feeds")
+        else:
+            print("  ⚠ Feedgen code not found")
     
     # =========================================================================
     # Make sure removeReplies is always added regardless of preference
@@ -227,21 +232,22 @@ def modify_feed_tuners():
     hide_replies_new = '''// MODIFIED: Always hide replies from feed
       feedTuners.push(FeedTuner.removeReplies)'''
     
-    if hide_replies_old in content:
-        content = content.replace(hide_replies_old, hide_replies_new)
-        print("  ✓ Modified to always remove replies from following/list feeds")
-    elif '// MODIFIED: Always hide replies from feed' in content:
+    if '// MODIFIED: Always hide replies from feed' in content:
         print("  ✓ Always-hide-replies modification already applied")
     else:
-        print("  ⚠ hideReplies conditional code not found")
+        modified = patch_fuzzy.replace(content, hide_replies_old, hide_replies_new, file_path)
+        if modified != content:
+            content = modified
+            print("  ✓ Modified to always remove replies from following/list feeds")
+        else:
+            print("  ⚠ hideReplies conditional code not found")
     
     # =========================================================================
     # Write the modified content
     # =========================================================================
     
     if content != original_content:
-        with open(file_path, 'w') as f:
-            f.write(content)
+        patch_io.write_file(file_path, content)
         print(f"  → Updated {file_path}")
         return True
     else:
@@ -274,194 +280,34 @@ def hide_replies_from_feed():
 
 def revert_changes():
     """
-    Revert the changes made by hide_replies_from_feed().
+    Revert the changes made by hide_replies_from_feed(), replaying the edits
+    journaled when they were applied (same as `a.py --revert E`).
     """
-    print("Reverting PostFeed.tsx...")
-    revert_post_feed()
-    
-    print("\nReverting feed-tuners.tsx...")
-    revert_feed_tuners()
-    
-    print("\n✅ Reverted successfully!")
-
-
-def revert_post_feed():
-    """Revert PostFeed.tsx changes."""
-    file_path = 'src/view/com/posts/PostFeed.tsx'
-    
-    if not os.path.exists(file_path):
-        print(f"  Error: {file_path} not found.")
+    patch_journal.load()
+    reverted, conflicts = patch_journal.revert([os.path.basename(__file__)])
+    for path in reverted:
+        print(f"  ✓ Reverted {os.path.relpath(path)}")
+    for path in conflicts:
+        print(f"  ⚠ Could not revert {os.path.relpath(path)}: it changed since the patch was applied")
+    if not reverted and not conflicts:
+        print("  → Nothing to revert")
         return False
-    
-    with open(file_path, 'r') as f:
-        content = f.read()
-    
-    original_content = content
-    
-    # Revert incomplete thread modification
-    incomplete_thread_modified = '''} else if (slice.isIncompleteThread && slice.items.length >= 3) {
-                // MODIFIED: Only show the last item in incomplete threads
-                // Full thread chain visible when user clicks on the post
-                const last = slice.items.length - 1
-                arr.push(
-                  sliceItem({
-                    type: 'sliceItem',
-                    key: slice.items[last]._reactKey,
-                    slice: slice,
-                    indexInSlice: last,
-                    showReplyTo: false,
-                  }),
-                )
-              }'''
-    
-    incomplete_thread_original = '''} else if (slice.isIncompleteThread && slice.items.length >= 3) {
-                const beforeLast = slice.items.length - 2
-                const last = slice.items.length - 1
-                arr.push(
-                  sliceItem({
-                    type: 'sliceItem',
-                    key: slice.items[0]._reactKey,
-                    slice: slice,
-                    indexInSlice: 0,
-                    showReplyTo: false,
-                  }),
-                )
-                arr.push({
-                  type: 'sliceViewFullThread',
-                  key: slice._reactKey + '-viewFullThread',
-                  uri: slice.items[0].uri,
-                })
-                arr.push(
-                  sliceItem({
-                    type: 'sliceItem',
-                    key: slice.items[beforeLast]._reactKey,
-                    slice: slice,
-                    indexInSlice: beforeLast,
-                    showReplyTo:
-                      slice.items[beforeLast].parentAuthor?.did !==
-                      slice.items[beforeLast].post.author.did,
-                  }),
-                )
-                arr.push(
-                  sliceItem({
-                    type: 'sliceItem',
-                    key: slice.items[last]._reactKey,
-                    slice: slice,
-                    indexInSlice: last,
-                    showReplyTo: false,
-                  }),
-                )
-              }'''
-    
-    if incomplete_thread_modified in content:
-        content = content.replace(incomplete_thread_modified, incomplete_thread_original)
-        print("  ✓ Reverted incomplete thread handling")
-    
-    # Revert regular slice modification
-    regular_slice_modified = '''} else {
-                // MODIFIED: Only show the root post in feed, hide replies
-                // Full reply chain is visible when user clicks on the post
-                arr.push(
-                  sliceItem({
-                    type: 'sliceItem',
-                    key: slice.items[0]._reactKey,
-                    slice: slice,
-                    indexInSlice: 0,
-                    showReplyTo: false,
-                  }),
-                )
-              }'''
-    
-    regular_slice_original = '''} else {
-                for (let i = 0; i < slice.items.length; i++) {
-                  arr.push(
-                    sliceItem({
-                      type: 'sliceItem',
-                      key: slice.items[i]._reactKey,
-                      slice: slice,
-                      indexInSlice: i,
-                      showReplyTo: i === 0,
-                    }),
-                  )
-                }
-              }'''
-    
-    if regular_slice_modified in content:
-        content = content.replace(regular_slice_modified, regular_slice_original)
-        print("  ✓ Reverted regular slice handling")
-    
-    if content != original_content:
-        with open(file_path, 'w') as f:
-            f.write(content)
-        return True
-    return False
-
-
-def revert_feed_tuners():
-    """Revert feed-tuners.tsx changes."""
-    file_path = 'src/state/preferences/feed-tuners.tsx'
-    
-    if not os.path.exists(file_path):
-        print(f"  Error: {file_path} not found.")
-        return False
-    
-    with open(file_path, 'r') as f:
-        content = f.read()
-    
-    original_content = content
-    
-    # Revert feedgen modification
-    feedgen_modified = '''if (feedDesc.startsWith('feedgen')) {
-      // MODIFIED: Always remove replies from feedgen feeds
-      return [
-        FeedTuner.preferredLangOnly(langPrefs.contentLanguages),
-        FeedTuner.removeMutedThreads,
-        FeedTuner.removeReplies, // Hide replies
-      ]
-    }'''
-    
-    feedgen_original = '''if (feedDesc.startsWith('feedgen')) {
-      return [
-        FeedTuner.preferredLangOnly(langPrefs.contentLanguages),
-        FeedTuner.removeMutedThreads,
-      ]
-    }'''
-    
-    if feedgen_modified in content:
-        content = content.replace(feedgen_modified, feedgen_original)
-        print("  ✓ Reverted feedgen modification")
-    
-    # Revert always-remove-replies modification
-    hide_replies_modified = '''// MODIFIED: Always hide replies from feed
-      feedTuners.push(FeedTuner.removeReplies)'''
-    
-    hide_replies_original = '''if (preferences?.feedViewPrefs.hideReplies) {
-        feedTuners.push(FeedTuner.removeReplies)
-      } else {
-        feedTuners.push(
-          FeedTuner.followedRepliesOnly({
-            userDid: currentAccount?.did || '',
-          }),
-        )
-      }'''
-    
-    if hide_replies_modified in content:
-        content = content.replace(hide_replies_modified, hide_replies_original)
-        print("  ✓ Reverted always-hide-replies modification")
-    
-    if content != original_content:
-        with open(file_path, 'w') as f:
-            f.write(content)
-        return True
-    return False
+    print("\n✅ Reverted successfully!" if not conflicts else "\n⚠️  Reverted with conflicts")
+    return not conflicts
 
 
 if __name__ == "__main__":
     import sys
     
-    if len(sys.argv) > 1 and sys.argv[1] == '--revert':
-        print("Reverting all changes...\n")
-        revert_changes()
+    # Anywhere on the command line: cli() strips --dry-run/--diff only once it starts
+    if '--revert' in sys.argv[1:]:
+        # The revert itself is not journaled
+        with patch_io.cli(journal=False) as diff_target:
+            print("Reverting all changes...\n")
+            revert_changes()
+        if diff_target is None:
+            patch_journal.save()
     else:
-        print("Hiding replies from feeds (v3)...\n")
-        hide_replies_from_feed()
+        with patch_io.cli():
+            print("Hiding replies from feeds (v3)...\n")
+            hide_replies_from_feed()
@@ -0,0 +1,146 @@
+"""
+Persistent record of successful script runs, used to skip scripts whose work
+is already done.
+
+After a script succeeds, record() notes the files it touched, and save()
+stores a hash of the script's source (plus its manifest and templates and
+every module of ours it imports, directly or not) and a hash of each of
+those files. The file hashes are taken when the run is saved, after every
+script in it has written: later scripts often edit the same files (C edits
+LeftNav.tsx after A), and hashes taken when A finished would make A stale
+on the next run. is_fresh() is true while all of those hashes still match,
+in which case re-running the script could only repeat its idempotency
+checks and write nothing.
+
+Hashes are taken through patch_io.peek(), so inside a shared overlay they
+reflect the buffered content that is about to be flushed.
+"""
+import ast
+import functools
+import hashlib
+import json
+import os
+
+import patch_io
+import patch_manifest
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Kept in the checkout being patched (the working directory), one per checkout
+CACHE_FILE = os.path.join('.patch-cache', 'runs.json')
+CACHE_VERSION = 1
+
+
+_runs = {}  # script file -> {'script': hash, 'files': {path: hash | None}}
+_pending = {}  # script file -> paths touched in this run, hashed by save()
+_dirty = False
+
+
+def hash_text(text):
+    if text is None:
+        return None
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def local_imports(module_file):
+    """The module files next to this one that module_file imports, directly or not, itself included."""
+    found = [module_file]
+    for name in found:
+        try:
+            with open(os.path.join(BASE_DIR, name), 'r', encoding='utf-8') as f:
+                tree = ast.parse(f.read())
+        except (OSError, SyntaxError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level:
+                modules = [node.module]
+            else:
+                continue
+            for module in modules:
+                path = module.split('.')[0] + '.py'
+                if path not in found and os.path.exists(os.path.join(BASE_DIR, path)):
+                    found.append(path)
+    return tuple(found)
+
+
+def script_version(script_file):
+    """Hash of a script's source, the modules it imports, and its manifest and templates."""
+    digest = hashlib.sha256()
+    paths = [os.path.join(BASE_DIR, name) for name in local_imports(script_file)]
+    for path in paths + patch_manifest.sources(script_file):
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def file_hash(path):
+    return hash_text(patch_io.peek(path))
+
+
+def is_fresh(script_file):
+    """True if the script and every file it touched are unchanged since its last success."""
+    entry = _runs.get(script_file)
+    if entry is None or entry['script'] != script_version(script_file):
+        return False
+    return all(file_hash(path) == expected for path, expected in entry['files'].items())
+
+
+def record(script_file, paths):
+    """Remember a successful run that touched the given paths; they are hashed by save()."""
+    _runs.pop(script_file, None)
+    _pending[script_file] = set(paths)
+
+
+def recorded_files(script_file):
+    """Paths the script touched in its last recorded run."""
+    if script_file in _pending:
+        return set(_pending[script_file])
+    entry = _runs.get(script_file)
+    return set(entry['files']) if entry else set()
+
+
+def forget(script_file):
+    global _dirty
+    _pending.pop(script_file, None)
+    if _runs.pop(script_file, None) is not None:
+        _dirty = True
+
+
+def load(path=CACHE_FILE):
+    """Load recorded runs, replacing any loaded before. Returns the number loaded."""
+    global _dirty
+    _runs.clear()
+    _pending.clear()
+    _dirty = False
+    if not os.path.exists(path):
+        return 0
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    if data.get('version') != CACHE_VERSION:
+        return 0
+    _runs.update(data.get('runs', {}))
+    return len(data.get('runs', {}))
+
+
+def save(path=CACHE_FILE):
+    """Hash the files of the runs recorded since the last save, then write every run out."""
+    global _dirty
+    for script_file, paths in _pending.items():
+        _runs[script_file] = {
+            'script': script_version(script_file),
+            'files': {path: file_hash(path) for path in sorted(paths)},
+        }
+        _dirty = True
+    _pending.clear()
+    if not _dirty:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'runs': _runs}, f, indent=1, sort_keys=True)
+    _dirty = False
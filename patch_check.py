@@ -0,0 +1,714 @@
+"""
+Anchor preflight for a.py --check.
+
+The scripts find where to edit by exact text: a line such as
+"import {forceLTR} from '#/lib/strings/bidi'" that .replace() inserts
+after, a multi-line block it swaps out, or a regex. When an upstream bump
+changes one of them the script only finds out when it gets there, one
+anchor at a time, after earlier scripts have already written their files.
+collect() gathers every anchor of the selected scripts up front and check()
+tests them all against the checkout without running or writing anything,
+reading and scanning each target file once.
+
+Anchors come from:
+
+- the scripts' source, read with ast rather than run: the first argument of
+  .replace(), .find() and .index(), strings tested with `in`, regexes the
+  script compiles at module level and then applies, and lists of (pattern,
+  replacement) pairs passed to a call (regexes when the keyword says so).
+  Each anchor belongs to the last target path its function mentioned, e.g.
+  HANDLES_FILE; a helper that names no file works on its caller's.
+- manifests: every [[patch.edit]] anchor.
+- comment_out_ui's REGEX_TARGETS and INDENT_TARGETS tables.
+
+Not every anchor is needed on every run. A string tested with `not in`
+before an edit, or with `in` before reporting "already" or returning, marks
+that edit as applied, and the anchors it guards are skipped while it is
+present. An anchor whose replacement text is already in the file is
+applied too, as is every anchor of a script whose journaled edits the file
+still holds (see patch_journal). One that an earlier edit of the run
+inserts is fine even though the checkout lacks it. Anchors in an except handler, or in one of two
+if/else branches that both edit, are optional. `else` branches of an
+applied-marker test (fix-ups for older patch versions) are not checked,
+and neither are tsx_tree lookups (find_declaration, find_element) or the
+regex fallbacks of their parse errors: those probe for a declaration, they
+do not need one.
+
+Each file is scanned once with an alternation of all its literal anchors
+and markers, longest first; regex anchors are only tried where their
+literal prefix occurs. A missing anchor is reported with the most similar
+line of the file, unless the script edits it through patch_fuzzy and the
+anchor was only reformatted: then it is reported as relocated, with where.
+"""
+import ast
+import collections
+import difflib
+import os
+import re
+import time
+
+import patch_fuzzy
+import patch_journal
+import patch_manifest
+import pattern_guard
+import pattern_registry
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# A string naming a target file
+PATH_RE = re.compile(r"[\w./-]+\.tsx?")
+# Calls that locate or edit text, taking the anchor as their first argument
+EDIT_METHODS = ('replace', 'find', 'index')
+# tsx_tree lookups, taking a declaration or element name. Scripts use them to
+# probe for a declaration they insert or fall back from when it is absent,
+# so like presence markers they are never required anchors.
+TREE_METHODS = ('find_declaration', 'find_element')
+REGEX_METHODS = ('search', 'match', 'fullmatch', 'sub', 'subn', 'finditer', 'findall')
+# Regex lookups that only find text, without editing it
+LOOKUP_METHODS = ('search', 'match', 'fullmatch')
+EDIT_CALLS = ('replace', 'sub', 'subn', 'apply_edits')
+# Regex replacement tables are applied with DOTALL (process_feed_ui.replace_regex)
+TABLE_FLAGS = re.DOTALL
+# Shorter replacement text is too common to tell that a regex edit was applied
+MIN_APPLIED_TEXT = 8
+# Calls that relocate their anchor (second argument) when upstream reformatted it
+FUZZY_CALLS = ('patch_fuzzy.replace', 'patch_fuzzy.find')
+# Calls taking (content, anchor, replacement, ...): the fuzzy ones and patch_events.replace
+ANCHOR_CALLS = FUZZY_CALLS + ('patch_events.replace',)
+# Calls taking (regex, replacement, content, ...)
+GUARDED_SUBS = ('pattern_guard.sub',)
+BACKREF_RE = re.compile(r"\\(?:\d+|g<[^>]*>)")
+
+Regex = collections.namedtuple('Regex', 'pattern flags name')
+
+
+def _value(node, env):
+    """The constant a simple expression evaluates to, or None."""
+    if isinstance(node, ast.Constant):
+        return node.value if isinstance(node.value, (str, int)) else None
+    if isinstance(node, ast.Name):
+        return env.get(node.id)
+    if isinstance(node, ast.Attribute):
+        # Flags such as re.DOTALL
+        if isinstance(node.value, ast.Name) and node.value.id == 're' and node.attr.isupper():
+            return int(getattr(re, node.attr, 0)) or None
+        return None
+    if isinstance(node, ast.BinOp):
+        left, right = _value(node.left, env), _value(node.right, env)
+        if isinstance(node.op, ast.Add) and isinstance(left, str) and isinstance(right, str):
+            return left + right
+        if isinstance(node.op, ast.BitOr) and isinstance(left, int) and isinstance(right, int):
+            return left | right
+        return None
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for part in node.values:
+            if isinstance(part, ast.FormattedValue):
+                if part.conversion != -1 or part.format_spec is not None:
+                    return None
+                part = part.value
+            value = _value(part, env)
+            if not isinstance(value, str):
+                return None
+            parts.append(value)
+        return ''.join(parts)
+    if isinstance(node, (ast.Tuple, ast.List)):
+        values = [_value(element, env) for element in node.elts]
+        if any(value is None for value in values):
+            return None
+        return tuple(values) if isinstance(node, ast.Tuple) else values
+    if isinstance(node, ast.Call):
+        return _call_value(node, env)
+    return None
+
+
+def _call_value(node, env):
+    func = ast.unparse(node.func)
+    args = [_value(arg, env) for arg in node.args]
+    if func == 'os.path.join' and args and all(isinstance(arg, str) for arg in args):
+        return os.path.join(*args)
+    if func in ('pattern_registry.compile', 're.compile') and args and isinstance(args[0], str):
+        flags = args[1] if len(args) > 1 else 0
+        name = None
+        for keyword in node.keywords:
+            if keyword.arg == 'flags':
+                flags = _value(keyword.value, env)
+            elif keyword.arg == 'name':
+                name = _value(keyword.value, env)
+        if isinstance(flags, int):
+            return Regex(args[0], flags, name)
+    if (isinstance(node.func, ast.Attribute) and node.func.attr in ('strip', 'lstrip', 'rstrip')
+            and not node.args):
+        value = _value(node.func.value, env)
+        if isinstance(value, str):
+            return getattr(value, node.func.attr)()
+    return None
+
+
+def _as_path(node, env):
+    """The target path an expression names: a path constant, or p('src/...')-style helpers."""
+    value = _value(node, env)
+    if isinstance(value, str):
+        return value if PATH_RE.fullmatch(value) else None
+    if isinstance(node, ast.Call) and node.args and (
+            isinstance(node.func, ast.Name) or ast.unparse(node.func) == 'os.path.join'):
+        return _as_path(node.args[-1], env)
+    return None
+
+
+def _mentioned_path(node, env):
+    """The last target path mentioned in an expression, in source order."""
+    path = _as_path(node, env)
+    if path is not None:
+        return path
+    found = None
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            continue
+        found = _mentioned_path(child, env) or found
+    return found
+
+
+def _template_text(repl):
+    """The longest literal piece of a regex replacement template, or None if too short to tell."""
+    pieces = [piece.replace('\\n', '\n').replace('\\t', '\t').replace('\\\\', '\\')
+              for piece in BACKREF_RE.split(repl)]
+    longest = max(pieces, key=lambda piece: len(piece.strip()))
+    return longest if len(longest.strip()) >= MIN_APPLIED_TEXT else None
+
+
+def _is_table(value):
+    return (isinstance(value, list) and value
+            and all(isinstance(item, tuple) and len(item) == 2 and all(isinstance(s, str) for s in item)
+                    for item in value))
+
+
+def _calls(stmts, methods):
+    """True if the statements call a method named in methods."""
+    return any(isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in methods
+               for node in ast.walk(ast.Module(body=stmts, type_ignores=[])))
+
+
+def _exits(stmts):
+    return bool(stmts) and isinstance(stmts[-1], (ast.Return, ast.Continue, ast.Break, ast.Raise))
+
+
+def _says_already(stmts):
+    """True if the statements print an "already applied" message."""
+    for node in ast.walk(ast.Module(body=stmts, type_ignores=[])):
+        if isinstance(node, ast.Call) and ast.unparse(node.func) in ('print', 'patch_events.note'):
+            if 'already' in ast.unparse(node).lower():
+                return True
+    return False
+
+
+class _ScriptScanner:
+    """Collects the anchors of one script from its syntax tree."""
+
+    def __init__(self, script_file, tree):
+        self.script_file = script_file
+        self.env = {}
+        self.functions = {}
+        for stmt in tree.body:
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self.functions[stmt.name] = stmt
+            elif isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Name):
+                value = _value(stmt.value, self.env)
+                if value is not None:
+                    self.env[stmt.targets[0].id] = value
+        self.module_env = dict(self.env)
+        self.items = []  # (function, file or None, anchor)
+        self.calls = []  # (caller, callee, file or None)
+
+    def scan(self):
+        for name, func in self.functions.items():
+            self.function = name
+            self.env = dict(self.module_env)
+            self.current = None
+            self.probing = False
+            self._block(func.body, [], False)
+        return self._resolve()
+
+    def _resolve(self):
+        """Tie anchors found in helpers to the files their callers work on."""
+        bound = {name: set() for name in self.functions}
+        changed = True
+        while changed:
+            changed = False
+            for caller, callee, path in self.calls:
+                files = {path} if path else bound[caller]
+                if not files <= bound[callee]:
+                    bound[callee] |= files
+                    changed = True
+        anchors = []
+        for function, path, anchor in self.items:
+            for target in ([path] if path else sorted(bound[function])):
+                anchors.append(dict(anchor, file=os.path.normpath(target)))
+        return anchors
+
+    def _add(self, node, text, role, markers, optional, applied=None, fuzzy=False):
+        if isinstance(text, Regex):
+            kind, flags, name = 'regex', text.flags, text.name
+            text = text.pattern
+        else:
+            kind, flags, name = 'literal', 0, None
+        if not text:
+            return
+        self.items.append((self.function, self.current, {
+            'script': self.script_file,
+            'source': f"{self.script_file}:{node.lineno}",
+            'text': text,
+            'kind': kind,
+            'flags': flags,
+            'name': name,
+            'role': role,
+            'optional': optional,
+            'guards': [list(markers)],
+            'applied': [applied] if applied else [],
+            'fuzzy': fuzzy,
+        }))
+
+    def _block(self, stmts, markers, optional):
+        markers = list(markers)
+        for stmt in stmts:
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                self._block(stmt.body, markers, optional)
+            elif isinstance(stmt, ast.If):
+                marker = self._if(stmt, markers, optional)
+                if marker is not None:
+                    markers.append(marker)
+            elif isinstance(stmt, ast.Try):
+                self._block(stmt.body, markers, optional)
+                # The fallback of a tsx_tree probe is a probe too
+                probing, self.probing = self.probing, self.probing or _calls(stmt.body, TREE_METHODS)
+                for handler in stmt.handlers:
+                    self._block(handler.body, markers, True)  # a fallback
+                self.probing = probing
+                self._block(stmt.orelse + stmt.finalbody, markers, optional)
+            elif isinstance(stmt, (ast.For, ast.AsyncFor, ast.While)):
+                self._expr(stmt.iter if isinstance(stmt, (ast.For, ast.AsyncFor)) else stmt.test,
+                           markers, optional)
+                self._block(stmt.body + stmt.orelse, markers, optional)
+            elif isinstance(stmt, (ast.With, ast.AsyncWith)):
+                for item in stmt.items:
+                    self._expr(item.context_expr, markers, optional)
+                self._block(stmt.body, markers, optional)
+            else:
+                self._expr(stmt, markers, optional)
+                if isinstance(stmt, ast.Assign):
+                    self._assign(stmt)
+
+    def _assign(self, stmt):
+        value = _value(stmt.value, self.env)
+        if value is None:
+            value = _as_path(stmt.value, self.env)
+        for target in stmt.targets:
+            if isinstance(target, ast.Name):
+                if value is None:
+                    self.env.pop(target.id, None)
+                else:
+                    self.env[target.id] = value
+
+    def _probe(self, test):
+        """(text or Regex, negated) for `X in ...`, `X not in ...` and `[not] RE.search(...)` tests."""
+        negated = False
+        if isinstance(test, ast.UnaryOp) and isinstance(test.op, ast.Not):
+            negated, test = True, test.operand
+        if (isinstance(test, ast.Compare) and len(test.ops) == 1
+                and isinstance(test.ops[0], (ast.In, ast.NotIn))):
+            text = _value(test.left, self.env)
+            if isinstance(text, str) and text:
+                return text, negated != isinstance(test.ops[0], ast.NotIn)
+        if (isinstance(test, ast.Call) and isinstance(test.func, ast.Attribute)
+                and test.func.attr in REGEX_METHODS):
+            regex = _value(test.func.value, self.env)
+            if isinstance(regex, Regex):
+                return regex, negated
+        return None, False
+
+    def _has_edits(self, stmts):
+        for node in ast.walk(ast.Module(body=stmts, type_ignores=[])):
+            if not isinstance(node, ast.Call):
+                continue
+            if isinstance(node.func, ast.Attribute) and node.func.attr in EDIT_CALLS:
+                return True
+            if isinstance(node.func, ast.Name) and node.func.id in self.functions:
+                return True
+        return False
+
+    def _if(self, stmt, markers, optional):
+        """Walk an if statement; returns a marker guarding the statements after it, if it sets one."""
+        path = _mentioned_path(stmt.test, self.env)
+        if path:
+            self.current = path
+        if all(isinstance(s, ast.Pass) for s in stmt.body) and not stmt.orelse:
+            return None  # a test whose outcome changes nothing
+        probe, negated = self._probe(stmt.test)
+        body_edits = self._has_edits(stmt.body)
+        else_edits = self._has_edits(stmt.orelse)
+
+        if probe is not None and negated and body_edits:
+            # `if MARKER not in content:` applies the edit; its else is a fix-up of an applied file
+            self._block(stmt.body, markers + [probe], optional)
+            return None
+        if probe is None and body_edits and isinstance(stmt.test, ast.BoolOp) and isinstance(stmt.test.op, ast.And):
+            # `if A not in content and B not in content:` is the same, with either marker applying it
+            probes = [self._probe(value) for value in stmt.test.values]
+            if all(text is not None and value_negated for text, value_negated in probes):
+                self._block(stmt.body, markers + [text for text, _ in probes], optional)
+                return None
+        if probe is not None and not negated and not body_edits and (
+                _says_already(stmt.body) or (_exits(stmt.body) and not stmt.orelse)):
+            # `if MARKER in content: print("already ...")` / `return`
+            if stmt.orelse:
+                self._block(stmt.orelse, markers + [probe], optional)
+                return None
+            return probe
+
+        alternatives = optional or (body_edits and else_edits)
+        if probe is not None:
+            self._add(stmt, probe, 'test', markers, alternatives)
+        else:
+            tests = stmt.test.values if isinstance(stmt.test, ast.BoolOp) else [stmt.test]
+            for test in tests:
+                text, test_negated = self._probe(test)
+                if text is not None and not test_negated:
+                    self._add(stmt, text, 'test', markers, alternatives)
+            self._expr(stmt.test, markers, alternatives, mention=False)
+        self._block(stmt.body, markers, alternatives)
+        self._block(stmt.orelse, markers, alternatives)
+        return None
+
+    def _expr(self, node, markers, optional, mention=True):
+        if mention:
+            path = _mentioned_path(node, self.env)
+            if path:
+                self.current = path
+        for sub in ast.walk(node):
+            if isinstance(sub, ast.Call):
+                self._call(sub, markers, optional)
+
+    def _text(self, node):
+        value = _value(node, self.env)
+        return value if isinstance(value, str) and value else None
+
+    def _call(self, call, markers, optional):
+        func = call.func
+        if isinstance(func, ast.Attribute) and call.args:
+            if ast.unparse(func) in ANCHOR_CALLS and len(call.args) > 1:
+                # patch_fuzzy.replace/find(content, anchor, ...), patch_events.replace(content, anchor, ...)
+                applied = self._text(call.args[2]) if func.attr == 'replace' and len(call.args) > 2 else None
+                self._add(call, self._text(call.args[1]), 'edit', markers, optional, applied,
+                          fuzzy=ast.unparse(func) in FUZZY_CALLS)
+            elif ast.unparse(func) in GUARDED_SUBS and len(call.args) > 1:
+                regex = _value(call.args[0], self.env)
+                if isinstance(regex, Regex):
+                    applied = _template_text(self._text(call.args[1])) if self._text(call.args[1]) else None
+                    self._add(call, regex, 'edit', markers, optional, applied)
+            elif func.attr in EDIT_METHODS and self._text(call.args[0]):
+                applied = self._text(call.args[1]) if func.attr == 'replace' and len(call.args) > 1 else None
+                self._add(call, self._text(call.args[0]), 'edit', markers, optional, applied)
+            elif func.attr in TREE_METHODS:
+                pass
+            elif func.attr in REGEX_METHODS and not (self.probing and func.attr in LOOKUP_METHODS):
+                regex = _value(func.value, self.env)
+                if isinstance(regex, Regex):
+                    applied = None
+                    if func.attr in ('sub', 'subn') and self._text(call.args[0]):
+                        applied = _template_text(self._text(call.args[0]))
+                    self._add(call, regex, 'edit', markers, optional, applied)
+
+        for keyword, arg in [(None, arg) for arg in call.args] + [(kw.arg, kw.value) for kw in call.keywords]:
+            table = _value(arg, self.env)
+            if not _is_table(table):
+                continue
+            for old, new in table:
+                if keyword and 'regex' in keyword:
+                    self._add(arg, Regex(old, TABLE_FLAGS, None), 'edit', markers, optional, _template_text(new))
+                else:
+                    # Literal tables go through patch_fuzzy (process_feed_ui.process_file)
+                    self._add(arg, old, 'edit', markers, optional, new, fuzzy=True)
+
+        if isinstance(func, ast.Name) and func.id in self.functions:
+            path = next((p for p in (_as_path(arg, self.env) for arg in call.args) if p), None)
+            self.calls.append((self.function, func.id, path or self.current))
+
+
+def _table_anchors(script_file, env):
+    """Anchors of a script that drives a shared engine from REGEX_TARGETS / INDENT_TARGETS."""
+    anchors = []
+    base = {'script': script_file, 'source': f"{script_file} (table)", 'optional': False,
+            'guards': [[]], 'applied': [], 'fuzzy': False}
+    for path, patterns in env.get('REGEX_TARGETS') or []:
+        for name, (pattern, style) in patterns:
+            anchors.append(dict(base, file=os.path.normpath(path), text=pattern, kind='regex',
+                                flags=re.DOTALL, name=name, role='edit'))
+    for path, (start_tags, targets) in env.get('INDENT_TARGETS') or []:
+        for text in list(start_tags) + list(targets):
+            anchors.append(dict(base, file=os.path.normpath(path), text=text, kind='literal',
+                                flags=0, name=None, role='test'))
+    return anchors
+
+
+def _manifest_anchors(script_file, manifest):
+    anchors = []
+    for patch in manifest.get('patch', []):
+        for index, edit in enumerate(patch['edit']):
+            text = patch_manifest.text_of(manifest, edit)
+            op = edit.get('op', 'replace')
+            applied = {'after': edit['anchor'] + text, 'before': text + edit['anchor']}.get(op, text)
+            markers = [marker for marker in (patch.get('unless'), edit.get('unless')) if marker]
+            anchors.append({
+                'script': script_file,
+                'source': f"manifests/{manifest['name']}.toml ({patch.get('name') or patch['file']} edit {index + 1})",
+                'file': os.path.normpath(patch['file']),
+                'text': edit['anchor'],
+                'kind': 'literal',
+                'flags': 0,
+                'name': None,
+                'role': 'edit',
+                'optional': edit.get('optional', False),
+                'guards': [markers],
+                'applied': [applied],
+                'fuzzy': True,
+            })
+    return anchors
+
+
+def _merge(anchors):
+    """One anchor per (script, file, text), keeping every place it is used."""
+    merged = {}
+    for anchor in anchors:
+        key = (anchor['script'], anchor['file'], anchor['kind'], anchor['text'])
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = dict(anchor, guards=list(anchor['guards']), applied=list(anchor['applied']))
+            continue
+        existing['guards'] += anchor['guards']
+        existing['applied'] += [text for text in anchor['applied'] if text not in existing['applied']]
+        existing['optional'] = existing['optional'] and anchor['optional']
+        existing['fuzzy'] = existing['fuzzy'] or anchor['fuzzy']
+        if anchor['role'] == 'edit':
+            existing['role'] = 'edit'
+    return list(merged.values())
+
+
+def collect(script_files):
+    """
+    Every anchor of the given scripts, in order. Returns (anchors, created)
+    where created maps the paths their manifests create to the new content.
+    """
+    anchors, created = [], {}
+    for script_file in script_files:
+        with open(os.path.join(SCRIPT_DIR, script_file), 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), script_file)
+        scanner = _ScriptScanner(script_file, tree)
+        found = scanner.scan() + _table_anchors(script_file, scanner.module_env)
+        name = patch_manifest.name_for(script_file)
+        if name is not None:
+            manifest = patch_manifest.load(name)
+            found += _manifest_anchors(script_file, manifest)
+            for item in manifest.get('create', []):
+                created[os.path.normpath(item['path'])] = patch_manifest.text_of(manifest, item)
+        anchors += _merge(found)
+    return anchors, created
+
+
+def scan(content, needles):
+    """Every position of every needle in content, found in one left-to-right pass."""
+    needles = sorted({needle for needle in needles if needle}, key=len, reverse=True)
+    found = {needle: [] for needle in needles}
+    if not needles:
+        return found
+    # The alternation reports the longest needle at each position; shorter
+    # needles that start there are prefixes of it
+    prefixes = {needle: [other for other in needles if len(other) < len(needle) and needle.startswith(other)]
+                for needle in needles}
+    scanner = pattern_registry.compile('|'.join(re.escape(needle) for needle in needles), traced=False)
+    pos = 0
+    while True:
+        hit = scanner.search(content, pos)
+        if not hit:
+            break
+        start = hit.start()
+        for needle in [hit.group()] + prefixes[hit.group()]:
+            found[needle].append(start)
+        pos = start + 1
+    return found
+
+
+def nearest(content, text):
+    """(line number, line, similarity) of the place in content most like text, or None."""
+    wanted = [line.strip() for line in text.splitlines() if line.strip()]
+    if not wanted:
+        return None
+    lines = content.splitlines()
+    stripped = [line.strip() for line in lines]
+    best = None
+    for candidate in difflib.get_close_matches(wanted[0], set(stripped), n=3, cutoff=0.5):
+        for index, line in enumerate(stripped):
+            if line != candidate:
+                continue
+            window = [line for line in stripped[index:index + len(wanted) * 2] if line][:len(wanted)]
+            ratio = difflib.SequenceMatcher(None, '\n'.join(wanted), '\n'.join(window)).ratio()
+            if best is None or ratio > best[2]:
+                best = (index + 1, lines[index].strip(), ratio)
+    return best
+
+
+def _literal_needle(anchor):
+    return anchor['text'] if anchor['kind'] == 'literal' else pattern_registry.literal_prefix(anchor['text'])
+
+
+def _regex_matches(anchor, content, positions, path):
+    compiled = pattern_registry.compile(anchor['text'], anchor['flags'], name=anchor['name'])
+    if positions is None:
+        # No literal prefix to scan for
+        return 1 if pattern_guard.search(compiled, content, path=path) else 0
+    return sum(1 for pos in positions if pattern_guard.match(compiled, content, pos, path=path))
+
+
+def check(anchors, created=None):
+    """
+    Test each anchor against the files on disk (and the loaded journal).
+    Returns one result per anchor: the anchor with a 'status' (ok,
+    duplicate, applied, inserted, relocated, optional, missing or no file),
+    'count' and, for relocated and missing anchors, 'nearest' (line number,
+    line, similarity).
+    """
+    created = created or {}
+    by_file = {}
+    for index, anchor in enumerate(anchors):
+        by_file.setdefault(anchor['file'], []).append((index, anchor))
+
+    results = [None] * len(anchors)
+    for path, items in by_file.items():
+        if os.path.isfile(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        else:
+            content = created.get(path)
+        if content is None:
+            for index, anchor in items:
+                results[index] = dict(anchor, status='no file', count=0, nearest=None)
+            continue
+
+        needles = {_literal_needle(anchor) for _, anchor in items}
+        for _, anchor in items:
+            for guard in anchor['guards']:
+                needles.update(marker for marker in guard if isinstance(marker, str))
+        found = scan(content, needles)
+        journaled = patch_journal.applied_scripts(path, content)
+
+        def present(marker):
+            if isinstance(marker, Regex):
+                compiled = pattern_registry.compile(marker.pattern, marker.flags, name=marker.name)
+                return pattern_guard.search(compiled, content, path=path) is not None
+            return bool(found.get(marker))
+
+        for index, anchor in items:
+            needle = _literal_needle(anchor)
+            if anchor['kind'] == 'literal':
+                count = len(found[needle])
+            else:
+                count = _regex_matches(anchor, content, found[needle] if needle else None, path)
+            inserted = any(
+                anchor['text'] in text
+                for other_index, other in items
+                if other_index <= index and other['text'] != anchor['text']
+                for text in other['applied']
+            ) if anchor['kind'] == 'literal' else False
+
+            if all(any(present(marker) for marker in guard) for guard in anchor['guards']):
+                status = 'applied'
+            elif count > 1 and anchor['kind'] == 'literal' and anchor['role'] == 'edit':
+                status = 'duplicate'
+            elif count:
+                status = 'ok'
+            elif anchor['script'] in journaled or any(text in content for text in anchor['applied']):
+                status = 'applied'
+            elif inserted:
+                status = 'inserted'
+            else:
+                status = 'optional' if anchor['optional'] else 'missing'
+            result = dict(anchor, status=status, count=count, nearest=None)
+            relocated = (patch_fuzzy.locate(content, anchor['text'])
+                         if status in ('optional', 'missing') and anchor['fuzzy'] else None)
+            if relocated:
+                start, end, score = relocated
+                result['status'] = 'relocated'
+                result['nearest'] = (content.count('\n', 0, start) + 1, content[start:end].strip(), score)
+            elif status in ('optional', 'missing') and needle:
+                result['nearest'] = nearest(content, needle)
+            results[index] = result
+    return results
+
+
+def _shown(text, width=90):
+    lines = text.strip().splitlines() or ['']
+    first = lines[0].strip()
+    if len(first) > width:
+        first = first[:width - 3] + '...'
+    more = f"  (+{len(lines) - 1} more lines)" if len(lines) > 1 else ''
+    return f"{first!r}{more}"
+
+
+PROBLEM_ICONS = {'no file': '❌', 'missing': '❌', 'duplicate': '⚠️ ', 'optional': '⚠️ ', 'relocated': '⚠️ '}
+
+
+def report(results, labels=None, seconds=None):
+    """
+    Print the problems found, grouped by script, and a summary. labels maps a
+    script file to the key shown in front of it. Returns True when every
+    required anchor was found.
+    """
+    labels = labels or {}
+    by_script = {}
+    for result in results:
+        by_script.setdefault(result['script'], []).append(result)
+
+    for script_file, items in by_script.items():
+        label = f"[{labels[script_file]}] " if script_file in labels else ''
+        problems = [result for result in items if result['status'] in PROBLEM_ICONS]
+        if not problems:
+            print(f"✅ {label}{script_file}: {len(items)} anchor(s) OK")
+            continue
+        print(f"\n{label}{script_file}: {len(problems)} of {len(items)} anchor(s) need attention")
+        missing_files = set()
+        for result in problems:
+            icon = PROBLEM_ICONS[result['status']]
+            if result['status'] == 'no file':
+                if result['file'] not in missing_files:
+                    missing_files.add(result['file'])
+                    print(f"  {icon} {result['file']}: file not found")
+                continue
+            what = {
+                'missing': "anchor not found",
+                'optional': "optional anchor not found",
+                'duplicate': f"anchor appears {result['count']} times",
+                'relocated': "anchor reformatted, will be relocated",
+            }[result['status']]
+            kind = f"regex '{result['name']}'" if result['kind'] == 'regex' and result['name'] else result['kind']
+            print(f"  {icon} {result['file']}: {what} ({kind}, {result['source']})")
+            print(f"       {_shown(result['text'])}")
+            if result['nearest']:
+                line_no, line, ratio = result['nearest']
+                print(f"       closest, line {line_no} ({ratio:.0%}): {_shown(line)}")
+
+    counts = collections.Counter(result['status'] for result in results)
+    files = len({result['file'] for result in results})
+    took = f" in {seconds:.2f}s" if seconds is not None else ''
+    print(f"\nChecked {len(results)} anchor(s) in {files} file(s){took}: "
+          f"{counts['ok'] + counts['duplicate']} found, {counts['applied']} already applied, "
+          f"{counts['inserted']} inserted by earlier edits, {counts['relocated']} relocated, "
+          f"{counts['missing']} missing, "
+          f"{counts['optional']} optional missing, {counts['duplicate']} duplicated, "
+          f"{counts['no file']} in missing files")
+    return not counts['missing'] and not counts['no file']
+
+
+def run(script_files, labels=None):
+    """Collect, check and report the anchors of the given scripts. Returns True if all are found."""
+    start = time.perf_counter()
+    anchors, created = collect(script_files)
+    results = check(anchors, created)
+    return report(results, labels, time.perf_counter() - start)
@@ -0,0 +1,87 @@
+"""
+git-style unified diffs of in-memory file edits, in the same format as
+changes.diff: `diff --git` headers with abbreviated blob ids, three lines of
+context and the enclosing function name after each hunk range, so the output
+can be fed straight to `git apply`.
+"""
+import difflib
+import hashlib
+
+import pattern_registry
+
+CONTEXT_LINES = 3
+ABBREV = 9
+NULL_ID = '0' * ABBREV
+
+# git's default hunk header heuristic: the nearest earlier line that starts
+# with a letter, '_' or '$'
+FUNCNAME_RE = pattern_registry.compile(r"[A-Za-z_$]", name='diff function name')
+
+
+def blob_id(content):
+    """Abbreviated git blob id of a file's content."""
+    data = content.encode('utf-8')
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()[:ABBREV]
+
+
+def _range(start, length):
+    if length == 0:
+        return f"{start},0"
+    if length == 1:
+        return f"{start + 1}"
+    return f"{start + 1},{length}"
+
+
+def _funcname(lines, before):
+    for index in range(before - 1, -1, -1):
+        if FUNCNAME_RE.match(lines[index]):
+            return lines[index].rstrip()[:80]
+    return ''
+
+
+def _emit(out, prefix, line):
+    out.append(prefix + line)
+    if not line.endswith('\n'):
+        out.append('\n\\ No newline at end of file\n')
+
+
+def file_diff(rel_path, old, new):
+    """
+    Unified diff turning old into new. old or new may be None for a created
+    or deleted file. Returns '' when the contents are identical.
+    """
+    if old == new:
+        return ''
+    old_lines = old.splitlines(keepends=True) if old else []
+    new_lines = new.splitlines(keepends=True) if new else []
+
+    out = [f"diff --git a/{rel_path} b/{rel_path}\n"]
+    if old is None:
+        out.append("new file mode 100644\n")
+        out.append(f"index {NULL_ID}..{blob_id(new)}\n")
+    elif new is None:
+        out.append("deleted file mode 100644\n")
+        out.append(f"index {blob_id(old)}..{NULL_ID}\n")
+    else:
+        out.append(f"index {blob_id(old)}..{blob_id(new)} 100644\n")
+    out.append(f"--- {'/dev/null' if old is None else 'a/' + rel_path}\n")
+    out.append(f"+++ {'/dev/null' if new is None else 'b/' + rel_path}\n")
+
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for group in matcher.get_grouped_opcodes(CONTEXT_LINES):
+        first, last = group[0], group[-1]
+        old_start, old_len = first[1], last[2] - first[1]
+        new_start, new_len = first[3], last[4] - first[3]
+        header = f"@@ -{_range(old_start, old_len)} +{_range(new_start, new_len)} @@"
+        funcname = _funcname(old_lines, old_start)
+        out.append(f"{header} {funcname}\n" if funcname else header + '\n')
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                for line in old_lines[i1:i2]:
+                    _emit(out, ' ', line)
+                continue
+            for line in old_lines[i1:i2]:
+                _emit(out, '-', line)
+            for line in new_lines[j1:j2]:
+                _emit(out, '+', line)
+    return ''.join(out)
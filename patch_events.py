@@ -0,0 +1,193 @@
+"""
+Structured results of patch operations, for a.py --json.
+
+Every edit a script makes records one event. The shared helpers that look
+for an anchor and edit at it (replace() here and patch_fuzzy's, manifest
+edits, guarded regex substitutions) record their own; scripts wrap other
+edits in operation(). An event has the file, the anchor (its first line, or
+the pattern's name), a status, the bytes changed and how long it took.
+Scripts report their soft failures, which they used to only print ("Error:
+Could not find PostMeta code ..."), through note(), which prints the same
+line and records it as an event too.
+
+Statuses:
+    applied     the edit was made at the exact anchor
+    relocated   the edit was made where a reformatted anchor was found
+    already     the edit was already in place
+    not found   the anchor is missing; nothing was changed
+    no match    a regex matched nothing, e.g. because its edit was made before
+    warning     the script carried on some other way (e.g. a fallback)
+    error       a file the script needs is missing
+
+Recording is off until enable(). Inside streaming(), each event is emitted
+as soon as it is recorded. A script run as a subprocess records when
+PATCH_EVENTS_FILE is set and appends each event to it as an NDJSON line,
+which a.py reads with read_events() while the script runs.
+"""
+import contextlib
+import json
+import os
+import time
+
+_events = None  # recorded events while enabled, None when disabled
+_stream = None  # where emit() writes NDJSON lines
+_tags = None  # fields added to events streamed as they are recorded, None when not streaming
+_sink = None  # PATCH_EVENTS_FILE, in a subprocess
+
+
+def enable():
+    global _events
+    if _events is None:
+        _events = []
+
+
+def enabled():
+    return _events is not None
+
+
+def _anchor_text(anchor):
+    if not anchor:
+        return None
+    lines = anchor.strip().splitlines()
+    return lines[0].strip()[:120] if lines else None
+
+
+def _common_prefix(a, b, chunk=4096):
+    # Skip the chunks that are equal, then compare characters in the first that differs
+    end = min(len(a), len(b))
+    start = 0
+    while start < end and a[start:start + chunk] == b[start:start + chunk]:
+        start += chunk
+    if start >= end:
+        return end
+    return start + len(os.path.commonprefix([a[start:start + chunk], b[start:start + chunk]]))
+
+
+def bytes_changed(before, after):
+    """UTF-8 size of the stretch of text that differs between before and after."""
+    before, after = before or '', after or ''
+    if before == after:
+        return 0
+    prefix = _common_prefix(before, after)
+    suffix = _common_prefix(before[prefix:][::-1], after[prefix:][::-1])
+    old = before[prefix:len(before) - suffix]
+    new = after[prefix:len(after) - suffix]
+    return max(len(old.encode('utf-8')), len(new.encode('utf-8')))
+
+
+def record(status, file=None, anchor=None, size=0, duration=None, message=None):
+    if _events is None:
+        return
+    event = {
+        'event': 'patch',
+        'file': os.path.relpath(file) if file else None,
+        'anchor': _anchor_text(anchor),
+        'status': status,
+        'bytes': size,
+        'duration': duration,
+        'message': message,
+    }
+    _events.append(event)
+    if _sink is not None:
+        _sink.write(json.dumps(event, ensure_ascii=False) + '\n')
+        _sink.flush()
+    forward(event)
+
+
+@contextlib.contextmanager
+def operation(file, anchor):
+    """
+    Time one edit. The block sets op['status'] (and op['before'] and
+    op['after'] for the content it changed); nothing is recorded while the
+    status is unset.
+    """
+    op = {}
+    start = time.perf_counter()
+    yield op
+    if _events is not None and op.get('status'):
+        record(op['status'], file, anchor, bytes_changed(op.get('before'), op.get('after')),
+               time.perf_counter() - start)
+
+
+def replace(content, old, new, path=None):
+    """
+    content.replace(old, new), recorded as one event: applied, already (new
+    is there instead of old) or not found.
+    """
+    with operation(path, old) as op:
+        if old in content:
+            op.update(status='applied', before=content, after=content.replace(old, new))
+            return op['after']
+        op['status'] = 'already' if new in content else 'not found'
+        return content
+
+
+def note(message, status='not found', file=None, anchor=None):
+    """Print a script's message, and record it as an event."""
+    print(message)
+    record(status, file, anchor, message=message.strip(' \n⚠️❌'))
+
+
+def mark():
+    return len(_events) if _events is not None else 0
+
+
+def events(since=0):
+    return list(_events[since:]) if _events is not None else []
+
+
+def open_stream(stream):
+    """Write emitted events to stream (e.g. stdout, before it is redirected). Returns the previous one."""
+    global _stream
+    previous, _stream = _stream, stream
+    return previous
+
+
+def emit(event):
+    if _stream is None or _events is None:
+        return
+    _stream.write(json.dumps(event, ensure_ascii=False) + '\n')
+    _stream.flush()
+
+
+@contextlib.contextmanager
+def streaming(**tags):
+    """Emit the events recorded (or forwarded) inside the block right away, with tags added."""
+    global _tags
+    previous, _tags = _tags, tags
+    try:
+        yield
+    finally:
+        _tags = previous
+
+
+def forward(event):
+    """Emit an event recorded here or read from a subprocess, when streaming."""
+    if _tags is not None:
+        emit({'event': event['event'], **_tags, **event})
+
+
+def read_events(path, offset=0):
+    """
+    The complete event lines a subprocess has appended to path since offset.
+    Returns the events and the offset to read from next.
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return [], offset
+    data = data[:data.rfind(b'\n') + 1]
+    events = []
+    for line in data.decode('utf-8').splitlines():
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            pass
+    return events, offset + len(data)
+
+
+if os.environ.get('PATCH_EVENTS_FILE'):
+    enable()
+    _sink = open(os.environ['PATCH_EVENTS_FILE'], 'a', encoding='utf-8')
@@ -0,0 +1,199 @@
+"""
+Relocation of edit anchors that upstream has reformatted.
+
+An exact anchor such as a multi-line `<PostMeta ... />` block stops matching
+as soon as upstream re-indents it, wraps a line or adds a prop. locate()
+finds the one region of the file that still matches it closely enough.
+
+Anchors are compared as tokens (identifiers, numbers and single punctuation
+characters), so whitespace, line breaks and indentation never count. Each
+file version is indexed once by its token trigrams ("shingles"); locating
+an anchor looks up only the anchor's own shingles, and every hit votes for
+where the anchor would start. The best-voted starts are then scored with
+difflib on the tokens around them, so the work grows with the anchor and
+its hits, not with the file.
+
+The score is difflib's ratio over tokens: 1.0 when only whitespace differs.
+A region is used only at or above THRESHOLD (PATCH_FUZZY_THRESHOLD or
+a.py --fuzzy-threshold, default 0.9; 0 disables relocation), and only if no
+other region qualifies as well, so an edit never picks one of two similar
+blocks. A single-line anchor, such as an import, is relocated only at
+LINE_THRESHOLD (1.0, whitespace differences alone): one line differs from
+a neighbouring import by a single token and would still score about 0.93.
+replace() also leaves a region alone when it is closer to the
+replacement than to the anchor: the edit is already there.
+"""
+import collections
+import difflib
+import functools
+import os
+
+import patch_events
+import patch_trace
+import pattern_registry
+
+THRESHOLD = float(os.environ.get('PATCH_FUZZY_THRESHOLD') or 0.9)
+SHINGLE = 3      # tokens per shingle
+MIN_TOKENS = 8   # shorter anchors are too common to relocate safely
+LINE_THRESHOLD = 1.0  # single-line anchors: only whitespace may differ
+CANDIDATES = 8   # best-voted starts scored per anchor
+
+TOKEN_RE = pattern_registry.compile(r"\w+|[^\w\s]", name='fuzzy anchor token', traced=False)
+
+
+def set_threshold(ratio):
+    global THRESHOLD
+    THRESHOLD = float(ratio)
+
+
+def tokenize(text):
+    """Tokens of text, and the (start, end) offset of each."""
+    tokens, spans = [], []
+    for match in TOKEN_RE.finditer(text):
+        tokens.append(match.group())
+        spans.append(match.span())
+    return tokens, spans
+
+
+class ShingleIndex:
+    """The tokens of one file version and where each token trigram occurs."""
+
+    def __init__(self, content):
+        self.tokens, self.spans = tokenize(content)
+        self.shingles = collections.defaultdict(list)
+        for i in range(len(self.tokens) - SHINGLE + 1):
+            self.shingles[tuple(self.tokens[i:i + SHINGLE])].append(i)
+
+    def votes(self, wanted):
+        """For each token position, how many of wanted's shingles put its start there."""
+        votes = collections.Counter()
+        for offset in range(len(wanted) - SHINGLE + 1):
+            for pos in self.shingles.get(tuple(wanted[offset:offset + SHINGLE]), ()):
+                votes[pos - offset] += 1
+        return votes
+
+
+@functools.lru_cache(maxsize=16)
+def index(content):
+    """The shingle index of content, built once per file version."""
+    return ShingleIndex(content)
+
+
+def similarity(a, b):
+    """Token-level similarity of two texts, 0..1."""
+    return difflib.SequenceMatcher(None, tokenize(a)[0], tokenize(b)[0], autojunk=False).ratio()
+
+
+def _align(wanted, tokens, lo, hi):
+    """Score of wanted against the best-matching stretch of tokens[lo:hi], and that token range."""
+    window = tokens[lo:hi]
+    matcher = difflib.SequenceMatcher(None, wanted, window, autojunk=False)
+    blocks = [block for block in matcher.get_matching_blocks() if block.size]
+    if not blocks:
+        return 0.0, lo, lo
+    # Stretch over anchor tokens that differ at either end
+    first = max(0, blocks[0].b - blocks[0].a)
+    tail = len(wanted) - blocks[-1].a - blocks[-1].size
+    last = min(len(window), blocks[-1].b + blocks[-1].size + tail)
+    matched = sum(block.size for block in blocks)
+    return 2 * matched / (len(wanted) + last - first), lo + first, lo + last
+
+
+def _widen(content, start, end, anchor):
+    """Take in the whitespace the anchor starts or ends with, e.g. a block's indentation."""
+    leading = anchor[:len(anchor) - len(anchor.lstrip())]
+    newlines = leading.count('\n')
+    while start > 0 and content[start - 1].isspace() and leading:
+        if content[start - 1] == '\n':
+            if not newlines:
+                break
+            newlines -= 1
+        start -= 1
+    trailing = anchor[len(anchor.rstrip()):]
+    newlines = trailing.count('\n')
+    while end < len(content) and content[end].isspace() and trailing:
+        if content[end] == '\n':
+            if not newlines:
+                break
+            newlines -= 1
+        end += 1
+    return start, end
+
+
+def locate(content, anchor, threshold=None):
+    """
+    (start, end, score) of the one region of content that matches anchor at
+    or above the threshold, or None when there is none or more than one.
+    """
+    threshold = THRESHOLD if threshold is None else threshold
+    wanted = tokenize(anchor)[0]
+    if threshold <= 0 or len(wanted) < MIN_TOKENS:
+        return None
+    if '\n' not in anchor.strip():
+        threshold = max(threshold, LINE_THRESHOLD)
+    with patch_trace.span('fuzzy', anchor.strip().splitlines()[0][:40]):
+        shingles = index(content)
+        slack = len(wanted) // 4 + 2
+        starts = []
+        for start, _ in shingles.votes(wanted).most_common():
+            if len(starts) == CANDIDATES:
+                break
+            # Starts a few tokens apart are the same region with an insertion or deletion
+            if all(abs(start - other) > slack for other in starts):
+                starts.append(start)
+
+        regions = []
+        for start in starts:
+            score, first, last = _align(wanted, shingles.tokens, max(0, start - slack),
+                                        start + len(wanted) + slack)
+            if score >= threshold and all(last <= f or first >= l for _, f, l in regions):
+                regions.append((score, first, last))
+        if len(regions) != 1:
+            return None
+        score, first, last = regions[0]
+        start, end = _widen(content, shingles.spans[first][0], shingles.spans[last - 1][1], anchor)
+        return start, end, score
+
+
+def _report(content, anchor, found, path):
+    start, end, score = found
+    line = content.count('\n', 0, start) + 1
+    first = anchor.strip().splitlines()[0].strip()
+    print(f"  ~ Relocated anchor {first[:60]!r} to {path or 'the file'} line {line} ({score:.0%} match)")
+
+
+def find(content, anchor, path=None):
+    """(start, end) of anchor in content: exact if present, else its relocated region, else None."""
+    start = content.find(anchor)
+    if start != -1:
+        return start, start + len(anchor)
+    found = locate(content, anchor)
+    if found is None:
+        return None
+    _report(content, anchor, found, path)
+    return found[0], found[1]
+
+
+def replace(content, old, new, path=None):
+    """
+    content.replace(old, new). If old is not in content, replace the region
+    it was relocated to instead; content is returned unchanged when there is
+    no such region or the edit is already in place.
+    """
+    with patch_events.operation(path, old) as op:
+        if old in content:
+            op.update(status='applied', before=content, after=content.replace(old, new))
+            return op['after']
+        op['status'] = 'already'
+        if new in content:
+            return content
+        found = locate(content, old)
+        if found is None:
+            op['status'] = 'not found'
+            return content
+        start, end, score = found
+        if similarity(new, content[start:end]) >= score:
+            return content  # the region is the replacement, already applied
+        _report(content, old, found, path)
+        op.update(status='relocated', before=content, after=content[:start] + new + content[end:])
+        return op['after']
@@ -0,0 +1,414 @@
+"""
+Shared file access for the patch scripts.
+
+Outside of an overlay every call goes straight to disk. Inside an overlay()
+block each file is loaded lazily on first access, every script transforms the
+same in-memory buffer, and only files whose content actually changed are
+written back - once per file, in one transaction - when the block exits.
+flush() stages every file and renames them all into place only once each one
+is safely on disk, restoring the original bytes if any step fails; a block
+that raises writes nothing. Scripts run on their own get an overlay through
+cli().
+
+Every path checked, read or written inside a tracking() block is recorded, so
+callers can tell exactly which files a script depends on. A script run as a
+subprocess records its paths into the file named by PATCH_IO_TRACK_FILE.
+
+An overlay opened with write=False is a dry run: nothing is written, and
+diff() renders the pending changes as one git-style unified diff. Scripts
+run on their own get this through cli(), which handles --dry-run/--diff.
+
+block_changes() reports what the innermost overlay() block changed; a.py
+and cli() hand those edits to patch_journal so they can be reverted. A
+script run as a subprocess writes them to PATCH_IO_CHANGES_FILE.
+"""
+import atexit
+import contextlib
+import json
+import os
+import stat
+import sys
+import tempfile
+
+import patch_diff
+import patch_trace
+
+# Active overlay: absolute path -> {'original': str | None, 'content': str | None}
+# A value of None means the file does not exist (yet).
+_overlay = None
+
+# Content of each overlay entry when each enclosing overlay() block began
+_savepoints = []
+
+# Absolute paths touched while tracking, or None when not tracking
+_accessed = None
+
+
+def _io_span(action, path):
+    if not patch_trace.enabled():
+        return contextlib.nullcontext()
+    return patch_trace.span('io', f"{action} {os.path.relpath(path)}")
+
+
+def _disk_read(path):
+    with _io_span('read', path), open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _disk_write(path, content):
+    with _io_span('write', path), open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def _load(path):
+    key = os.path.abspath(path)
+    if key not in _overlay:
+        content = None
+        if os.path.exists(key):
+            content = _disk_read(key)
+        _overlay[key] = {'original': content, 'content': content}
+    return _overlay[key]
+
+
+def _track(path):
+    if _accessed is not None:
+        _accessed.add(os.path.abspath(path))
+
+
+def exists(path):
+    _track(path)
+    if _overlay is None:
+        return os.path.exists(path)
+    return _load(path)['content'] is not None
+
+
+def read_file(path):
+    _track(path)
+    if _overlay is None:
+        return _disk_read(path)
+
+    entry = _load(path)
+    if entry['content'] is None:
+        raise FileNotFoundError(f"No such file: {path}")
+    return entry['content']
+
+
+def write_file(path, content):
+    _track(path)
+    if _overlay is None:
+        _disk_write(path, content)
+        return
+    _load(path)['content'] = content
+
+
+def remove_file(path):
+    """Delete a file. Inside an overlay the deletion is buffered like a write."""
+    _track(path)
+    if _overlay is None:
+        os.remove(path)
+        return
+    _load(path)['content'] = None
+
+
+def peek(path):
+    """Current content of a file (None if missing) without recording the access."""
+    if _overlay is not None:
+        return _load(path)['content']
+    if not os.path.exists(path):
+        return None
+    return _disk_read(path)
+
+
+def preload(path, content):
+    """Seed the active overlay with content for path, as if it were on disk (used by bench/)."""
+    _overlay[os.path.abspath(path)] = {'original': content, 'content': content}
+
+
+def makedirs(path):
+    """Create a directory for new files. Inside an overlay, flush() does this instead."""
+    if _overlay is None:
+        os.makedirs(path, exist_ok=True)
+
+
+def changed_files():
+    """Return the overlay entries whose content differs from disk (content None: deleted)."""
+    if _overlay is None:
+        return {}
+    return {
+        path: entry for path, entry in _overlay.items()
+        if entry['content'] != entry['original']
+    }
+
+
+def block_changes():
+    """
+    {path: (before, after)} for every file changed since the innermost
+    overlay() block began; None stands for a missing file.
+    """
+    if _overlay is None:
+        return {}
+    snapshot = _savepoints[-1]
+    changes = {}
+    for path, entry in _overlay.items():
+        before = snapshot.get(path, entry['original'])
+        if entry['content'] != before:
+            changes[path] = (before, entry['content'])
+    return changes
+
+
+def _stage(path, content):
+    """Write content to a fsynced temp file beside path, with path's permissions."""
+    directory, name = os.path.split(path)
+    fd, temp = tempfile.mkstemp(prefix=f".{name}.", suffix='.tmp', dir=directory)
+    try:
+        if os.path.exists(path):
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.fchmod(fd, mode)
+        with _io_span('write', path), os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.remove(temp)
+        raise
+    return temp
+
+
+def _new_dirs(directory):
+    """Create directory and any missing parents, returning the ones created (outermost first)."""
+    missing = []
+    while directory and not os.path.isdir(directory):
+        missing.append(directory)
+        directory = os.path.dirname(directory)
+    for path in reversed(missing):
+        os.mkdir(path)
+    return list(reversed(missing))
+
+
+def _sync_dir(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # e.g. Windows, where directories cannot be opened
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def flush():
+    """
+    Write every changed file back to disk as one transaction and return the
+    paths written. All new contents are staged in temp files next to their
+    targets and fsynced before any target is touched, then renamed over them.
+    Deleted files are removed in the same step. If anything fails, the
+    targets already replaced or removed get their original bytes back, files
+    and directories that did not exist are removed, and the error propagates.
+    """
+    changed = sorted(changed_files().items())
+    created_dirs = []
+    staged = []    # (path, temp file, original bytes or None)
+    replaced = []  # (path, original bytes or None)
+    try:
+        for path, entry in changed:
+            original = None
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    original = f.read()
+            if entry['content'] is None:
+                staged.append((path, None, original))  # deleted
+                continue
+            created_dirs += _new_dirs(os.path.dirname(path))
+            staged.append((path, _stage(path, entry['content']), original))
+        for path, temp, original in staged:
+            if temp is None:
+                os.remove(path)
+            else:
+                os.replace(temp, path)
+            replaced.append((path, original))
+        for directory in sorted({os.path.dirname(path) for path, _ in changed}):
+            _sync_dir(directory)
+    except BaseException:
+        _roll_back(staged, replaced, created_dirs)
+        raise
+    for path, entry in changed:
+        entry['original'] = entry['content']
+    return [path for path, _ in changed]
+
+
+def _roll_back(staged, replaced, created_dirs):
+    for path, original in reversed(replaced):
+        if original is None:
+            os.remove(path)
+            continue
+        with open(path, 'wb') as f:
+            f.write(original)
+    for _, temp, _ in staged:
+        if temp is not None and os.path.exists(temp):
+            os.remove(temp)
+    for directory in reversed(created_dirs):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+
+
+def diff(root=None):
+    """Unified diff of every pending change, with paths relative to root (default: cwd)."""
+    root = root or os.getcwd()
+    parts = []
+    for path, entry in sorted(changed_files().items()):
+        rel_path = os.path.relpath(path, root).replace(os.sep, '/')
+        parts.append(patch_diff.file_diff(rel_path, entry['original'], entry['content']))
+    return ''.join(parts)
+
+
+@contextlib.contextmanager
+def overlay(write=True):
+    """
+    Buffer all reads and writes in memory until the block exits. Nested
+    overlays share the outermost buffer, which is the only one that flushes;
+    each nested block is a savepoint whose changes are discarded if it
+    raises. Yields a list that is filled with the flushed paths on exit.
+    With write=False nothing is flushed; call diff() inside the block
+    instead. If the block raises, nothing is written.
+    """
+    global _overlay
+    written = []
+    if _overlay is not None:
+        _savepoints.append({path: entry['content'] for path, entry in _overlay.items()})
+        try:
+            yield written
+        except BaseException as e:
+            if not _clean_exit(e):
+                rollback()
+            raise
+        finally:
+            _savepoints.pop()
+        return
+
+    _overlay = {}
+    _savepoints.append({})
+    try:
+        yield written
+        if write:
+            written.extend(flush())
+    except BaseException as e:
+        if write and _clean_exit(e):
+            written.extend(flush())
+        raise
+    finally:
+        _savepoints.clear()
+        _overlay = None
+
+
+def _clean_exit(error):
+    return isinstance(error, SystemExit) and error.code in (None, 0)
+
+
+def rollback():
+    """Discard every change buffered since the innermost overlay() block began."""
+    if _overlay is None:
+        return
+    snapshot = _savepoints[-1]
+    for path, entry in _overlay.items():
+        entry['content'] = snapshot.get(path, entry['original'])
+
+
+def pop_dry_run_args(argv):
+    """
+    Remove --dry-run and --diff [FILE] from argv (in place) so scripts that
+    read sys.argv themselves are unaffected. Returns None for a normal run,
+    '-' to print the diff to stdout, or the file to write it to.
+    """
+    target = None
+    for flag in ('--dry-run', '--diff'):
+        while flag in argv:
+            index = argv.index(flag)
+            del argv[index]
+            target = target or '-'
+            if flag == '--diff' and index < len(argv) and not argv[index].startswith('-'):
+                target = argv.pop(index)
+    return target
+
+
+def write_diff(text, target):
+    if target == '-':
+        sys.stdout.write(text)
+        sys.stdout.flush()
+        return
+    with open(target, 'w', encoding='utf-8') as f:
+        f.write(text)
+    print(f"Wrote diff of {text.count('diff --git ')} file(s) to {target}", file=sys.stderr)
+
+
+@contextlib.contextmanager
+def cli(journal=True):
+    """
+    Command-line wrapper for a script's entry point. Its edits are buffered
+    and flushed together when it finishes, so a script that fails part way
+    leaves no file half-patched, and are then journaled so a.py --revert can
+    undo them (pass journal=False for a run that is itself a revert). With
+    --dry-run or --diff FILE the script runs against an in-memory overlay
+    and the combined diff is written to stdout (progress then goes to
+    stderr) or FILE instead of modifying the working tree. Yields the diff
+    target ('-' or FILE), or None for a normal run.
+    """
+    target = pop_dry_run_args(sys.argv)
+    if target is None:
+        # Every file the script changes is written in one transaction at the end
+        with overlay():
+            yield None
+            changes = block_changes()
+        if journal:
+            _hand_off_changes(os.path.basename(sys.argv[0]), changes)
+        return
+    # Keep stdout clean for the diff when it is streamed there
+    quiet = contextlib.redirect_stdout(sys.stderr) if target == '-' else contextlib.nullcontext()
+    with overlay(write=False), quiet:
+        yield target
+        text = diff()
+    write_diff(text, target)
+
+
+@contextlib.contextmanager
+def tracking():
+    """Yield a set that collects every path accessed inside the block."""
+    global _accessed
+    previous = _accessed
+    _accessed = set()
+    try:
+        yield _accessed
+    finally:
+        if previous is not None:
+            previous |= _accessed
+        _accessed = previous
+
+
+def _hand_off_changes(script_file, changes):
+    """Pass a script's edits to a.py when it is running us, otherwise journal them here."""
+    changes_file = os.environ.get('PATCH_IO_CHANGES_FILE')
+    if changes_file:
+        with open(changes_file, 'w', encoding='utf-8') as f:
+            json.dump(changes, f)
+        return
+    import patch_journal  # imports this module, so only load it when needed
+    patch_journal.load()
+    patch_journal.record(script_file, changes)
+    patch_journal.save()
+
+
+def _dump_accessed(path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(sorted(_accessed)))
+
+
+if os.environ.get('PATCH_IO_TRACK_FILE'):
+    _accessed = set()
+    atexit.register(_dump_accessed, os.environ['PATCH_IO_TRACK_FILE'])
@@ -0,0 +1,186 @@
+"""
+Reversible log of the edits each script has made, for a.py --revert.
+
+After a script succeeds, record() turns each file it changed into an entry:
+the path, hashes of the content before and after, and the edits as
+[offset, old text, new text, context] runs of whole lines, where offset is
+where the new text starts in the patched file and context is the line just
+above it. Only changed lines are stored, except for files the script
+created, whose whole content is the one edit.
+
+revert() replays the entries of the chosen scripts backwards, newest first,
+in one pass per file. While a file still hashes to an entry's after-hash
+its offsets are exact; if another script has edited the file since, each
+edit is found again by its context and new text, and an edit that cannot be
+found uniquely leaves that file untouched and is reported as a conflict.
+Files a script created are deleted again.
+
+Entries go stale when a file is restored by other means (git checkout, a
+hand-written undo). record() notices when a file returns to the state from
+before an entry and drops that entry and the later ones for the file.
+"""
+import difflib
+import json
+import os
+
+import patch_cache
+import patch_io
+
+# Kept in the checkout being patched (the working directory), one per checkout
+JOURNAL_FILE = os.path.join('.patch-cache', 'journal.json')
+JOURNAL_VERSION = 1
+
+# In the order applied: {'script', 'path', 'before', 'after', 'created', 'edits'}
+_entries = []
+_dirty = False
+
+
+def line_edits(before, after):
+    """[offset, old, new, context] for each run of lines that differs, offsets into after."""
+    old_lines = before.splitlines(keepends=True)
+    new_lines = after.splitlines(keepends=True)
+    offsets = [0]
+    for line in new_lines:
+        offsets.append(offsets[-1] + len(line))
+    edits = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        context = new_lines[j1 - 1] if j1 > 0 else ''
+        edits.append([offsets[j1], ''.join(old_lines[i1:i2]), ''.join(new_lines[j1:j2]), context])
+    return edits
+
+
+def _forget_from(path, state_hash):
+    """Drop the earliest entry for path that started from state_hash, and every later one."""
+    global _dirty
+    for index, entry in enumerate(_entries):
+        if entry['path'] == path and entry['before'] == state_hash:
+            _entries[index:] = [e for e in _entries[index:] if e['path'] != path]
+            _dirty = True
+            return True
+    return False
+
+
+def record(script_file, changes):
+    """Journal the {path: (before, after)} changes of one successful script run."""
+    global _dirty
+    for path, (before, after) in sorted(changes.items()):
+        before_hash, after_hash = patch_cache.hash_text(before), patch_cache.hash_text(after)
+        # The file was reset since some entry was made: those edits are gone
+        _forget_from(path, before_hash)
+        if _forget_from(path, after_hash) or after is None:
+            continue  # this change just undid earlier ones (scripts never delete files)
+        _entries.append({
+            'script': script_file,
+            'path': path,
+            'before': before_hash,
+            'after': after_hash,
+            'created': before is None,
+            'edits': [[0, '', after, '']] if before is None else line_edits(before, after),
+        })
+        _dirty = True
+
+
+def scripts():
+    """Script files with at least one journaled entry."""
+    return sorted({entry['script'] for entry in _entries})
+
+
+def applied_scripts(path, content):
+    """Scripts whose journaled edits to path are all still in content (it is the last journaled state)."""
+    path = os.path.abspath(path)
+    entries = [entry for entry in _entries if os.path.abspath(entry['path']) == path]
+    if not entries or patch_cache.hash_text(content) != entries[-1]['after']:
+        return set()
+    return {entry['script'] for entry in entries}
+
+
+def _locate(content, offset, new, context):
+    """Where new text of an edit now starts in content, or None if it cannot be told."""
+    if content.startswith(new, offset) and content.endswith(context, 0, offset):
+        return offset
+    needle = context + new
+    if not needle or content.count(needle) != 1:
+        return None
+    return content.index(needle) + len(context)
+
+
+def undo(content, entry):
+    """content with entry's edits taken back out, or None on a conflict."""
+    exact = patch_cache.hash_text(content) == entry['after']
+    for offset, old, new, context in reversed(entry['edits']):
+        if not exact:
+            offset = _locate(content, offset, new, context)
+            if offset is None:
+                return None
+        content = content[:offset] + old + content[offset + len(new):]
+    return content
+
+
+def revert(script_files):
+    """
+    Undo every journaled edit made by the given scripts, through patch_io so
+    it can be buffered in an overlay. Returns (reverted paths, conflicts),
+    where conflicts maps a path to the script whose edit could not be undone.
+    """
+    global _dirty
+    chosen = [entry for entry in _entries if entry['script'] in script_files]
+    by_path = {}
+    for entry in reversed(chosen):
+        by_path.setdefault(entry['path'], []).append(entry)
+
+    reverted, conflicts, undone = [], {}, []
+    for path, entries in by_path.items():
+        content = patch_io.read_file(path) if patch_io.exists(path) else None
+        done = []
+        for entry in entries:
+            result = undo(content, entry) if content is not None else None
+            if result is None:
+                conflicts[path] = entry['script']
+                break
+            content = result
+            done.append(entry)
+        if path in conflicts:
+            continue  # leave the file as it is rather than half-reverted
+        if done[-1]['created'] and content == '':
+            patch_io.remove_file(path)
+        else:
+            patch_io.write_file(path, content)
+        reverted.append(path)
+        undone += done
+
+    if undone:
+        undone_ids = {id(entry) for entry in undone}
+        _entries[:] = [entry for entry in _entries if id(entry) not in undone_ids]
+        _dirty = True
+    return reverted, conflicts
+
+
+def load(path=JOURNAL_FILE):
+    """Load the journal, replacing any loaded before. Returns the number of entries loaded."""
+    global _dirty
+    _entries.clear()
+    _dirty = False
+    if not os.path.exists(path):
+        return 0
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    if data.get('version') != JOURNAL_VERSION:
+        return 0
+    _entries[:] = data.get('entries', [])
+    return len(_entries)
+
+
+def save(path=JOURNAL_FILE):
+    global _dirty
+    if not _dirty:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': JOURNAL_VERSION, 'entries': _entries}, f, separators=(',', ':'))
+    _dirty = False
@@ -0,0 +1,263 @@
+"""
+Declarative patch manifests: the files a script creates and the anchored
+edits it makes, kept out of the Python source.
+
+A script's manifest is manifests/<script name>.toml:
+
+    [[create]]
+    path = "src/components/Post/InlineTextPost.tsx"
+    template = "InlineTextPost.tsx.tmpl"
+    unless = "export {InlineTextPost}"  # keep the file once it exists
+
+    [[patch]]
+    name = "PostFeedItem.tsx"
+    file = "src/view/com/posts/PostFeedItem.tsx"
+    unless = "InlineTextPost"        # already applied when this text is present
+
+      [[patch.edit]]
+      anchor = "import * as bsky from '#/types/bsky'"
+      op = "after"                   # "replace" (default), "after" or "before"
+      text = "\\nimport {InlineTextPost} from '#/components/Post/InlineTextPost'"
+
+A created file is written unless it already has the template's content, or
+contains the create's `unless` text (for files that another script edits
+after they are created). Each edit takes its text inline (`text`) or from a template file under
+manifests/templates/<script name>/ (`template`). An edit may have its own
+`unless`, and `optional = true` lets its anchor be missing; otherwise a
+missing anchor fails the whole patch and the file is left untouched. An
+anchor upstream has only reformatted is relocated with patch_fuzzy.
+Paths are relative to the checkout root.
+
+load() parses and validates a manifest in full before anything runs, and
+caches it. Template bodies are read only when an edit or create that needs
+them is applied, so a script that is not run never loads its templates.
+"""
+import functools
+import os
+import tomllib
+
+import patch_events
+import patch_fuzzy
+import patch_io
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_DIR = os.path.join(BASE_DIR, 'manifests')
+TEMPLATE_DIR = os.path.join(MANIFEST_DIR, 'templates')
+
+EDIT_OPS = ('replace', 'after', 'before')
+CREATE_KEYS = {'path', 'template', 'unless'}
+PATCH_KEYS = {'name', 'file', 'unless', 'edit'}
+EDIT_KEYS = {'anchor', 'op', 'text', 'template', 'unless', 'optional'}
+
+
+class ManifestError(ValueError):
+    """A manifest that cannot be loaded, with every problem found in it."""
+
+    def __init__(self, path, problems):
+        self.path = path
+        self.problems = problems
+        super().__init__(f"{os.path.relpath(path)}: " + '; '.join(problems))
+
+
+def manifest_path(name):
+    return os.path.join(MANIFEST_DIR, f"{name}.toml")
+
+
+def name_for(script_file):
+    """Manifest name for a script file, or None if it has no manifest."""
+    name = os.path.splitext(os.path.basename(script_file))[0]
+    return name if os.path.exists(manifest_path(name)) else None
+
+
+def _check_text_source(name, where, item, problems):
+    if ('text' in item) == ('template' in item):
+        problems.append(f"{where}: needs exactly one of 'text' or 'template'")
+    elif 'text' in item and not isinstance(item['text'], str):
+        problems.append(f"{where}: 'text' must be a string")
+    elif 'template' in item and not os.path.isfile(os.path.join(TEMPLATE_DIR, name, str(item['template']))):
+        problems.append(f"{where}: template '{item['template']}' not found in manifests/templates/{name}/")
+
+
+def _check_keys(where, item, allowed, required, problems):
+    for key in sorted(set(item) - allowed):
+        problems.append(f"{where}: unknown key '{key}'")
+    for key in required:
+        if not isinstance(item.get(key), str) or not item.get(key):
+            problems.append(f"{where}: '{key}' must be a non-empty string")
+
+
+def validate(name, data):
+    """Every problem with a parsed manifest, as a list of messages."""
+    problems = []
+    for key in sorted(set(data) - {'create', 'patch'}):
+        problems.append(f"unknown table '{key}'")
+    for index, item in enumerate(data.get('create', [])):
+        where = f"create[{index}]"
+        _check_keys(where, item, CREATE_KEYS, ('path', 'template'), problems)
+        _check_text_source(name, where, item, problems)
+    for index, patch in enumerate(data.get('patch', [])):
+        where = f"patch[{index}] ({patch.get('name') or patch.get('file')})"
+        _check_keys(where, patch, PATCH_KEYS, ('file',), problems)
+        if not patch.get('edit'):
+            problems.append(f"{where}: has no [[patch.edit]] entries")
+        for edit_index, edit in enumerate(patch.get('edit', [])):
+            edit_where = f"{where} edit[{edit_index}]"
+            _check_keys(edit_where, edit, EDIT_KEYS, ('anchor',), problems)
+            if edit.get('op', 'replace') not in EDIT_OPS:
+                problems.append(f"{edit_where}: op must be one of {', '.join(EDIT_OPS)}")
+            if not isinstance(edit.get('optional', False), bool):
+                problems.append(f"{edit_where}: 'optional' must be true or false")
+            _check_text_source(name, edit_where, edit, problems)
+    return problems
+
+
+@functools.lru_cache(maxsize=None)
+def load(name):
+    """The parsed and validated manifest `name`. Raises ManifestError."""
+    path = manifest_path(name)
+    try:
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    except OSError as e:
+        raise ManifestError(path, [f"cannot read: {e.strerror}"])
+    except tomllib.TOMLDecodeError as e:
+        raise ManifestError(path, [f"invalid TOML: {e}"])
+    problems = validate(name, data)
+    if problems:
+        raise ManifestError(path, problems)
+    data['name'] = name
+    return data
+
+
+def check(names):
+    """Load every named manifest; returns the ManifestErrors raised."""
+    errors = []
+    for name in names:
+        try:
+            load(name)
+        except ManifestError as e:
+            errors.append(e)
+    return errors
+
+
+@functools.lru_cache(maxsize=None)
+def template(name, rel_path):
+    """Body of a template file, read on first use."""
+    with open(os.path.join(TEMPLATE_DIR, name, rel_path), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def text_of(manifest, item):
+    """The text an edit or create entry supplies, inline or from its template."""
+    if 'text' in item:
+        return item['text']
+    return template(manifest['name'], item['template'])
+
+
+def preload(name):
+    """Load manifest `name` and read all its templates now, e.g. before forking workers that share them."""
+    manifest = load(name)
+    edits = [edit for patch in manifest.get('patch', []) for edit in patch['edit']]
+    for item in manifest.get('create', []) + edits:
+        text_of(manifest, item)
+    return manifest
+
+
+def sources(script_file):
+    """The manifest and template files a script's output depends on."""
+    name = name_for(script_file)
+    if name is None:
+        return []
+    paths = [manifest_path(name)]
+    template_dir = os.path.join(TEMPLATE_DIR, name)
+    if os.path.isdir(template_dir):
+        paths += sorted(os.path.join(template_dir, entry) for entry in os.listdir(template_dir))
+    return paths
+
+
+def clear_cache():
+    """Forget loaded manifests and templates (e.g. after they were edited)."""
+    load.cache_clear()
+    template.cache_clear()
+
+
+def create_files(manifest, root=''):
+    """Write every [[create]] file that is not already in place. Returns the paths written."""
+    written = []
+    for item in manifest.get('create', []):
+        path = os.path.join(root, item['path'])
+        text = text_of(manifest, item)
+        current = patch_io.read_file(path) if patch_io.exists(path) else None
+        if current == text or (current is not None and item.get('unless') and item['unless'] in current):
+            print(f"  {path} already created.")
+            continue
+        patch_io.makedirs(os.path.dirname(path))
+        patch_io.write_file(path, text)
+        print(f"  ✓ Created {path}")
+        written.append(path)
+    return written
+
+
+def apply_edit(content, edit, text):
+    """Apply one edit at the first occurrence of its anchor (apply_patch checks it is the only one)."""
+    anchor = edit['anchor']
+    op = edit.get('op', 'replace')
+    if op == 'after':
+        return content.replace(anchor, anchor + text, 1)
+    if op == 'before':
+        return content.replace(anchor, text + anchor, 1)
+    return content.replace(anchor, text, 1)
+
+
+def apply_patch(manifest, patch, root=''):
+    """
+    Apply one [[patch]] to its file. Returns True when the file is patched
+    (now or already), False when the file or a required anchor is missing or
+    an anchor occurs more than once.
+    """
+    path = os.path.join(root, patch['file'])
+    label = patch.get('name') or path
+    if not patch_io.exists(path):
+        patch_events.note(f"  Error: File not found: {path}", 'error', path)
+        return False
+    content = patch_io.read_file(path)
+    if patch.get('unless') and patch['unless'] in content:
+        patch_events.note(f"  {label} already modified.", 'already', path, patch['unless'])
+        return True
+
+    new_content = content
+    for edit in patch['edit']:
+        with patch_events.operation(path, edit['anchor']) as op:
+            if edit.get('unless') and edit['unless'] in new_content:
+                op['status'] = 'already'
+                continue
+            op['status'] = 'applied'
+            if edit['anchor'] not in new_content:
+                # Reformatted upstream: edit the region the anchor was relocated to
+                found = patch_fuzzy.find(new_content, edit['anchor'], path)
+                if found is None:
+                    op['status'] = 'not found'
+                    if edit.get('optional'):
+                        continue
+                    print(f"  Error: Could not find anchor in {path}: {edit['anchor'].strip().splitlines()[0]!r}")
+                    return False
+                op['status'] = 'relocated'
+                edit = dict(edit, anchor=new_content[found[0]:found[1]])
+            if new_content.count(edit['anchor']) > 1:
+                op['status'] = 'error'
+                print(f"  Error: Anchor is not unique in {path}: {edit['anchor'].strip().splitlines()[0]!r}")
+                return False
+            op['before'] = new_content
+            new_content = op['after'] = apply_edit(new_content, edit, text_of(manifest, edit))
+
+    if new_content != content:
+        patch_io.write_file(path, new_content)
+        print(f"  ✓ Modified {label}")
+    else:
+        print(f"  No changes for {label}")
+    return True
+
+
+def patches(manifest, file=None):
+    """The manifest's [[patch]] entries, optionally only those for one file."""
+    return [patch for patch in manifest.get('patch', []) if file is None or patch['file'] == file]
@@ -0,0 +1,198 @@
+"""
+Timing instrumentation for a.py --profile.
+
+When enabled, span() records how long each script, file read/write, pattern
+compile and pattern application takes. pattern_registry hands out
+TracedPattern wrappers so every sub()/search()/... call is timed under the
+pattern's registered name (e.g. "Media Tab Content"). When disabled, span()
+does nothing and patterns are returned unwrapped.
+
+A script run as a subprocess traces itself when PATCH_TRACE_FILE is set and
+dumps its events there on exit, so a.py can merge them. Events use
+perf_counter_ns() timestamps, which share one clock across processes on
+Linux, and can be written out as Chrome trace JSON (chrome://tracing,
+ui.perfetto.dev or speedscope).
+"""
+import atexit
+import contextlib
+import json
+import os
+import threading
+import time
+
+_events = None  # list of recorded events while tracing, None when disabled
+_ready_ns = None  # when tracing was enabled in this process
+
+
+def enable():
+    global _events, _ready_ns
+    if _events is None:
+        _events = []
+        _ready_ns = time.perf_counter_ns()
+
+
+def enabled():
+    return _events is not None
+
+
+def ready_ns():
+    return _ready_ns
+
+
+def record(category, name, start_ns, end_ns, pid=None, **args):
+    if _events is None:
+        return
+    _events.append({
+        'cat': category,
+        'name': name,
+        'ts': start_ns,
+        'dur': end_ns - start_ns,
+        'pid': pid or os.getpid(),
+        'tid': threading.get_ident(),
+        'args': args,
+    })
+
+
+@contextlib.contextmanager
+def span(category, name, **args):
+    """Time the enclosed block as one event."""
+    if _events is None:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        record(category, name, start, time.perf_counter_ns(), **args)
+
+
+def mark():
+    return len(_events) if _events is not None else 0
+
+
+def events(since=0):
+    return list(_events[since:]) if _events is not None else []
+
+
+def extend(new_events):
+    if _events is not None:
+        _events.extend(new_events)
+
+
+class TracedPattern:
+    """A compiled pattern whose matching methods are timed under its name."""
+    __slots__ = ('_pattern', '_name', '_resolve')
+
+    def __init__(self, pattern, name=None, resolve=None):
+        self._pattern = pattern
+        self._name = name
+        self._resolve = resolve
+
+    @property
+    def trace_name(self):
+        if self._name is None:
+            self._name = self._resolve(self._pattern) if self._resolve else self._pattern.pattern[:40]
+        return self._name
+
+    def __getattr__(self, attr):
+        return getattr(self._pattern, attr)
+
+    def _timed(self, method, *args, **kwargs):
+        with span('pattern', self.trace_name, method=method):
+            return getattr(self._pattern, method)(*args, **kwargs)
+
+    def search(self, *args, **kwargs):
+        return self._timed('search', *args, **kwargs)
+
+    def match(self, *args, **kwargs):
+        return self._timed('match', *args, **kwargs)
+
+    def fullmatch(self, *args, **kwargs):
+        return self._timed('fullmatch', *args, **kwargs)
+
+    def sub(self, *args, **kwargs):
+        return self._timed('sub', *args, **kwargs)
+
+    def subn(self, *args, **kwargs):
+        return self._timed('subn', *args, **kwargs)
+
+    def split(self, *args, **kwargs):
+        return self._timed('split', *args, **kwargs)
+
+    def findall(self, *args, **kwargs):
+        return self._timed('findall', *args, **kwargs)
+
+    def finditer(self, *args, **kwargs):
+        # Consume eagerly so the time spent matching lands inside the span
+        with span('pattern', self.trace_name, method='finditer'):
+            return iter(list(self._pattern.finditer(*args, **kwargs)))
+
+
+def unwrap(pattern):
+    """The compiled pattern behind a TracedPattern (or the pattern itself)."""
+    return pattern._pattern if isinstance(pattern, TracedPattern) else pattern
+
+
+def hot_spots():
+    """Aggregate events by (category, name): calls, total, and max nanoseconds."""
+    table = {}
+    for event in _events or []:
+        key = (event['cat'], event['name'])
+        calls, total, longest = table.get(key, (0, 0, 0))
+        table[key] = (calls + 1, total + event['dur'], max(longest, event['dur']))
+    return sorted(
+        ((cat, name, calls, total, longest) for (cat, name), (calls, total, longest) in table.items()),
+        key=lambda row: row[3], reverse=True,
+    )
+
+
+def report(limit=25, wall_ns=None):
+    rows = hot_spots()
+    print(f"\n{'category':<9} {'name':<52} {'calls':>6} {'total ms':>9} {'mean ms':>8} {'max ms':>8}"
+          + (f" {'% wall':>6}" if wall_ns else ''))
+    print("-" * (98 if wall_ns else 91))
+    for cat, name, calls, total, longest in rows[:limit]:
+        shown = name if len(name) <= 52 else name[:49] + '...'
+        line = (f"{cat:<9} {shown:<52} {calls:>6} {total / 1e6:>9.2f} {total / calls / 1e6:>8.3f} "
+                f"{longest / 1e6:>8.2f}")
+        if wall_ns:
+            line += f" {100 * total / wall_ns:>5.1f}%"
+        print(line)
+    if len(rows) > limit:
+        print(f"... {len(rows) - limit} more")
+
+
+def write_chrome_trace(path):
+    """Write all events as Chrome trace 'complete' events (microsecond units)."""
+    trace = [{
+        'name': event['name'],
+        'cat': event['cat'],
+        'ph': 'X',
+        'ts': event['ts'] / 1000,
+        'dur': event['dur'] / 1000,
+        'pid': event['pid'],
+        'tid': event['tid'],
+        'args': event['args'],
+    } for event in _events or []]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+
+
+def _dump(path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'ready_ns': _ready_ns, 'events': _events}, f)
+
+
+def load_dump(path):
+    """Events and ready time written by a traced subprocess, or ([], None)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return [], None
+    return data.get('events') or [], data.get('ready_ns')
+
+
+if os.environ.get('PATCH_TRACE_FILE'):
+    enable()
+    atexit.register(_dump, os.environ['PATCH_TRACE_FILE'])
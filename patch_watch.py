@@ -0,0 +1,147 @@
+"""
+File watchers for a.py --watch.
+
+make_watcher() returns an inotify-based watcher on Linux (through ctypes, no
+extra packages) and falls back to polling file stats everywhere else. Both
+expose the same two calls: update(paths) to replace the watched set, and
+wait(debounce) which blocks until at least one watched file changes, keeps
+collecting changes until the files have been quiet for `debounce` seconds,
+and returns the set of changed absolute paths.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# inotify event masks (from <sys/inotify.h>)
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+POLL_INTERVAL = 0.5
+
+
+class InotifyWatcher:
+    """
+    Watches the parent directories of the target files, so editors and git
+    checkouts that replace a file by renaming over it are still noticed.
+    """
+
+    def __init__(self, paths):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}  # watch descriptor -> directory
+        self._paths = set()
+        self.update(paths)
+
+    def update(self, paths):
+        self._paths = {os.path.abspath(path) for path in paths}
+        watched = set(self._dirs.values())
+        for directory in {os.path.dirname(path) for path in self._paths} - watched:
+            if not os.path.isdir(directory):
+                continue
+            wd = self._add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd >= 0:
+                self._dirs[wd] = directory
+
+    def _read_events(self):
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped; treat everything as changed
+                    changed |= self._paths
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is not None and name:
+                    path = os.path.join(directory, os.fsdecode(name))
+                    if path in self._paths:
+                        changed.add(path)
+
+    def wait(self, debounce):
+        changed = set()
+        while not changed:
+            select.select([self._fd], [], [])
+            changed |= self._read_events()
+        while select.select([self._fd], [], [], debounce)[0]:
+            changed |= self._read_events()
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Compares each file's (mtime, size) every POLL_INTERVAL seconds."""
+
+    def __init__(self, paths):
+        self._stats = {}
+        self.update(paths)
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def update(self, paths):
+        paths = {os.path.abspath(path) for path in paths}
+        self._stats = {path: self._stats.get(path, self._stat(path)) for path in paths}
+
+    def _poll(self):
+        changed = set()
+        for path, previous in self._stats.items():
+            current = self._stat(path)
+            if current != previous:
+                self._stats[path] = current
+                changed.add(path)
+        return changed
+
+    def wait(self, debounce):
+        changed = set()
+        while not changed:
+            time.sleep(POLL_INTERVAL)
+            changed |= self._poll()
+        while True:
+            time.sleep(debounce)
+            more = self._poll()
+            if not more:
+                return changed
+            changed |= more
+
+    def close(self):
+        pass
+
+
+def make_watcher(paths, polling=False):
+    """An inotify watcher where available, otherwise a polling one."""
+    if not polling:
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(paths)
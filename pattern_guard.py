@@ -0,0 +1,272 @@
+"""
+Time budgets for applying the patch scripts' regular expressions.
+
+Many patterns are DOTALL with a lazy `.*?` running up to a closing token
+(e.g. '</SettingsList.LinkItem>'). If upstream drops that token the pattern
+scans, and backtracks, over the rest of the file from every start position,
+and a script that normally takes milliseconds hangs. sub() and match() run
+the pattern under a budget and raise PatternTimeout naming the pattern and
+the file instead.
+
+On the main thread the budget is an ITIMER_REAL alarm; the regex engine
+checks for signals while it scans, so the alarm interrupts it. Elsewhere
+(a thread, or a platform without SIGALRM) the call runs once, in a forked
+child that is killed when the budget runs out, and its result comes back
+over a pipe: sub()'s new text, or where match() and search() matched, which
+the parent turns back into a match object with one anchored match() at
+that position (a miss, the case that scans the most, is not run again).
+The child only runs the pattern and writes the pipe before os._exit(), so
+it takes no lock another thread may have held at the fork. Without fork
+the pattern simply runs unguarded.
+
+Each guarded call also records how much text the pattern had to scan and
+how far its match reached, per pattern, in stats(); under --profile the
+same numbers travel on the trace events so summarize() can rebuild them for
+scripts run as subprocesses. sub() also records a patch_events event for
+a.py --json.
+"""
+import marshal
+import os
+import select
+import signal
+import threading
+import time
+
+import patch_events
+import patch_trace
+import pattern_registry
+
+DEFAULT_BUDGET = float(os.environ.get('PATCH_PATTERN_BUDGET') or 5.0)
+
+_budgets = {}  # pattern name -> seconds, overriding the default
+_scans = {}    # pattern name -> scan statistics, see _note()
+_armed = False  # an alarm is already pending for an enclosing call
+
+
+class PatternTimeout(RuntimeError):
+    """A pattern ran past its time budget, most likely backtracking."""
+
+    def __init__(self, name, path, budget, scanned):
+        self.name = name
+        self.path = path
+        self.budget = budget
+        self.scanned = scanned
+        super().__init__(f"Pattern '{name}' exceeded its {budget:g}s budget on "
+                         f"{path or '<text>'} ({scanned} characters to scan); "
+                         f"its closing token is probably missing")
+
+
+def set_default_budget(seconds):
+    global DEFAULT_BUDGET
+    DEFAULT_BUDGET = float(seconds)
+
+
+def set_budget(name, seconds):
+    """Give the pattern registered as `name` its own budget."""
+    _budgets[name] = float(seconds)
+
+
+def budget_for(name):
+    return _budgets.get(name, DEFAULT_BUDGET)
+
+
+def _name(pattern):
+    return getattr(pattern, 'trace_name', None) or pattern_registry.name_of(pattern)
+
+
+def _on_alarm(signum, frame):
+    raise _Expired()
+
+
+class _Expired(Exception):
+    pass
+
+
+def _with_alarm(fn, budget):
+    global _armed
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    _armed = True
+    signal.setitimer(signal.ITIMER_REAL, budget)
+    try:
+        return fn(), False
+    except _Expired:
+        return None, True
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        _armed = False
+
+
+def _in_child(fn, budget):
+    """(fn(), False) computed in a forked child, or (None, True) if it ran past the budget."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            data = marshal.dumps(fn())
+            while data:
+                data = data[os.write(write_fd, data):]
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    chunks = []
+    deadline = time.monotonic() + budget
+    expired = False
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([read_fd], [], [], remaining)[0]:
+                expired = True
+                break
+            chunk = os.read(read_fd, 1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(read_fd)
+        if expired:
+            os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+    if expired:
+        return None, True
+    if not chunks:
+        # The child raised: raise the same error here
+        return fn(), False
+    return marshal.loads(b''.join(chunks)), False
+
+
+def _run(fn, budget, portable=None, rebuild=None):
+    """
+    fn() and whether it was stopped for running past the budget. In a forked
+    child fn's result travels as portable(result) and is turned back into
+    one with rebuild().
+    """
+    if budget <= 0 or _armed:
+        return fn(), False
+    if hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread():
+        return _with_alarm(fn, budget)
+    if hasattr(os, 'fork'):
+        if portable is None:
+            return _in_child(fn, budget)
+        value, expired = _in_child(lambda: portable(fn()), budget)
+        return (None, True) if expired else (rebuild(value), False)
+    return fn(), False
+
+
+def _note(table, name, scanned, reached, matches, seconds):
+    entry = table.get(name)
+    if entry is None:
+        entry = table[name] = {'calls': 0, 'scanned': 0, 'longest_scan': 0,
+                                'matches': 0, 'longest_match': 0, 'seconds': 0.0, 'slowest': 0.0}
+    entry['calls'] += 1
+    entry['scanned'] += scanned
+    entry['longest_scan'] = max(entry['longest_scan'], scanned)
+    entry['matches'] += matches
+    entry['longest_match'] = max(entry['longest_match'], reached)
+    entry['seconds'] += seconds
+    entry['slowest'] = max(entry['slowest'], seconds)
+
+
+def _guarded(pattern, fn, scanned, path, budget, portable=None, rebuild=None):
+    name = _name(pattern)
+    if budget is None:
+        budget = budget_for(name)
+    start_ns = time.perf_counter_ns()
+    result, expired = _run(fn, budget, portable, rebuild)
+    end_ns = time.perf_counter_ns()
+    if expired:
+        _note(_scans, name, scanned, 0, 0, (end_ns - start_ns) / 1e9)
+        raise PatternTimeout(name, path, budget, scanned)
+    return name, result, start_ns, end_ns
+
+
+def sub(pattern, repl, text, path=None, budget=None):
+    """pattern.sub(repl, text) within the pattern's budget."""
+    raw = patch_trace.unwrap(pattern)
+    reached = [0]
+
+    def counting(match):
+        reached[0] = max(reached[0], match.end() - match.start())
+        return repl(match) if callable(repl) else match.expand(repl)
+
+    # reached is returned with the result, as a forked child's copy is lost
+    name, (new_text, count, reached), start_ns, end_ns = _guarded(
+        pattern, lambda: raw.subn(counting, text) + (reached[0],), len(text), path, budget)
+    _note(_scans, name, len(text), reached, count, (end_ns - start_ns) / 1e9)
+    patch_trace.record('pattern', name, start_ns, end_ns, method='sub',
+                       scanned=len(text), reached=reached, matches=count)
+    if patch_events.enabled():
+        status = 'no match' if not count else 'applied' if new_text != text else 'already'
+        patch_events.record(status, path, name, patch_events.bytes_changed(text, new_text),
+                            (end_ns - start_ns) / 1e9)
+    return new_text
+
+
+def _start_of(found):
+    return None if found is None else found.start()
+
+
+def _rematch(raw, text, start):
+    """The match a child found at start, rebuilt with one anchored attempt there."""
+    return None if start is None else raw.match(text, start)
+
+
+def match(pattern, text, pos=0, path=None, budget=None):
+    """pattern.match(text, pos) within the pattern's budget."""
+    raw = patch_trace.unwrap(pattern)
+    scanned = len(text) - pos
+    name, found, start_ns, end_ns = _guarded(
+        pattern, lambda: raw.match(text, pos), scanned, path, budget,
+        _start_of, lambda start: _rematch(raw, text, start))
+    reached = found.end() - pos if found else 0
+    _note(_scans, name, scanned, reached, 1 if found else 0, (end_ns - start_ns) / 1e9)
+    patch_trace.record('pattern', name, start_ns, end_ns, method='match',
+                       scanned=scanned, reached=reached, matches=1 if found else 0)
+    return found
+
+
+def search(pattern, text, pos=0, path=None, budget=None):
+    """pattern.search(text, pos) within the pattern's budget."""
+    raw = patch_trace.unwrap(pattern)
+    scanned = len(text) - pos
+    name, found, start_ns, end_ns = _guarded(
+        pattern, lambda: raw.search(text, pos), scanned, path, budget,
+        _start_of, lambda start: _rematch(raw, text, start))
+    reached = found.end() - found.start() if found else 0
+    _note(_scans, name, scanned, reached, 1 if found else 0, (end_ns - start_ns) / 1e9)
+    patch_trace.record('pattern', name, start_ns, end_ns, method='search',
+                       scanned=scanned, reached=reached, matches=1 if found else 0)
+    return found
+
+
+def stats():
+    """Per pattern name: calls, characters scanned, the longest scan and match, and time spent."""
+    return {name: dict(entry) for name, entry in _scans.items()}
+
+
+def summarize(events):
+    """stats()-style table rebuilt from trace events, including those of subprocesses."""
+    table = {}
+    for event in events:
+        args = event.get('args') or {}
+        if event['cat'] == 'pattern' and 'scanned' in args:
+            _note(table, event['name'], args['scanned'], args['reached'], args['matches'], event['dur'] / 1e9)
+    return table
+
+
+def report(table=None, limit=15):
+    """Print the patterns that scanned the most text."""
+    table = stats() if table is None else table
+    if not table:
+        return
+    rows = sorted(table.items(), key=lambda item: item[1]['scanned'], reverse=True)
+    print(f"\n{'pattern':<40} {'calls':>6} {'chars scanned':>14} {'longest scan':>13} "
+          f"{'longest match':>14} {'max ms':>8}")
+    print("-" * 100)
+    for name, entry in rows[:limit]:
+        shown = name if len(name) <= 40 else name[:37] + '...'
+        print(f"{shown:<40} {entry['calls']:>6} {entry['scanned']:>14} {entry['longest_scan']:>13} "
+              f"{entry['longest_match']:>14} {entry['slowest'] * 1000:>8.2f}")
+    if len(rows) > limit:
+        print(f"... {len(rows) - limit} more")
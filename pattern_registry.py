@@ -0,0 +1,204 @@
+"""
+Central registry of the compiled regular expressions used by the patch scripts.
+
+Scripts compile their patterns through compile() at import time, so each
+(pattern, flags) pair is compiled once per process no matter how many files or
+runs use it. Patterns can be registered under a name (e.g. "Media Tab Content")
+and looked up with get().
+
+Compiling means parsing the pattern in pure Python, which dominates start-up in
+watch mode and repeated runs. save_cache()/load_cache() (a.py --pattern-cache)
+persist the compiled programs so the next process can skip parsing. That
+goes through CPython's private regex internals (_sre, re._parser,
+re._compiler), which change between minor releases: the cache is keyed on
+the interpreter version and silently ignored when it does not match, and
+any error from the internals falls back to re.compile(). Without
+load_cache() patterns are compiled with re.compile() alone.
+
+While patch_trace is enabled, compile() returns TracedPattern wrappers so
+each application is timed under the pattern's name.
+"""
+import marshal
+import os
+import re
+import sys
+import time
+
+import patch_trace
+
+try:
+    import _sre
+    from re import _compiler, _parser
+except ImportError:
+    _sre = None
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.patch-cache', 'patterns.marshal')
+CACHE_VERSION = f"{sys.implementation.cache_tag}-{getattr(_sre, 'MAGIC', 0)}"
+
+_compiled = {}  # (pattern, flags) -> re.Pattern
+_names = {}     # name -> (pattern, flags)
+_ids = {}       # id of a named compiled pattern -> its first name, for name_of()
+_programs = {}  # (pattern, flags) -> compiled program, as saved to / loaded from disk
+_stats = {'compiled': 0, 'from_cache': 0, 'seconds': 0.0}
+_traced = {}    # (pattern, flags) -> patch_trace.TracedPattern
+_warm = False   # load_cache() was called: compile through the internals and record programs
+
+
+def _build(pattern, flags):
+    """Compile a pattern, reusing or recording its compiled program."""
+    key = (pattern, flags)
+    if _sre is None or not _warm:
+        return re.compile(pattern, flags)
+
+    program = _programs.get(key)
+    if program is not None:
+        try:
+            compiled = _sre.compile(pattern, *program)
+            _stats['from_cache'] += 1
+            return compiled
+        except Exception:
+            del _programs[key]
+
+    try:
+        parsed = _parser.parse(pattern, flags)
+        code = _compiler._code(parsed, flags)
+        groupindex = parsed.state.groupdict
+        indexgroup = [None] * parsed.state.groups
+        for group_name, index in groupindex.items():
+            indexgroup[index] = group_name
+        # Opcodes and flags are int subclasses, which marshal cannot store
+        program = (
+            int(flags | parsed.state.flags),
+            [int(op) for op in code],
+            parsed.state.groups - 1,
+            dict(groupindex),
+            tuple(indexgroup),
+        )
+        compiled = _sre.compile(pattern, *program)
+    except re.error:
+        raise
+    except Exception:
+        # The internals changed shape in this interpreter: not cached
+        return re.compile(pattern, flags)
+    _programs[key] = program
+    return compiled
+
+
+def compile(pattern, flags=0, name=None, traced=True):
+    """
+    Return the compiled pattern, compiling it on first use only. Pass
+    traced=False for patterns matched in tight loops (e.g. a tokenizer),
+    which are better timed as a whole by their caller.
+    """
+    flags = int(flags)
+    key = (pattern, flags)
+    compiled = _compiled.get(key)
+    if compiled is None:
+        start = time.perf_counter()
+        with patch_trace.span('compile', name or _shorten(pattern)):
+            compiled = _build(pattern, flags)
+        _stats['seconds'] += time.perf_counter() - start
+        _stats['compiled'] += 1
+        _compiled[key] = compiled
+
+    if name is not None:
+        existing = _names.get(name)
+        if existing is not None and existing != key:
+            raise ValueError(f"Pattern name '{name}' is already registered for a different pattern")
+        _names[name] = key
+        _ids.setdefault(id(compiled), name)
+
+    if traced and patch_trace.enabled():
+        wrapper = _traced.get(key)
+        if wrapper is None:
+            wrapper = _traced[key] = patch_trace.TracedPattern(compiled, name, name_of)
+        return wrapper
+    return compiled
+
+
+def get(name):
+    return _compiled[_names[name]]
+
+
+def name_of(compiled):
+    """Registered name of a compiled pattern, or a shortened form of its source."""
+    # Compiled patterns are kept in _compiled for good, so their ids stay unique
+    name = _ids.get(id(compiled))
+    return name if name is not None else _shorten(compiled.pattern)
+
+
+def _shorten(source):
+    return source if len(source) <= 40 else source[:37] + '...'
+
+
+REGEX_META = '.^$*+?{}[]()|'
+
+def literal_prefix(pattern):
+    """
+    Return the literal text every match of the pattern must start with
+    (e.g. '<SettingsList.LinkItem'), or '' if it has no literal prefix.
+    """
+    i = 0
+    while i < len(pattern) and pattern[i] == '(' and not pattern.startswith('(?', i):
+        i += 1
+
+    literal = []
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                break  # character class such as \s or \d
+            literal.append(pattern[i + 1])
+            i += 2
+            continue
+        if char in REGEX_META:
+            # A quantifier makes the preceding character optional or repeated
+            if char in '*+?{' and literal:
+                literal.pop()
+            break
+        literal.append(char)
+        i += 1
+    return ''.join(literal)
+
+
+def names():
+    return sorted(_names)
+
+
+def stats():
+    """Number of patterns compiled, how many came from the warm cache, and the time spent."""
+    return dict(_stats)
+
+
+def report():
+    s = stats()
+    print(f"Compiled {s['compiled']} patterns in {s['seconds'] * 1000:.1f}ms "
+          f"({s['from_cache']} from warm cache)")
+
+
+def load_cache(path=CACHE_FILE):
+    """Load compiled programs saved by save_cache(). Returns the number loaded."""
+    global _warm
+    if _sre is None:
+        return 0
+    _warm = True
+    if not os.path.exists(path):
+        return 0
+    try:
+        with open(path, 'rb') as f:
+            version, programs = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return 0
+    if version != CACHE_VERSION:
+        return 0
+    _programs.update(programs)
+    return len(programs)
+
+
+def save_cache(path=CACHE_FILE):
+    """Persist every compiled program so the next process can skip parsing."""
+    if _sre is None:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        marshal.dump((CACHE_VERSION, _programs), f)
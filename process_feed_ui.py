@@ -1,49 +1,54 @@
 
-import sys
 import re
 import os
 
-def replace_regex(content, replacements):
+import patch_events
+import patch_fuzzy
+import patch_io
+import patch_trace
+import pattern_guard
+import pattern_registry
+
+def replace_regex(content, replacements, path=None):
     new_content = content
     for pattern, replacement in replacements:
-        new_content = re.sub(pattern, replacement, new_content, flags=re.DOTALL)
+        compiled = pattern_registry.compile(pattern, re.DOTALL)
+        new_content = pattern_guard.sub(compiled, replacement, new_content, path=path)
     return new_content
 
 def process_file(file_path, patterns=None, regex_replacements=None, literal_replacements=None):
-    if not os.path.exists(file_path):
-        print(f"File not found: {file_path}")
+    if not patch_io.exists(file_path):
+        patch_events.note(f"File not found: {file_path}", 'error', file_path)
         return
 
     print(f"Reading {file_path}...")
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = patch_io.read_file(file_path)
 
     new_content = content
 
     if regex_replacements:
-        new_content = replace_regex(new_content, regex_replacements)
+        new_content = replace_regex(new_content, regex_replacements, file_path)
 
     if literal_replacements:
         for target, replacement in literal_replacements:
             if replacement in new_content: 
                 continue
-            new_content = new_content.replace(target, replacement)
+            with patch_trace.span('replace', target.strip()[:40]):
+                new_content = patch_fuzzy.replace(new_content, target, replacement, file_path)
 
     if new_content != content:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        patch_io.write_file(file_path, new_content)
         print(f"Modified {file_path}")
     else:
         print(f"No changes for {file_path}")
 
 def main():
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+    base_dir = os.getcwd()  # the checkout root, as for the other scripts
     def p(path): return os.path.join(base_dir, path)
 
     # 1. RightNav: Remove completely
     right_nav_path = p('src/view/shell/desktop/RightNav.tsx')
-    with open(right_nav_path, 'r') as f:
-         if 'return null; // disabled' not in f.read():
+    if 'return null; // disabled' not in patch_io.read_file(right_nav_path):
              right_nav_regex = [
                  (r'(export function DesktopRightNav\(\{.*?\}\) \{)', r'\1\n  return null; // disabled')
              ]
@@ -58,18 +63,18 @@ def main():
 
     # 3. PostMeta: Hide component completely (removes top handle/header)
     post_meta_path = p('src/view/com/util/PostMeta.tsx')
-    process_file(post_meta_path, regex_replacements=[(r'(let PostMeta = \(opts: PostMetaOpts\): React.ReactNode => \{)', r'\1\n  return null; // disabled')])
+    if 'return null; // disabled' not in patch_io.read_file(post_meta_path):
+        process_file(post_meta_path, regex_replacements=[(r'(let PostMeta = \(opts: PostMetaOpts\): React.ReactNode => \{)', r'\1\n  return null; // disabled')])
 
     # 4. PostControls: Reorder buttons
     post_controls_path = p('src/components/PostControls/index.tsx')
     
     # Add UserAvatar/sanitizeHandle import if missing
-    with open(post_controls_path, 'r') as f:
-        content = f.read()
-        if 'UserAvatar' not in content:
-             process_file(post_controls_path, literal_replacements=[("import { useAnalytics } from '#/analytics'", "import { useAnalytics } from '#/analytics'\nimport { UserAvatar } from '#/view/com/util/UserAvatar'")])
-        if 'sanitizeHandle' not in content:
-             process_file(post_controls_path, literal_replacements=[("import { useAnalytics } from '#/analytics'", "import { useAnalytics } from '#/analytics'\nimport { sanitizeHandle } from '#/lib/strings/handles'")])
+    content = patch_io.read_file(post_controls_path)
+    if 'UserAvatar' not in content:
+         process_file(post_controls_path, literal_replacements=[("import { useAnalytics } from '#/analytics'", "import { useAnalytics } from '#/analytics'\nimport { UserAvatar } from '#/view/com/util/UserAvatar'")])
+    if 'sanitizeHandle' not in content:
+         process_file(post_controls_path, literal_replacements=[("import { useAnalytics } from '#/analytics'", "import { useAnalytics } from '#/analytics'\nimport { sanitizeHandle } from '#/lib/strings/handles'")])
 
     new_post_controls_view = (
         'return (\n'
@@ -251,9 +256,8 @@ def main():
 
     # 7. ThreadComposePrompt (Hide)
     compose_prompt_path = p('src/screens/PostThread/components/ThreadComposePrompt.tsx')
-    if os.path.exists(compose_prompt_path):
-        with open(compose_prompt_path, 'r') as f:
-             if 'return null;' not in f.read():
+    if patch_io.exists(compose_prompt_path):
+        if 'return null;' not in patch_io.read_file(compose_prompt_path):
                 process_file(compose_prompt_path, regex_replacements=[(r'(export function ThreadComposePrompt\(\{.*?\}\) \{)', r'\1\n  return null;')])
 
     # 8. Explore (Hide modules)
@@ -277,16 +281,14 @@ def main():
 
     # 10. ComposerPrompt (Hide)
     composer_prompt_path = p('src/view/com/feeds/ComposerPrompt.tsx')
-    if os.path.exists(composer_prompt_path):
-        with open(composer_prompt_path, 'r') as f:
-             if 'return null;' not in f.read():
+    if patch_io.exists(composer_prompt_path):
+        if 'return null;' not in patch_io.read_file(composer_prompt_path):
                 process_file(composer_prompt_path, regex_replacements=[(r'(export function ComposerPrompt\(\) \{)', r'\1\n  return null;')])
 
     # 11. FollowingEndOfFeed (Hide)
     end_of_feed_path = p('src/view/com/posts/FollowingEndOfFeed.tsx')
-    if os.path.exists(end_of_feed_path):
-        with open(end_of_feed_path, 'r') as f:
-             if 'return null;' not in f.read():
+    if patch_io.exists(end_of_feed_path):
+        if 'return null;' not in patch_io.read_file(end_of_feed_path):
                 process_file(end_of_feed_path, regex_replacements=[(r'return \(', 'return null;\n    return (')])
 
     # 12. ThreadItemPost (Hide lines)
@@ -344,16 +346,17 @@ def main():
 
     # 18. VerificationCheck: Return null
     verification_check_path = p('src/components/verification/VerificationCheck.tsx')
-    if os.path.exists(verification_check_path):
-        with open(verification_check_path, 'r') as f:
-             if 'return null; // disabled' not in f.read():
+    if patch_io.exists(verification_check_path):
+        if 'return null; // disabled' not in patch_io.read_file(verification_check_path):
                 process_file(verification_check_path, regex_replacements=[(r'(export function VerificationCheck\(\{[\s\S]*?\) \{)', r'\1\n  return null; // disabled')])
 
     # 19. LiveEventFeedsSettingsToggle: Hide
     live_event_replacements = [
         (r'(export function LiveEventFeedsSettingsToggle\(\) \{)', r'\1\n  return null; // disabled'),
     ]
-    process_file(p('src/features/liveEvents/components/LiveEventFeedsSettingsToggle.tsx'), regex_replacements=live_event_replacements)
+    live_event_path = p('src/features/liveEvents/components/LiveEventFeedsSettingsToggle.tsx')
+    if 'return null; // disabled' not in patch_io.read_file(live_event_path):
+        process_file(live_event_path, regex_replacements=live_event_replacements)
 
     # 20. PostInteractionSettingsDialog: Remove "Allow quote posts"
     # DISABLED: causes syntax errors due to conditional wrapping
@@ -409,16 +412,14 @@ def main():
     # It's likely in FeedInterstitials.tsx or similar.
     # We'll just run this on src/components/interstitials/TrendingVideos.tsx to return null.
     trending_videos_path = p('src/components/interstitials/TrendingVideos.tsx')
-    if os.path.exists(trending_videos_path):
-        with open(trending_videos_path, 'r') as f:
-             if 'return null; // disabled' not in f.read():
+    if patch_io.exists(trending_videos_path):
+        if 'return null; // disabled' not in patch_io.read_file(trending_videos_path):
                 process_file(trending_videos_path, regex_replacements=[(r'(export function TrendingVideos\(\)\s*\{)', r'\1\n  return null; // disabled')])
 
     # 24. WhoCanReply: Remove "everyone can reply" text
     who_can_reply_path = p('src/components/WhoCanReply.tsx')
-    if os.path.exists(who_can_reply_path):
-        with open(who_can_reply_path, 'r') as f:
-             if 'return null; // disabled' not in f.read():
+    if patch_io.exists(who_can_reply_path):
+        if 'return null; // disabled' not in patch_io.read_file(who_can_reply_path):
                 process_file(who_can_reply_path, regex_replacements=[(r'(export function WhoCanReply\(\{[^)]*\}:\s*WhoCanReplyProps\)\s*\{)', r'\1\n  return null; // disabled')])
 
     # 25. ThreadItemAnchor: Remove full date display (niceDate), avatar and display name (keep handle)
@@ -454,4 +455,5 @@ def main():
     process_file(settings_path, regex_replacements=settings_regex)
 
 if __name__ == "__main__":
-    main()
+    with patch_io.cli():
+        main()
@@ -5,8 +5,10 @@ Script to modify the Bluesky client to remove handle suffixes from display
 
 Configure the DEFAULT_SUFFIX variable below to match your domain.
 """
-import os
-import re
+
+import patch_events
+import patch_fuzzy
+import patch_io
 
 # CONFIGURATION: Set your default handle suffix here
 DEFAULT_SUFFIX = '.bsky.social'
@@ -16,13 +18,12 @@ HANDLES_FILE = 'src/lib/strings/handles.ts'
 
 def modify_handles_file():
     """Modify sanitizeHandle to strip suffix for display."""
-    if not os.path.exists(HANDLES_FILE):
-        print(f"Error: File not found: {HANDLES_FILE}")
+    if not patch_io.exists(HANDLES_FILE):
+        patch_events.note(f"Error: File not found: {HANDLES_FILE}", 'error', HANDLES_FILE)
         return False
 
     print(f"Reading {HANDLES_FILE}...")
-    with open(HANDLES_FILE, 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = patch_io.read_file(HANDLES_FILE)
 
     # Check if already modified
     if 'stripHandleSuffix' in content:
@@ -49,10 +50,10 @@ export function ensureHandleSuffix(handle: string): string {{
     # Insert after imports (after the forceLTR import line)
     import_line = "import {forceLTR} from '#/lib/strings/bidi'"
     if import_line not in content:
-        print("Error: Could not find import line to insert after.")
+        patch_events.note("Error: Could not find import line to insert after.", file=HANDLES_FILE, anchor=import_line)
         return False
 
-    content = content.replace(import_line, import_line + '\n' + helper_function)
+    content = patch_events.replace(content, import_line, import_line + '\n' + helper_function, HANDLES_FILE)
 
     # Modify sanitizeHandle to use stripHandleSuffix
     old_sanitize = "const lowercasedWithPrefix = `${prefix}${handle.toLocaleLowerCase()}`"
@@ -63,13 +64,12 @@ export function ensureHandleSuffix(handle: string): string {{
         if 'stripHandleSuffix' in content:
             print(f"{HANDLES_FILE} already uses stripHandleSuffix.")
         else:
-            print("Error: Could not find sanitizeHandle code to modify.")
+            patch_events.note("Error: Could not find sanitizeHandle code to modify.", file=HANDLES_FILE, anchor=old_sanitize)
             return False
     else:
-        content = content.replace(old_sanitize, new_sanitize)
+        content = patch_events.replace(content, old_sanitize, new_sanitize, HANDLES_FILE)
 
-    with open(HANDLES_FILE, 'w', encoding='utf-8') as f:
-        f.write(content)
+    patch_io.write_file(HANDLES_FILE, content)
 
     print(f"Successfully modified {HANDLES_FILE}")
     return True
@@ -83,10 +83,9 @@ def modify_sidebar_files():
     modified = False
     
     # Fix Drawer.tsx - line 95: {profile?.displayName || account.handle}
-    if os.path.exists(DRAWER_FILE):
+    if patch_io.exists(DRAWER_FILE):
         print(f"Reading {DRAWER_FILE}...")
-        with open(DRAWER_FILE, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = patch_io.read_file(DRAWER_FILE)
         
         # Check if already modified
         if 'stripHandleSuffix(account.handle)' not in content:
@@ -94,25 +93,23 @@ def modify_sidebar_files():
             if 'stripHandleSuffix' not in content:
                 old_import = "import {sanitizeHandle} from '#/lib/strings/handles'"
                 new_import = "import {sanitizeHandle, stripHandleSuffix} from '#/lib/strings/handles'"
-                content = content.replace(old_import, new_import)
+                content = patch_events.replace(content, old_import, new_import, DRAWER_FILE)
             
             # Fix the fallback display name
             old_code = '{profile?.displayName || account.handle}'
             new_code = '{profile?.displayName || stripHandleSuffix(account.handle)}'
-            content = content.replace(old_code, new_code)
+            content = patch_events.replace(content, old_code, new_code, DRAWER_FILE)
             
-            with open(DRAWER_FILE, 'w', encoding='utf-8') as f:
-                f.write(content)
+            patch_io.write_file(DRAWER_FILE, content)
             print(f"Modified {DRAWER_FILE}")
             modified = True
         else:
             print(f"{DRAWER_FILE} already modified.")
     
     # Fix LeftNav.tsx - line 167: profile.displayName || profile.handle
-    if os.path.exists(LEFTNAV_FILE):
+    if patch_io.exists(LEFTNAV_FILE):
         print(f"Reading {LEFTNAV_FILE}...")
-        with open(LEFTNAV_FILE, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = patch_io.read_file(LEFTNAV_FILE)
         
         # Check if already modified
         if 'stripHandleSuffix(profile.handle)' not in content:
@@ -120,15 +117,14 @@ def modify_sidebar_files():
             if 'stripHandleSuffix' not in content:
                 old_import = "import {isInvalidHandle, sanitizeHandle} from '#/lib/strings/handles'"
                 new_import = "import {isInvalidHandle, sanitizeHandle, stripHandleSuffix} from '#/lib/strings/handles'"
-                content = content.replace(old_import, new_import)
+                content = patch_events.replace(content, old_import, new_import, LEFTNAV_FILE)
             
             # Fix the fallback display name
             old_code = 'profile.displayName || profile.handle'
             new_code = 'profile.displayName || stripHandleSuffix(profile.handle)'
-            content = content.replace(old_code, new_code)
+            content = patch_events.replace(content, old_code, new_code, LEFTNAV_FILE)
             
-            with open(LEFTNAV_FILE, 'w', encoding='utf-8') as f:
-                f.write(content)
+            patch_io.write_file(LEFTNAV_FILE, content)
             print(f"Modified {LEFTNAV_FILE}")
             modified = True
         else:
@@ -141,13 +137,12 @@ RESOLVE_URI_FILE = 'src/state/queries/resolve-uri.ts'
 
 def modify_resolve_uri():
     """Add default suffix to handles without one when resolving."""
-    if not os.path.exists(RESOLVE_URI_FILE):
-        print(f"Error: File not found: {RESOLVE_URI_FILE}")
+    if not patch_io.exists(RESOLVE_URI_FILE):
+        patch_events.note(f"Error: File not found: {RESOLVE_URI_FILE}", 'error', RESOLVE_URI_FILE)
         return False
 
     print(f"Reading {RESOLVE_URI_FILE}...")
-    with open(RESOLVE_URI_FILE, 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = patch_io.read_file(RESOLVE_URI_FILE)
 
     # Check if already modified
     if 'ensureHandleSuffix' in content:
@@ -160,10 +155,10 @@ def modify_resolve_uri():
 import {ensureHandleSuffix} from '#/lib/strings/handles'"""
     
     if old_import not in content:
-        print("Error: Could not find import line in resolve-uri.ts")
+        patch_events.note("Error: Could not find import line in resolve-uri.ts", file=RESOLVE_URI_FILE, anchor=old_import)
         return False
 
-    content = content.replace(old_import, new_import)
+    content = patch_events.replace(content, old_import, new_import, RESOLVE_URI_FILE)
 
     # Modify the queryFn to add suffix before resolving
     old_code = '''if (!didOrHandle) return ''
@@ -180,14 +175,14 @@ import {ensureHandleSuffix} from '#/lib/strings/handles'"""
       const handleToResolve = ensureHandleSuffix(didOrHandle)
       const res = await agent.resolveHandle({handle: handleToResolve})'''
 
-    if old_code not in content:
+    modified = patch_fuzzy.replace(content, old_code, new_code, RESOLVE_URI_FILE)
+    if modified == content:
         print("Error: Could not find queryFn code in resolve-uri.ts")
         return False
 
-    content = content.replace(old_code, new_code)
+    content = modified
 
-    with open(RESOLVE_URI_FILE, 'w', encoding='utf-8') as f:
-        f.write(content)
+    patch_io.write_file(RESOLVE_URI_FILE, content)
 
     print(f"Successfully modified {RESOLVE_URI_FILE}")
     return True
@@ -210,4 +205,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with patch_io.cli():
+        main()
@@ -1,28 +1,38 @@
-import os
+import patch_events
+import patch_io
 
 def remove_replied_to():
     file_path = 'src/components/Post/PostRepliedTo.tsx'
-    if not os.path.exists(file_path):
-        print(f"Error: {file_path} not found.")
+    if not patch_io.exists(file_path):
+        patch_events.note(f"Error: {file_path} not found.", 'error', file_path)
         return
 
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
+    content = patch_io.read_file(file_path)
+    if "return null // Removed 'Replied to'" in content:
+        patch_events.note(f"{file_path} already modified.", 'already', file_path, 'export function PostRepliedTo({')
+        return
+
+    lines = content.splitlines(keepends=True)
 
     new_lines = []
     found_function = False
-    for line in lines:
-        new_lines.append(line)
-        if 'export function PostRepliedTo({' in line and not found_function:
-            found_function = True
-        
-        if found_function and '}) {' in line:
-            new_lines.append("  return null // Removed 'Replied to' text and icon\n")
-            found_function = False # Only do it once
+    with patch_events.operation(file_path, 'export function PostRepliedTo({') as op:
+        for line in lines:
+            new_lines.append(line)
+            if 'export function PostRepliedTo({' in line and not found_function:
+                found_function = True
+            
+            if found_function and '}) {' in line:
+                new_lines.append("  return null // Removed 'Replied to' text and icon\n")
+                found_function = False # Only do it once
+
+        new_content = ''.join(new_lines)
+        op.update(status='applied' if new_content != content else 'not found',
+                  before=content, after=new_content)
 
-    with open(file_path, 'w') as f:
-        f.writelines(new_lines)
+    patch_io.write_file(file_path, new_content)
     print(f"Successfully modified {file_path}")
 
 if __name__ == "__main__":
-    remove_replied_to()
+    with patch_io.cli():
+        remove_replied_to()
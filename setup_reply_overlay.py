@@ -8,282 +8,51 @@ This script applies all necessary changes to the codebase:
 4. Modifies src/view/com/posts/PostFeed.tsx
 5. Modifies src/screens/PostThread/components/ThreadItemAnchor.tsx
 6. Modifies src/screens/PostThread/components/ThreadItemPost.tsx
+7. Modifies src/storage/schema.ts
 """
-import os
 import re
+import sys
+
+import patch_events
+import patch_fuzzy
+import patch_io
+import patch_manifest
+import pattern_registry
 
 # File Paths
-REPLY_OVERLAY_FILE = 'src/components/ReplyOverlay.tsx'
-REPLY_MEDIA_QUERY_FILE = 'src/state/queries/reply-media.ts'
 POST_FEED_ITEM_FILE = 'src/view/com/posts/PostFeedItem.tsx'
 POST_FEED_FILE = 'src/view/com/posts/PostFeed.tsx'
 THREAD_ANCHOR_FILE = 'src/screens/PostThread/components/ThreadItemAnchor.tsx'
 THREAD_POST_FILE = 'src/screens/PostThread/components/ThreadItemPost.tsx'
 
-# Content for new files
-REPLY_OVERLAY_CONTENT = r'''import { memo, useMemo } from 'react'
-import { Pressable, StyleSheet, View } from 'react-native'
-import { Image } from 'expo-image'
-import {
-    AppBskyEmbedImages,
-    AppBskyEmbedRecordWithMedia,
-    AppBskyEmbedVideo,
-    type AppBskyFeedDefs,
-} from '@atproto/api'
-import { useNavigation } from '@react-navigation/native'
-
-import { makeProfileLink } from '#/lib/routes/links'
-import { type NavigationProp } from '#/lib/routes/types'
-import { useTheme } from '#/alf'
-
-const MAX_OVERLAYS = 9
-
-interface ReplyOverlayProps {
-    replies: AppBskyFeedDefs.PostView[]
-    anchorUri?: string // URI of the main post to filter out
-}
-
-function getMediaUrl(post: AppBskyFeedDefs.PostView): string | null {
-    const embed = post.embed
-
-    // Direct image
-    if (AppBskyEmbedImages.isView(embed) && embed.images.length > 0) {
-        return embed.images[0].thumb
-    }
-
-    // Direct video
-    if (AppBskyEmbedVideo.isView(embed) && embed.thumbnail) {
-        return embed.thumbnail
-    }
-
-    // Record with media
-    if (AppBskyEmbedRecordWithMedia.isView(embed)) {
-        if (
-            AppBskyEmbedImages.isView(embed.media) &&
-            embed.media.images.length > 0
-        ) {
-            return embed.media.images[0].thumb
-        }
-        if (AppBskyEmbedVideo.isView(embed.media) && embed.media.thumbnail) {
-            return embed.media.thumbnail
-        }
-    }
-
-    return null
-}
-
-let ReplyOverlay = ({ replies, anchorUri }: ReplyOverlayProps): React.ReactNode => {
-    const t = useTheme()
-    const navigation = useNavigation<NavigationProp>()
-
-    const mediaReplies = useMemo(() => {
-        return replies
-            .filter(reply => {
-                // Validate reply is a proper post object
-                if (!reply || typeof reply !== 'object') return false
-                if (!reply.uri || typeof reply.uri !== 'string') return false
-                if (!reply.author || typeof reply.author !== 'object') return false
-                if (!reply.author.handle || typeof reply.author.handle !== 'string') return false
-                // Filter out anchor post (the main post itself)
-                if (anchorUri && reply.uri === anchorUri) {
-                    // console.log('[ReplyOverlay] Filtered out anchor:', reply.uri)
-                    return false
-                }
-                // Check for media
-                return getMediaUrl(reply) !== null
-            })
-            .slice(0, MAX_OVERLAYS)
-    }, [replies, anchorUri])
-
-    if (mediaReplies.length === 0) {
-        return null
-    }
-
-    const handlePress = (post: AppBskyFeedDefs.PostView) => {
-        // const href = makeProfileLink(post.author, 'post', post.uri.split('/').pop())
-        navigation.push('PostThread', { name: post.author.handle, rkey: post.uri.split('/').pop() })
-    }
-
-    // Layout: 3 or less = vertical, 4+ = grid (2 columns)
-    const isGrid = mediaReplies.length >= 4
-    const columns = 2 // Always 2 columns for grid
-    const itemSize = 50
-    const gap = 4
-    const gridWidth = (itemSize * columns) + (gap * (columns - 1)) + 8 // items + gaps + padding
-
-    return (
-        <View style={[styles.container]}>
-            <View
-                style={[
-                    styles.overlayContainer,
-                    isGrid ? [styles.gridContainer, { width: gridWidth }] : styles.verticalContainer,
-                ]}>
-                {mediaReplies.map((reply) => {
-                    const mediaUrl = getMediaUrl(reply)
-                    if (!mediaUrl) return null
-
-                    return (
-                        <Pressable accessibilityRole="button"
-                            key={reply.uri}
-                            onPress={() => handlePress(reply)}
-                            style={[
-                                styles.thumbnail,
-                                {
-                                    borderColor: t.atoms.bg_contrast_50.backgroundColor,
-                                },
-                            ]}>
-                            <Image
-                                source={{ uri: mediaUrl }}
-                                style={styles.thumbnailImage}
-                                contentFit="cover"
-                                accessibilityIgnoresInvertColors
-                            />
-                        </Pressable>
-                    )
-                })}
-            </View>
-        </View>
-    )
-}
-
-ReplyOverlay = memo(ReplyOverlay)
-export { ReplyOverlay }
-
-const styles = StyleSheet.create({
-    container: {
-        position: 'absolute',
-        bottom: 8,
-        right: 8,
-        zIndex: 100,
-    },
-    overlayContainer: {
-        backgroundColor: 'rgba(0, 0, 0, 0.6)',
-        borderRadius: 8,
-        padding: 4,
-    },
-    verticalContainer: {
-        flexDirection: 'column',
-        gap: 4,
-    },
-    gridContainer: {
-        flexDirection: 'row',
-        flexWrap: 'wrap',
-        gap: 4,
-    },
-    thumbnail: {
-        width: 50,
-        height: 50,
-        borderRadius: 6,
-        overflow: 'hidden',
-        borderWidth: 1,
-    },
-    thumbnailImage: {
-        width: '100%',
-        height: '100%',
-    },
-})
-'''
+MANIFEST = 'setup_reply_overlay'
 
-REPLY_MEDIA_QUERY_CONTENT = r'''import {
-    AppBskyEmbedImages,
-    AppBskyEmbedRecordWithMedia,
-    AppBskyEmbedVideo,
-    type AppBskyFeedDefs,
-} from '@atproto/api'
-import { useQuery } from '@tanstack/react-query'
-
-import { useAgent } from '#/state/session'
-
-const RQKEY_ROOT = 'reply-media'
-export const RQKEY = (postUri: string) => [RQKEY_ROOT, postUri]
-
-function hasMedia(post: AppBskyFeedDefs.PostView): boolean {
-    const embed = post.embed
-    if (AppBskyEmbedImages.isView(embed)) return true
-    if (AppBskyEmbedVideo.isView(embed)) return true
-    if (AppBskyEmbedRecordWithMedia.isView(embed)) {
-        return (
-            AppBskyEmbedImages.isView(embed.media) ||
-            AppBskyEmbedVideo.isView(embed.media)
-        )
-    }
-    return false
-}
-
-export function useReplyMediaQuery(postUri: string | undefined) {
-    const agent = useAgent()
-
-    return useQuery<AppBskyFeedDefs.PostView[]>({
-        enabled: !!postUri,
-        queryKey: RQKEY(postUri ?? ''),
-        staleTime: 1000 * 60 * 5, // 5 minutes
-        async queryFn() {
-            if (!postUri) return []
-
-            try {
-                const { data } = await agent.app.bsky.unspecced.getPostThreadV2({
-                    anchor: postUri,
-                    branchingFactor: 10,
-                    below: 20,
-                    sort: 'newest',
-                })
-
-                // Extract replies with media
-                const repliesWithMedia: AppBskyFeedDefs.PostView[] = []
-
-                for (const item of data.thread || []) {
-                    // The structure is: item.value.post for threadItemPost types
-                    const value = (item as any).value
-                    if (!value || typeof value !== 'object') continue
-
-                    const post = value.post as AppBskyFeedDefs.PostView | undefined
-                    if (!post) continue
-
-                    // Skip only the anchor post - include parents and replies
-                    // Check by URI first (most reliable), then by depth
-                    if (post.uri === postUri) continue
-                    const depth = (item as any).depth
-                    if (depth === 0 || depth === undefined) continue
-
-                    // Skip duplicates
-                    if (repliesWithMedia.some(r => r.uri === post.uri)) continue
-
-                    // Check if has media
-                    if (hasMedia(post)) {
-                        repliesWithMedia.push(post)
-                    }
-                }
-
-                // console.log('[ReplyMediaQuery] Found replies with media:', repliesWithMedia.length)
-                return repliesWithMedia.slice(0, 9) // Max 9
-            } catch (error) {
-                console.error('Failed to fetch reply media:', error)
-                return []
-            }
-        },
-    })
-}
-'''
+# PostFeedItem as patched by earlier versions, whose query ran for every item
+UNGATED_QUERY_RE = pattern_registry.compile(
+    r'^[ \t]*const \{\s*data: replyMedia = \[\]\s*\} = useReplyMediaQuery\(post\.uri\)\n', re.MULTILINE,
+    name='ungated useReplyMediaQuery call'
+)
+# A hasMedia declaration (its first line and every more deeply indented line after it) and the blank lines after it
+HAS_MEDIA_DECL_RE = pattern_registry.compile(
+    r'^([ \t]*)const hasMedia =[^\n]*\n(?:\1[ \t]+[^\n]*\n)*\n*', re.MULTILINE,
+    name='hasMedia declaration'
+)
 
 def create_files():
+    # ReplyOverlay.tsx and reply-media.ts come from manifests/templates/setup_reply_overlay/
     print("Creating component files...")
-    
-    with open(REPLY_OVERLAY_FILE, 'w', encoding='utf-8') as f:
-        f.write(REPLY_OVERLAY_CONTENT)
-    print(f"Created {REPLY_OVERLAY_FILE}")
-
-    with open(REPLY_MEDIA_QUERY_FILE, 'w', encoding='utf-8') as f:
-        f.write(REPLY_MEDIA_QUERY_CONTENT)
-    print(f"Created {REPLY_MEDIA_QUERY_FILE}")
+    manifest = patch_manifest.load(MANIFEST)
+    patch_manifest.create_files(manifest)
+    # The device storage schema entry for the persisted cache
+    return all([patch_manifest.apply_patch(manifest, patch) for patch in manifest['patch']])
 
 def modify_post_feed():
     print(f"Modifying {POST_FEED_FILE}...")
-    if not os.path.exists(POST_FEED_FILE):
-        print(f"Error: {POST_FEED_FILE} not found")
+    if not patch_io.exists(POST_FEED_FILE):
+        patch_events.note(f"Error: {POST_FEED_FILE} not found", 'error', POST_FEED_FILE)
         return
 
-    with open(POST_FEED_FILE, 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = patch_io.read_file(POST_FEED_FILE)
 
     # Add Logic for filtering media replies
     TARGET_LOGIC = r'''        // Hide media replies (not the first/root item) - accessible via overlay
@@ -305,10 +74,10 @@ def modify_post_feed():
         # Find insertion point
         INSERT_POINT = "const item = slice.items[indexInSlice]"
         if INSERT_POINT in content:
-            content = content.replace(INSERT_POINT, INSERT_POINT + '\n\n' + TARGET_LOGIC)
+            content = patch_events.replace(content, INSERT_POINT, INSERT_POINT + '\n\n' + TARGET_LOGIC, POST_FEED_FILE)
             print("Applied logic to PostFeed.tsx")
         else:
-            print("Could not find insertion point in PostFeed.tsx")
+            patch_events.note("Could not find insertion point in PostFeed.tsx", file=POST_FEED_FILE, anchor=INSERT_POINT)
 
     # Add Embed types for filtering (check for import, not just usage)
     # Look for 'AppBskyEmbedImages,' to detect import (has comma) vs usage (no comma after)
@@ -318,20 +87,73 @@ def modify_post_feed():
         #   AppBskyEmbedVideo,
         #   type AppBskyFeedDefs,
         if '  AppBskyEmbedVideo,' in content:
-            content = content.replace(
+            content = patch_events.replace(
+                content,
                 '  AppBskyEmbedVideo,',
-                '  AppBskyEmbedImages,\n  AppBskyEmbedRecordWithMedia,\n  AppBskyEmbedVideo,'
+                '  AppBskyEmbedImages,\n  AppBskyEmbedRecordWithMedia,\n  AppBskyEmbedVideo,',
+                POST_FEED_FILE
+            )
+        else:
+            patch_events.note("Warning: could not find AppBskyEmbedVideo import pattern in PostFeed.tsx",
+                              file=POST_FEED_FILE, anchor='  AppBskyEmbedVideo,')
+
+    # Report the posts the list sees, so feed items load reply media only near the viewport
+    if 'setReplyMediaViewport' not in content:
+        IMPORT_POINT = "import {useLiveNowConfig} from '#/state/service-config'"
+        SEEN_POINT = "        const postItem = slice.items[indexInSlice]\n        const post = postItem.post\n"
+        CALLBACK_POINT = "  const onItemSeen = useCallback("
+        if IMPORT_POINT in content and SEEN_POINT in content and CALLBACK_POINT in content:
+            content = patch_events.replace(
+                content,
+                IMPORT_POINT,
+                "import {setReplyMediaViewport} from '#/state/queries/reply-media'\n" + IMPORT_POINT,
+                POST_FEED_FILE
+            )
+            content = patch_events.replace(
+                content,
+                CALLBACK_POINT,
+                r'''  // URIs of the posts in feed order, for reply media prefetching
+  const getReplyMediaUris = useNonReactiveCallback(() =>
+    feedItems.flatMap(row =>
+      row.type === 'sliceItem'
+        ? [row.slice.items[row.indexInSlice].post.uri]
+        : [],
+    ),
+  )
+
+''' + CALLBACK_POINT,
+                POST_FEED_FILE
+            )
+            content = patch_events.replace(
+                content,
+                SEEN_POINT,
+                SEEN_POINT + "        setReplyMediaViewport(getReplyMediaUris(), post.uri)\n",
+                POST_FEED_FILE
             )
+            print("Applied reply media viewport tracking to PostFeed.tsx")
         else:
-            print("Warning: could not find AppBskyEmbedVideo import pattern in PostFeed.tsx")
+            patch_events.note("Could not find onItemSeen in PostFeed.tsx; reply media will not load in the feed",
+                              file=POST_FEED_FILE, anchor=SEEN_POINT)
+
+    # onItemSeen calls getReplyMediaUris: list it in the deps, as upstream does its getPostPosition
+    if 'getReplyMediaUris()' in content and 'getPostPosition, getReplyMediaUris]' not in content:
+        DEPS_POINT = "    [feedFeedback, feed, liveNowConfig, getPostPosition],\n"
+        if DEPS_POINT in content:
+            content = patch_events.replace(
+                content,
+                DEPS_POINT,
+                "    [feedFeedback, feed, liveNowConfig, getPostPosition, getReplyMediaUris],\n",
+                POST_FEED_FILE
+            )
+        else:
+            patch_events.note("Warning: could not find the onItemSeen deps in PostFeed.tsx; add getReplyMediaUris to them",
+                              'warning', POST_FEED_FILE, DEPS_POINT)
 
-    with open(POST_FEED_FILE, 'w', encoding='utf-8') as f:
-        f.write(content)
+    patch_io.write_file(POST_FEED_FILE, content)
 
 def modify_post_feed_item():
     print(f"Modifying {POST_FEED_ITEM_FILE}...")
-    with open(POST_FEED_ITEM_FILE, 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = patch_io.read_file(POST_FEED_ITEM_FILE)
     
     # Imports
     if 'AppBskyEmbedImages' not in content:
@@ -340,31 +162,37 @@ def modify_post_feed_item():
             # We can use regex to safely add to the list
             # But simple replacement might be easier if we target a known import like RichTextAPI
             if 'RichText as RichTextAPI,' in content:
-                content = content.replace(
+                content = patch_events.replace(
+                    content,
                     'RichText as RichTextAPI,',
-                    'RichText as RichTextAPI,\n  AppBskyEmbedImages,\n  AppBskyEmbedRecordWithMedia,\n  AppBskyEmbedVideo,'
+                    'RichText as RichTextAPI,\n  AppBskyEmbedImages,\n  AppBskyEmbedRecordWithMedia,\n  AppBskyEmbedVideo,',
+                    POST_FEED_ITEM_FILE
                 )
             else:
                 # Fallback to replacing the first import we see or the block start
-                content = content.replace(
+                content = patch_events.replace(
+                    content,
                     "type AppBskyActorDefs,",
-                    "type AppBskyActorDefs,\n  AppBskyEmbedImages,\n  AppBskyEmbedRecordWithMedia,\n  AppBskyEmbedVideo,"
+                    "type AppBskyActorDefs,\n  AppBskyEmbedImages,\n  AppBskyEmbedRecordWithMedia,\n  AppBskyEmbedVideo,",
+                    POST_FEED_ITEM_FILE
                 )
 
     if 'ReplyOverlay' not in content:
-        content = content.replace(
+        content = patch_events.replace(
+            content,
             "import {RichText} from '#/components/RichText'",
-            "import {RichText} from '#/components/RichText'\nimport {ReplyOverlay} from '#/components/ReplyOverlay'\nimport {useReplyMediaQuery} from '#/state/queries/reply-media'"
+            "import {RichText} from '#/components/RichText'\nimport {ReplyOverlay} from '#/components/ReplyOverlay'\nimport {useIsNearViewport, useReplyMediaQuery} from '#/state/queries/reply-media'",
+            POST_FEED_ITEM_FILE
         )
-
-    # Query Hook and hasMedia Logic
-    if 'useReplyMediaQuery(' not in content:
-        content = content.replace(
-            "const onOpenAuthor = () => {",
-            "const {data: replyMedia = []} = useReplyMediaQuery(post.uri)\n\n  const onOpenAuthor = () => {"
+    elif 'useIsNearViewport' not in content:
+        content = patch_events.replace(
+            content,
+            "import {useReplyMediaQuery} from '#/state/queries/reply-media'",
+            "import {useIsNearViewport, useReplyMediaQuery} from '#/state/queries/reply-media'",
+            POST_FEED_ITEM_FILE
         )
-    
-    # Inject hasMedia logic if not present
+
+    # hasMedia Logic and Query Hook: the query only runs for posts with media near the viewport
     HAS_MEDIA_LOGIC = r'''
   const embed = post.embed
   const hasMedia =
@@ -373,12 +201,39 @@ def modify_post_feed_item():
     (AppBskyEmbedRecordWithMedia.isView(embed) &&
       (AppBskyEmbedImages.isView(embed.media) || AppBskyEmbedVideo.isView(embed.media)))
 '''
-    if 'const hasMedia =' not in content:
-        # Insert after replyMedia definition
-        content = content.replace(
-            "const {data: replyMedia = []} = useReplyMediaQuery(post.uri)",
-            "const {data: replyMedia = []} = useReplyMediaQuery(post.uri)" + HAS_MEDIA_LOGIC
-        )
+    QUERY_HOOK = r'''  const isNearViewport = useIsNearViewport(post.uri)
+  const {data: replyMedia = []} = useReplyMediaQuery(post.uri, {
+    enabled: hasMedia && isNearViewport,
+  })
+'''
+    if 'useIsNearViewport(' not in content:
+        if 'useReplyMediaQuery(' not in content and 'const hasMedia =' not in content:
+            content = patch_events.replace(
+                content,
+                "const onOpenAuthor = () => {",
+                HAS_MEDIA_LOGIC.lstrip() + QUERY_HOOK + "\n  const onOpenAuthor = () => {",
+                POST_FEED_ITEM_FILE
+            )
+        else:
+            # Earlier versions of this script fetched for every item: gate that query in place
+            with patch_events.operation(POST_FEED_ITEM_FILE, 'useReplyMediaQuery(post.uri)') as op:
+                upgraded = UNGATED_QUERY_RE.sub('', content, count=1)
+                if 'useReplyMediaQuery(' in upgraded:
+                    patch_events.note("Warning: could not upgrade the useReplyMediaQuery call in PostFeedItem.tsx; "
+                                      "enable it only when hasMedia && useIsNearViewport(post.uri)",
+                                      'warning', POST_FEED_ITEM_FILE, 'useReplyMediaQuery(post.uri)')
+                else:
+                    match = HAS_MEDIA_DECL_RE.search(upgraded)
+                    if match:
+                        declaration = match.group().rstrip('\n') + '\n'
+                        upgraded = upgraded[:match.start()] + declaration + QUERY_HOOK + '\n' + upgraded[match.end():]
+                    else:
+                        upgraded = upgraded.replace(
+                            "const onOpenAuthor = () => {",
+                            HAS_MEDIA_LOGIC.lstrip() + QUERY_HOOK + "\n  const onOpenAuthor = () => {"
+                        )
+                    op.update(status='applied', before=content, after=upgraded)
+                    content = upgraded
 
     # Render Overlay
     if '<ReplyOverlay' not in content:
@@ -406,42 +261,48 @@ def modify_post_feed_item():
             {hasMedia && <ReplyOverlay replies={replyMedia} anchorUri={post.uri} />}
           </View>'''
         
-        content = content.replace(old_render, new_render)
+        content = patch_fuzzy.replace(content, old_render, new_render, POST_FEED_ITEM_FILE)
     else:
         # Fixup: replace post.embed check with hasMedia check if script runs again
         if '{post.embed && <ReplyOverlay' in content:
-            content = content.replace(
+            content = patch_events.replace(
+                content,
                 '{post.embed && <ReplyOverlay',
-                '{hasMedia && <ReplyOverlay'
+                '{hasMedia && <ReplyOverlay',
+                POST_FEED_ITEM_FILE
             )
         elif '<ReplyOverlay' in content and '{hasMedia &&' not in content:
              # If just <ReplyOverlay ... /> exists (from v1 or v2 script)
-             content = content.replace(
+             content = patch_events.replace(
+                 content,
                  '<ReplyOverlay replies={replyMedia} anchorUri={post.uri} />',
-                 '{hasMedia && <ReplyOverlay replies={replyMedia} anchorUri={post.uri} />}'
+                 '{hasMedia && <ReplyOverlay replies={replyMedia} anchorUri={post.uri} />}',
+                 POST_FEED_ITEM_FILE
              )
 
-    with open(POST_FEED_ITEM_FILE, 'w', encoding='utf-8') as f:
-        f.write(content)
+    patch_io.write_file(POST_FEED_ITEM_FILE, content)
     print("Modified PostFeedItem.tsx")
 
 def modify_thread_anchor():
     print(f"Modifying {THREAD_ANCHOR_FILE}...")
-    with open(THREAD_ANCHOR_FILE, 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = patch_io.read_file(THREAD_ANCHOR_FILE)
 
     # Imports
     if 'ReplyOverlay' not in content:
-        content = content.replace(
+        content = patch_events.replace(
+            content,
             "import {Embed, PostEmbedViewContext} from '#/components/Post/Embed'",
-            "import {Embed, PostEmbedViewContext} from '#/components/Post/Embed'\nimport {ReplyOverlay} from '#/components/ReplyOverlay'\nimport {useReplyMediaQuery} from '#/state/queries/reply-media'"
+            "import {Embed, PostEmbedViewContext} from '#/components/Post/Embed'\nimport {ReplyOverlay} from '#/components/ReplyOverlay'\nimport {useReplyMediaQuery} from '#/state/queries/reply-media'",
+            THREAD_ANCHOR_FILE
         )
 
     # Query Hook
     if 'useReplyMediaQuery(' not in content:
-        content = content.replace(
+        content = patch_events.replace(
+            content,
             "const {isActive: live} = useActorStatus(post.author)",
-            "const {isActive: live} = useActorStatus(post.author)\n  const {data: replyMedia = []} = useReplyMediaQuery(post.uri)"
+            "const {isActive: live} = useActorStatus(post.author)\n  const {data: replyMedia = []} = useReplyMediaQuery(post.uri)",
+            THREAD_ANCHOR_FILE
         )
 
     # Render Overlay
@@ -458,8 +319,7 @@ def modify_thread_anchor():
               </View>
             )}'''
         
-        if old_embed in content:
-            new_embed = r'''            {post.embed && (
+        new_embed = r'''            {post.embed && (
               <View style={[a.py_xs, { position: 'relative' }]}>
                 <Embed
                   embed={post.embed}
@@ -470,7 +330,7 @@ def modify_thread_anchor():
                 <ReplyOverlay replies={replyMedia} anchorUri={post.uri} />
               </View>
             )}'''
-            content = content.replace(old_embed, new_embed)
+        content = patch_fuzzy.replace(content, old_embed, new_embed, THREAD_ANCHOR_FILE)
     
     # Fix bug with JSX comment if present
     # This might already be fixed but good to have in script
@@ -480,20 +340,25 @@ def modify_thread_anchor():
          # This part is optional if we assume fresh start, but helpful.
          pass
 
-    with open(THREAD_ANCHOR_FILE, 'w', encoding='utf-8') as f:
-        f.write(content)
+    patch_io.write_file(THREAD_ANCHOR_FILE, content)
     print("Modified ThreadItemAnchor.tsx")
 
+TOMBSTONE_BLOCK_RE = pattern_registry.compile(
+    r'(if \(postShadow === POST_TOMBSTONE\) \{.*?return <ThreadItemPostDeleted.*?\n\s*\})', re.DOTALL,
+    name='POST_TOMBSTONE block'
+)
+
 def modify_thread_post():
     print(f"Modifying {THREAD_POST_FILE}...")
-    with open(THREAD_POST_FILE, 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = patch_io.read_file(THREAD_POST_FILE)
 
     # Imports for ReplyOverlay
     if 'ReplyOverlay' not in content:
-        content = content.replace(
+        content = patch_events.replace(
+            content,
             "import {Embed, PostEmbedViewContext} from '#/components/Post/Embed'",
-            "import {Embed, PostEmbedViewContext} from '#/components/Post/Embed'\nimport {ReplyOverlay} from '#/components/ReplyOverlay'\nimport {useReplyMediaQuery} from '#/state/queries/reply-media'"
+            "import {Embed, PostEmbedViewContext} from '#/components/Post/Embed'\nimport {ReplyOverlay} from '#/components/ReplyOverlay'\nimport {useReplyMediaQuery} from '#/state/queries/reply-media'",
+            THREAD_POST_FILE
         )
 
     # Add Embed types for filtering (check for import, not just usage)
@@ -503,12 +368,15 @@ def modify_thread_post():
         # } from '@atproto/api'
         # We insert the new imports after RichText
         if 'RichText as RichTextAPI,' in content:
-            content = content.replace(
+            content = patch_events.replace(
+                content,
                 'RichText as RichTextAPI,',
-                'RichText as RichTextAPI,\n  AppBskyEmbedImages,\n  AppBskyEmbedRecordWithMedia,\n  AppBskyEmbedVideo,'
+                'RichText as RichTextAPI,\n  AppBskyEmbedImages,\n  AppBskyEmbedRecordWithMedia,\n  AppBskyEmbedVideo,',
+                THREAD_POST_FILE
             )
         else:
-            print("Warning: could not find RichText as RichTextAPI pattern in ThreadItemPost.tsx")
+            patch_events.note("Warning: could not find RichText as RichTextAPI pattern in ThreadItemPost.tsx",
+                              file=THREAD_POST_FILE, anchor='RichText as RichTextAPI,')
 
     # Logic to hide media replies
     if 'Hide media replies' not in content:
@@ -534,8 +402,7 @@ def modify_thread_post():
             
             # Regex to find: if ... { ... return ... }
             # flags=re.DOTALL to match newlines
-            pattern = re.compile(r'(if \(postShadow === POST_TOMBSTONE\) \{.*?return <ThreadItemPostDeleted.*?\n\s*\})', re.DOTALL)
-            match = pattern.search(content)
+            match = TOMBSTONE_BLOCK_RE.search(content)
             
             if match:
                 full_block = match.group(1)
@@ -553,12 +420,11 @@ def modify_thread_post():
     return null
   }
 '''
-                content = content.replace(full_block, full_block + '\n' + TARGET_LOGIC)
+                content = patch_events.replace(content, full_block, full_block + '\n' + TARGET_LOGIC, THREAD_POST_FILE)
             else:
-                 print("Could not find POST_TOMBSTONE block with regex")
+                 patch_events.note("Could not find POST_TOMBSTONE block with regex", file=THREAD_POST_FILE, anchor=BLOCK_START)
         else:
-             print("Could not find ThreadItemPostDeleted return")
-    # Query Hook
+             patch_events.note("Could not find ThreadItemPostDeleted return", file=THREAD_POST_FILE, anchor=BLOCK_END_MATCH)
     # Query Hook
     if 'useReplyMediaQuery(' not in content:
         # We target the `moderation` definition which is a stable anchor in this file
@@ -566,9 +432,9 @@ def modify_thread_post():
         REPLACE = "const moderation = item.moderation\n  const { data: replyMedia = [] } = useReplyMediaQuery(post.uri)"
         
         if SEARCH in content:
-            content = content.replace(SEARCH, REPLACE)
+            content = patch_events.replace(content, SEARCH, REPLACE, THREAD_POST_FILE)
         else:
-            print("Could not find 'const moderation = item.moderation' anchor")
+            patch_events.note("Could not find 'const moderation = item.moderation' anchor", file=THREAD_POST_FILE, anchor=SEARCH)
 
 
     # Render Overlay
@@ -593,21 +459,24 @@ def modify_thread_post():
                   <ReplyOverlay replies={replyMedia} anchorUri={post.uri} />
                 </View>
               )}'''
-        content = content.replace(old_embed, new_embed)
+        content = patch_fuzzy.replace(content, old_embed, new_embed, THREAD_POST_FILE)
 
-    with open(THREAD_POST_FILE, 'w', encoding='utf-8') as f:
-        f.write(content)
+    patch_io.write_file(THREAD_POST_FILE, content)
     print("Modified ThreadItemPost.tsx")
 
 
 def main():
     print("Setting up Reply Media Overlay...")
-    create_files()
+    created = create_files()
     modify_post_feed()
     modify_post_feed_item()
     modify_thread_anchor()
     modify_thread_post()
+    if not created:
+        print("⚠️  Some manifest edits failed. Check error messages above.")
+        sys.exit(1)
     print("Done! Rebuild the app.")
 
 if __name__ == "__main__":
-    main()
+    with patch_io.cli():
+        main()
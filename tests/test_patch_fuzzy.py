@@ -0,0 +1,51 @@
+"""
+Anchor relocation in patch_fuzzy.
+
+Usage: python -m pytest tests/
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import patch_events
+import patch_fuzzy
+
+IMPORTS = """import {forceLTR} from '#/lib/strings/bidi'
+import {useSession} from '#/state/session'
+"""
+
+
+def replace_status(content, old, new):
+    patch_events.enable()
+    mark = patch_events.mark()
+    result = patch_fuzzy.replace(content, old, new)
+    return result, patch_events.events(mark)[-1]['status']
+
+
+def test_reformatted_import_is_relocated():
+    old = "import { forceLTR } from '#/lib/strings/bidi'"
+    new = "import {forceLTR, forceRTL} from '#/lib/strings/bidi'"
+    result, status = replace_status(IMPORTS, old, new)
+    assert status == 'relocated'
+    assert result == IMPORTS.replace("import {forceLTR} from '#/lib/strings/bidi'", new)
+
+
+def test_near_miss_import_is_not_found():
+    # One token away from the existing import, which must not be overwritten
+    old = "import {forceRTL} from '#/lib/strings/bidi'"
+    assert patch_fuzzy.similarity(old, IMPORTS.splitlines()[0]) >= patch_fuzzy.THRESHOLD
+    result, status = replace_status(IMPORTS, old, "import {forceRTL, isRTL} from '#/lib/strings/bidi'")
+    assert status == 'not found'
+    assert result == IMPORTS
+
+
+def test_reformatted_block_is_relocated():
+    content = """  <PostMeta
+    author={post.author}
+    moderation={moderation}
+    timestamp={post.indexedAt}
+  />
+"""
+    old = "<PostMeta author={post.author} moderation={moderation} timestamp={post.indexedAt}\n/>"
+    assert patch_fuzzy.locate(content, old) is not None
@@ -0,0 +1,34 @@
+"""
+Edits applied by patch_manifest.apply_patch.
+
+Usage: python -m pytest tests/
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import patch_manifest
+
+MANIFEST = {'name': 'test'}
+
+
+def apply(tmp_path, content, edit):
+    path = tmp_path / 'Example.tsx'
+    path.write_text(content, encoding='utf-8')
+    ok = patch_manifest.apply_patch(MANIFEST, {'file': str(path), 'edit': [edit]})
+    return ok, path.read_text(encoding='utf-8')
+
+
+def test_unique_anchor_is_edited(tmp_path):
+    ok, result = apply(tmp_path, "<View>\n  <Text />\n</View>\n",
+                       {'anchor': "  <Text />\n", 'op': 'after', 'text': "  <Badge />\n"})
+    assert ok
+    assert result == "<View>\n  <Text />\n  <Badge />\n</View>\n"
+
+
+def test_repeated_anchor_fails_and_leaves_file_alone(tmp_path):
+    content = "<View>\n  <Text />\n  <Text />\n</View>\n"
+    ok, result = apply(tmp_path, content, {'anchor': "  <Text />\n", 'text': ""})
+    assert not ok
+    assert result == content
@@ -0,0 +1,388 @@
+"""
+Lightweight concrete syntax tree for TSX sources.
+
+parse() makes one pass over a file and records every bracket pair - (), [],
+{}, template literals - and every JSX element and fragment as a Node holding
+its start/end offsets into the original text. Comments, strings and regex
+literals are skipped, so braces inside them never confuse the matching.
+
+The tree never re-renders anything: edits are plain (start, end, text) spans
+applied with apply_edits(), so every byte outside an edited span is preserved
+exactly. Scripts can locate code structurally, e.g.
+
+    tree = tsx_tree.parse(content)
+    inner = tree.find_declaration('FeedItemInner')
+    for element in tree.elements('PostMeta', within=inner):
+        ...
+
+instead of matching exact multi-line strings that break on whitespace changes.
+"""
+import bisect
+import functools
+import re
+
+import patch_trace
+import pattern_registry
+
+# Words after which a '/' starts a regex literal and a '<' may start JSX
+EXPR_KEYWORDS = frozenset([
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'case', 'do', 'else', 'yield', 'await', 'default',
+])
+OPENERS = {'(': 'paren', '[': 'bracket', '{': 'brace'}
+CLOSERS = {')': 'paren', ']': 'bracket', '}': 'brace'}
+# Tokens that leave an expression unfinished at the end of a line
+CONTINUATION_END = ('=', ',', '(', '[', '{', ':', '?', '&', '|', '+', '-', '*', '/', '.', '<', '>')
+CONTINUATION_START = ('.', '?', ':', '&', '|', '+', '-', '*', '/', '=', ',')
+
+CODE_TOKEN = pattern_registry.compile(r"""
+     (?P<ws>\s+)
+    |(?P<comment>//[^\n]*|/\*.*?\*/)
+    |(?P<word>[A-Za-z_$][\w$]*)
+    |(?P<number>\d[\w.]*)
+    |(?P<string>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")
+    |(?P<punct>=>|\.\.\.|.)
+""", re.S | re.X, name='TSX code token', traced=False)
+REGEX_LITERAL = pattern_registry.compile(
+    r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*", name='TSX regex literal', traced=False
+)
+JSX_OPEN = pattern_registry.compile(r"<(?:(?P<fragment>\s*>)|(?P<name>[A-Za-z_$][\w$.:-]*))", name='JSX opening tag', traced=False)
+JSX_CLOSE = pattern_registry.compile(r"</\s*(?P<name>[A-Za-z_$][\w$.:-]*)?\s*>", name='JSX closing tag', traced=False)
+# A '<T,>' or '<T extends X>' after '=' is an arrow function type parameter, not JSX
+TYPE_PARAMETER = pattern_registry.compile(r"\s*(?:,|extends\b)", name='TSX type parameter', traced=False)
+TAG_TOKEN = pattern_registry.compile(r"""
+     (?P<ws>\s+)
+    |(?P<comment>//[^\n]*|/\*.*?\*/)
+    |(?P<self_close>/>)
+    |(?P<string>"[^"]*"|'[^']*')
+    |(?P<attr>[A-Za-z_$][\w$:.-]*)
+    |(?P<punct>[>{=<])
+""", re.S | re.X, name='JSX tag token', traced=False)
+CHILD_SPECIAL = pattern_registry.compile(r"[{<]", name='JSX child special', traced=False)
+TEMPLATE_SPECIAL = pattern_registry.compile(r"\\.|`|\$\{", re.S, name='TSX template special', traced=False)
+
+
+class TsxSyntaxError(ValueError):
+    """Raised when a file cannot be matched into a consistent tree."""
+
+    def __init__(self, message, source, offset):
+        self.line = source.count('\n', 0, offset) + 1
+        self.offset = offset
+        super().__init__(f"line {self.line}: {message}")
+
+
+class Node:
+    """
+    A bracketed region of the source. kind is one of 'root', 'paren',
+    'bracket', 'brace', 'template', 'element', 'fragment' or 'declaration'.
+    Elements also carry their tag name and open_end, the offset just past
+    the '>' of the opening tag (equal to end for self-closing elements).
+    """
+    __slots__ = ('kind', 'name', 'start', 'end', 'open_end', 'children', 'parent', 'mode')
+
+    def __init__(self, kind, start, name=None, parent=None, mode='code'):
+        self.kind = kind
+        self.name = name
+        self.start = start
+        self.end = None
+        self.open_end = None
+        self.children = []
+        self.parent = parent
+        self.mode = mode
+
+    @property
+    def self_closing(self):
+        return self.kind == 'element' and self.open_end == self.end
+
+    def walk(self):
+        """Yield this node and every descendant in source order."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def __repr__(self):
+        label = f"{self.kind} {self.name}" if self.name else self.kind
+        return f"<Node {label} [{self.start}:{self.end}]>"
+
+
+class Tree:
+    def __init__(self, source, root, skipped):
+        self.source = source
+        self.root = root
+        self._skipped = skipped  # sorted (start, end) spans of comments and strings
+        self._skipped_starts = [start for start, _ in skipped]
+
+    def text(self, node):
+        return self.source[node.start:node.end]
+
+    def line_of(self, offset):
+        return self.source.count('\n', 0, offset) + 1
+
+    def in_code(self, offset):
+        """False if offset falls inside a comment or string literal."""
+        index = bisect.bisect_right(self._skipped_starts, offset) - 1
+        return index < 0 or offset >= self._skipped[index][1]
+
+    def elements(self, name=None, within=None):
+        """JSX elements, optionally filtered by tag name and restricted to a node's span."""
+        start, end = (within.start, within.end) if within is not None else (0, len(self.source))
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.end <= start or node.start >= end:
+                continue
+            if (node.kind == 'element' and (name is None or node.name == name)
+                    and node.start >= start and node.end <= end):
+                yield node
+            stack.extend(reversed(node.children))
+
+    def find_element(self, name, within=None):
+        """The first JSX element with this tag name, or None."""
+        return next(self.elements(name, within), None)
+
+    def find_declaration(self, name):
+        """
+        Span of a top-level `function name` or `const/let/var name = ...`
+        statement, from its keyword to the end of the statement. Returns a
+        'declaration' Node, or None if there is no such declaration.
+        """
+        pattern = pattern_registry.compile(
+            r"\b(?:function\s*\*?\s*|(?:const|let|var)\s+)" + re.escape(name) + r"\b"
+        )
+        starts = [child.start for child in self.root.children]
+        for match in pattern.finditer(self.source):
+            index = bisect.bisect_right(starts, match.start()) - 1
+            if index >= 0 and match.start() < self.root.children[index].end:
+                continue  # nested inside a bracket, not a top-level declaration
+            if not self.in_code(match.start()):
+                continue
+            node = Node('declaration', match.start(), name=name, parent=self.root)
+            node.end = self._statement_end(match.end(), index + 1)
+            node.children = [
+                child for child in self.root.children[index + 1:] if child.end <= node.end
+            ]
+            return node
+        return None
+
+    def _statement_end(self, pos, child_index):
+        """End offset of the root-level statement that continues at pos."""
+        children = self.root.children
+        source = self.source
+        last = ''
+        while True:
+            child = children[child_index] if child_index < len(children) else None
+            gap_end = child.start if child is not None else len(source)
+            while pos < gap_end:
+                match = CODE_TOKEN.match(source, pos, gap_end)
+                if match.lastgroup == 'punct' and match.group() == ';':
+                    return match.end()
+                if match.lastgroup == 'ws' and '\n' in match.group():
+                    following = source[match.end():match.end() + 2]
+                    if last and not last.endswith(CONTINUATION_END) and not following.startswith(CONTINUATION_START):
+                        return pos
+                elif match.lastgroup != 'comment':
+                    last = match.group()
+                pos = match.end()
+            if child is None:
+                return len(source.rstrip())
+            pos = child.end
+            last = ')'
+            child_index += 1
+
+
+def _skip_type_arguments(source, pos):
+    """Offset just past a balanced '<...>' type argument list starting at pos."""
+    depth = 0
+    for index in range(pos, len(source)):
+        char = source[index]
+        if char == '<':
+            depth += 1
+        elif char == '>':
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    raise TsxSyntaxError("unterminated type arguments", source, pos)
+
+
+def _scan(source, jsx=True):
+    root = Node('root', 0)
+    skipped = []
+    stack = [root]
+    node = root
+    expr_start = True
+    pos = 0
+    length = len(source)
+
+    def open_node(kind, start, mode, name=None):
+        child = Node(kind, start, name=name, parent=node, mode=mode)
+        node.children.append(child)
+        stack.append(child)
+        return child
+
+    def close_node(end):
+        stack[-1].end = end
+        stack.pop()
+        return stack[-1]
+
+    def try_open_jsx(at):
+        match = JSX_OPEN.match(source, at)
+        if match is None:
+            return None
+        if match.group('fragment'):
+            child = open_node('fragment', at, 'children')
+            child.open_end = match.end()
+            return match.end()
+        if TYPE_PARAMETER.match(source, match.end()):
+            return None
+        open_node('element', at, 'tag', name=match.group('name'))
+        if source.startswith('<', match.end()):
+            return _skip_type_arguments(source, match.end())  # <Row<ItemT> ...>
+        return match.end()
+
+    while pos < length:
+        mode = node.mode
+
+        if mode == 'code':
+            match = CODE_TOKEN.match(source, pos)
+            kind = match.lastgroup
+            token = match.group()
+            if kind == 'ws':
+                pos = match.end()
+                continue
+            if kind == 'comment':
+                skipped.append((pos, match.end()))
+                pos = match.end()
+                continue
+            if token == '/' and source.startswith('/*', pos):
+                raise TsxSyntaxError("unterminated comment", source, pos)
+            if kind == 'string':
+                skipped.append((pos, match.end()))
+                expr_start = False
+            elif kind == 'word':
+                expr_start = token in EXPR_KEYWORDS
+            elif kind == 'number':
+                expr_start = False
+            elif token in OPENERS:
+                node = open_node(OPENERS[token], pos, 'code')
+                expr_start = True
+            elif token in CLOSERS:
+                if node.kind != CLOSERS[token]:
+                    raise TsxSyntaxError(f"unexpected '{token}' closing {node.kind} opened on line "
+                                         f"{source.count(chr(10), 0, node.start) + 1}", source, pos)
+                node = close_node(match.end())
+                expr_start = False
+            elif token == '`':
+                node = open_node('template', pos, 'template')
+            elif token == '/' and expr_start:
+                regex = REGEX_LITERAL.match(source, pos)
+                if regex is not None:
+                    skipped.append((pos, regex.end()))
+                    pos = regex.end()
+                    expr_start = False
+                    continue
+            elif token == '<' and expr_start and jsx:
+                jsx_end = try_open_jsx(pos)
+                if jsx_end is not None:
+                    node = stack[-1]
+                    pos = jsx_end
+                    continue
+                expr_start = True
+            else:
+                expr_start = True
+            pos = match.end()
+
+        elif mode == 'template':
+            match = TEMPLATE_SPECIAL.search(source, pos)
+            if match is None:
+                raise TsxSyntaxError("unterminated template literal", source, node.start)
+            if match.group() == '`':
+                node = close_node(match.end())
+                expr_start = False
+            elif match.group() == '${':
+                node = open_node('brace', match.start() + 1, 'code')
+                expr_start = True
+            pos = match.end()
+
+        elif mode == 'tag':
+            match = TAG_TOKEN.match(source, pos)
+            if match is None:
+                raise TsxSyntaxError(f"unexpected character in <{node.name}> tag", source, pos)
+            kind = match.lastgroup
+            token = match.group()
+            pos = match.end()
+            if kind in ('comment', 'string'):
+                skipped.append((match.start(), pos))
+            elif kind == 'self_close':
+                node.open_end = pos
+                node = close_node(pos)
+                expr_start = False
+            elif token == '>':
+                node.open_end = pos
+                node.mode = 'children'
+            elif token == '{':
+                node = open_node('brace', match.start(), 'code')
+                expr_start = True
+            elif token == '<':
+                if JSX_OPEN.match(source, match.start()) is None:
+                    raise TsxSyntaxError(f"unexpected '<' in <{node.name}> tag", source, match.start())
+                pos = try_open_jsx(match.start())
+                node = stack[-1]
+
+        else:  # children
+            match = CHILD_SPECIAL.search(source, pos)
+            if match is None:
+                raise TsxSyntaxError(f"unclosed <{node.name or ''}> element", source, node.start)
+            at = match.start()
+            if match.group() == '{':
+                node = open_node('brace', at, 'code')
+                expr_start = True
+                pos = at + 1
+                continue
+            closing = JSX_CLOSE.match(source, at)
+            if closing is not None:
+                if (closing.group('name') or None) != node.name:
+                    raise TsxSyntaxError(f"</{closing.group('name') or ''}> does not close "
+                                         f"<{node.name or ''}> from line "
+                                         f"{source.count(chr(10), 0, node.start) + 1}", source, at)
+                node = close_node(closing.end())
+                expr_start = False
+                pos = closing.end()
+                continue
+            pos = try_open_jsx(at)
+            if pos is None:
+                raise TsxSyntaxError("unexpected '<' in JSX text", source, at)
+            node = stack[-1]
+
+    if node is not root:
+        raise TsxSyntaxError(f"unclosed {node.kind}", source, node.start)
+    root.end = length
+    return Tree(source, root, skipped)
+
+
+@functools.lru_cache(maxsize=64)
+def parse(source, jsx=True):
+    """
+    Parse TSX source into a Tree. Pass jsx=False for plain .ts files, where
+    '<' never starts an element. Results are cached per distinct content.
+    """
+    with patch_trace.span('parse', 'tsx_tree.parse', chars=len(source)):
+        return _scan(source, jsx)
+
+
+def apply_edits(source, edits):
+    """
+    Apply (start, end, replacement) edits to source. Edits must not overlap;
+    text outside the edited spans is left untouched.
+    """
+    parts = []
+    pos = 0
+    for start, end, replacement in sorted(edits, key=lambda edit: (edit[0], edit[1])):
+        if start < pos:
+            raise ValueError(f"Overlapping edit at offset {start}")
+        parts.append(source[pos:start])
+        parts.append(replacement)
+        pos = end
+    parts.append(source[pos:])
+    return ''.join(parts)